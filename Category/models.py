@@ -2,6 +2,8 @@ from django.db import models
 from imagekit.models.fields import ProcessedImageField
 from imagekit.processors import ResizeToFill  # , ResizeToFill
 
+from Neetechs.images import register_responsive_variants
+
 
 def cat_upload_location(instance, filename, **kwargs):
 	"""
@@ -47,4 +49,7 @@ class ModelCategory(models.Model):
 	#     ordering = ['title'] # Note: 'title' is not a field in this model, likely 'name' was intended.
 
 	def __str__(self):
-		return self.name
\ No newline at end of file
+		return self.name
+
+
+register_responsive_variants(ModelCategory, 'img', max_width=128)
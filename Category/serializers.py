@@ -4,15 +4,17 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from Category.models import ModelCategory
+from Neetechs.images import SrcsetField
 
 
 class ChildCategorySerializer(serializers.ModelSerializer):
 	"""Serializer used for documenting nested child categories."""
 	children = serializers.SerializerMethodField()
+	img_srcset = SrcsetField(source='img')
 
 	class Meta:
 		model = ModelCategory
-		fields = ('id', 'name', 'parent', 'children','description', 'updatedAt', 'createdAt', 'img')
+		fields = ('id', 'name', 'parent', 'children','description', 'updatedAt', 'createdAt', 'img', 'img_srcset')
 		ref_name = "CategoryChild"
 
 	@extend_schema_field(
@@ -31,12 +33,13 @@ class CategorySerializer(serializers.ModelSerializer):
 	allowing for a nested representation of the category hierarchy.
 	"""
 	children = serializers.SerializerMethodField() # Defines a custom field that gets its value from the get_children method.
+	img_srcset = SrcsetField(source='img') # WebP/AVIF variants of `img` by width.
 
 	class Meta:
 		model = ModelCategory
 		# Specifies the fields to include in the serialized output,
 		# including the custom 'children' field for nested categories.
-		fields = ('id', 'name', 'parent', 'children','description', 'updatedAt', 'createdAt', 'img')
+		fields = ('id', 'name', 'parent', 'children','description', 'updatedAt', 'createdAt', 'img', 'img_srcset')
 
 	@extend_schema_field(ChildCategorySerializer(many=True))
 	def get_children(self, obj: ModelCategory) -> List[Dict[str, Any]]:
@@ -9,12 +9,16 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 
 from Category.models import ModelCategory
 from Category.serializers import CategorySerializer
+from Service.analytics import record_view
+from Service.api.filters import AvailabilityFilter, PriceRangeFilter, ServiceSearchFilter, SparseFieldsFilter
+from Service.detail_cache import cache_detail_response, cached_detail_response, detail_version
 from Service.models import ServicePost
 from Service.api.serializers import (
     ServicePostCreateSerializer,
     ServicePostSerializer,
     ServicePostUpdateSerializer,
 )
+from Service.api.views import RecordImpressionsMixin
 from chat.viewsets import ThreadViewSet  # existing chat viewset
 from accounts.models import User
 from Profile.serializer import ProfileSerializer
@@ -35,12 +39,19 @@ class CategoryViewSet(ReadOnlyViewSet):
     lookup_value_regex = "[^/]+"
 
 
-class ServicePostViewSet(viewsets.ModelViewSet):
-    queryset = ServicePost.objects.all().order_by("-createdAt")
+class ServicePostViewSet(RecordImpressionsMixin, viewsets.ModelViewSet):
+    queryset = ServicePost.objects.order_by("-createdAt")
     serializer_class = ServicePostSerializer
     lookup_field = "slug"
     lookup_value_regex = r"[^/]+"
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        AvailabilityFilter,
+        PriceRangeFilter,
+        ServiceSearchFilter,
+        OrderingFilter,
+        SparseFieldsFilter,
+    ]
     filterset_fields = [
         "title",
         "site_id",
@@ -83,7 +94,18 @@ class ServicePostViewSet(viewsets.ModelViewSet):
 
     @extend_schema(operation_id="service_retrieve_by_slug")
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        record_view(kwargs[self.lookup_field])
+        # Plain detail GETs are served from the per-slug cache; query parameters
+        # (filters, `?reactions=counts`) can change the result, so they bypass it.
+        if request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+        variant = request.build_absolute_uri("/")
+        version = detail_version(kwargs[self.lookup_field])
+        response = cached_detail_response(kwargs[self.lookup_field], version, variant)
+        if response is None:
+            instance = self.get_object()
+            response = cache_detail_response(instance, version, self.get_serializer(instance).data, variant)
+        return response
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -94,7 +116,7 @@ class ServicePostViewSet(viewsets.ModelViewSet):
         return Response(read_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def _ensure_owner(self, instance: ServicePost) -> None:
-        if instance.employee != self.request.user:
+        if instance.employee_id != self.request.user.pk:
             raise PermissionDenied("You don't have permission to modify this service.")
 
     def update(self, request, *args, **kwargs):
@@ -0,0 +1,421 @@
+"""
+Shared handling of the stored (PNG) images: content-addressed storage and
+responsive WebP/AVIF variants.
+
+`ContentAddressedImageField` is a ProcessedImageField that names each processed
+file after the SHA-256 of its upload and processing spec (`cas/ab/<digest>.png`).
+Identical uploads are processed and stored once and shared by every row that
+references them.
+
+Shared files are reference counted in `Service.StoredImage` (one row per
+file). The count changes in the transaction that writes the referencing row:
+`ContentAddressedImageFieldFile.save` adds the upload's reference before it
+checks whether the file exists, the models' pre_save moves references from the
+names in the stored row to the new ones, and post_delete drops the deleted
+row's references. A file is deleted only from `collect_images`, which locks
+the count rows it removes, so a concurrent upload of the same content waits
+and then stores the file again instead of trusting a file about to vanish.
+Files left unreferenced by a delete are collected on commit; replaced ones by
+`manage.py collect_stored_images` (cron), once copies of their URL (e.g. the
+seller snapshot on posts) had time to follow. Writes that bypass model saves
+(queryset `update()`, `bulk_update`, raw SQL) must adjust the counts with
+`acquire_images`/`release_images`, or be followed by
+`manage.py collect_stored_images --rebuild`.
+
+`register_responsive_variants(Model, 'field', max_width)` registers one imagekit
+generator per (format, width) and attaches it to the field's source group, so
+the variants are written as soon as a new source image is saved (an imagekit
+Optimistic strategy) and `manage.py generateimages` backfills existing rows.
+Variant names are derived from the source name and the spec, so URLs are
+computed without touching storage.
+
+`SrcsetField` exposes them in serializers as `{format: {width: url}}`.
+"""
+import hashlib
+from collections import Counter, defaultdict
+from functools import cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
+from imagekit import ImageSpec, hashers, register
+from imagekit.cachefiles import ImageCacheFile
+from imagekit.cachefiles.strategies import Optimistic
+from imagekit.models.fields import ProcessedImageField
+from imagekit.models.fields.files import ProcessedImageFieldFile
+from imagekit.processors import ResizeToFit
+from imagekit.specs.sourcegroups import ImageFieldSourceGroup
+from imagekit.utils import generate, suggest_extension
+from PIL import Image
+from rest_framework import serializers
+
+try:
+    import pillow_avif  # noqa: F401 -- registers the AVIF codec on Pillow builds without it
+except ImportError:
+    pass
+
+CONTENT_ADDRESSED_DIR = 'cas'
+UPSERT_BATCH_SIZE = 1000 # StoredImage rows per INSERT ... ON CONFLICT statement.
+
+VARIANT_QUALITY = {'webp': 75, 'avif': 55}
+
+_variant_specs = {} # (model label, field name) -> [spec class, ...]
+
+
+def content_digest(content, spec):
+    """SHA-256 over the processing spec and the raw upload; equal digests mean equal output."""
+    digest = hashlib.sha256(hashers.pickle([spec.processors, spec.format, spec.options, spec.autoconvert]).encode())
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    return name.startswith(CONTENT_ADDRESSED_DIR + '/')
+
+
+class ContentAddressedImageFieldFile(ProcessedImageFieldFile):
+
+    def save(self, name, content, save=True):
+        if not settings.MEDIA_CONTENT_ADDRESSED:
+            return super().save(name, content, save)
+        spec = self.field.get_spec(source=content)
+        digest = content_digest(content, spec)
+        name = '{dir}/{shard}/{digest}{ext}'.format(
+            dir=CONTENT_ADDRESSED_DIR, shard=digest[:2], digest=digest, ext=suggest_extension(name, spec.format)
+        )
+        acquire_images([(self.field, name)]) # Before the exists check: blocks a collector deleting the file.
+        if not self.storage.exists(name):
+            saved = self.storage.save(name, generate(spec), max_length=self.field.max_length)
+            if saved != name: # A concurrent writer stored the same content first; keep theirs.
+                self.storage.delete(saved)
+        self.name = name
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = True
+        self.instance.__dict__.setdefault('_counted_images', {})[self.field.attname] = name
+        if save:
+            self.instance.save()
+
+
+class ContentAddressedImageField(ProcessedImageField):
+    """
+    ProcessedImageField stored under a content address instead of `upload_to`
+    (which is only used with `MEDIA_CONTENT_ADDRESSED` off). An upload that was
+    seen before reuses the stored file without being decoded or encoded again.
+    """
+    attr_class = ContentAddressedImageFieldFile
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if not cls._meta.abstract:
+            dispatch_uid = 'content-addressed-refs:%s' % cls._meta.label
+            pre_save.connect(move_image_references, sender=cls, dispatch_uid=dispatch_uid)
+            post_save.connect(_forget_counted_images, sender=cls, dispatch_uid=dispatch_uid)
+            post_delete.connect(release_deleted_images, sender=cls, dispatch_uid=dispatch_uid)
+
+
+def owns_file(field_file):
+    """False for unset fields and for the field's shared default image (no variants, never deleted)."""
+    return bool(field_file) and field_file.name != field_file.field.default
+
+
+@cache
+def _blank_instance(model):
+    return model()
+
+
+def stored_field_file(model, field_name, name):
+    """
+    FieldFile for the stored file `name` of `model.field_name`, without loading
+    a row, e.g. for a copy of the name kept on another model. Works with
+    `srcset` like the row's own field.
+    """
+    field = model._meta.get_field(field_name)
+    return field.attr_class(_blank_instance(model), field, name or None)
+
+
+def _stored_images():
+    return apps.get_model('Service', 'StoredImage')
+
+
+@cache
+def content_addressed_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, ContentAddressedImageField)]
+
+
+def _field_label(field):
+    return '%s.%s' % (field.model._meta.label, field.name)
+
+
+def _count_references(references):
+    """`{name: (field, n)}` for the content-addressed names among `(field, name)` pairs."""
+    counted = {}
+    for field, name in references:
+        if name and is_content_addressed(name):
+            _field, n = counted.get(name, (field, 0))
+            counted[name] = (_field, n + 1)
+    return counted
+
+
+def _add_references(counted):
+    """Upserts `{name: (field, n)}` into StoredImage in name order, so concurrent writers lock rows in the same order."""
+    table = connection.ops.quote_name(_stored_images()._meta.db_table)
+    rows = [(name, _field_label(field), n) for name, (field, n) in sorted(counted.items())]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f'INSERT INTO {table} (name, field, refs, touched_at) '
+                f'VALUES {", ".join(["(%s, %s, %s, NOW())"] * len(batch))} '
+                f'ON CONFLICT (name) DO UPDATE SET refs = {table}.refs + EXCLUDED.refs, touched_at = EXCLUDED.touched_at',
+                [value for row in batch for value in row],
+            )
+
+
+def acquire_images(references):
+    """Adds a reference per `(field, name)` pair to the content-addressed files, in the caller's transaction."""
+    counted = _count_references(references)
+    if counted:
+        _add_references(counted)
+
+
+def release_images(references, collect=False):
+    """
+    Drops a reference per `(field, name)` pair, in the caller's transaction.
+    With `collect`, files left without references are deleted once it commits;
+    otherwise `manage.py collect_stored_images` deletes them later.
+    """
+    counted = _count_references(references)
+    by_delta = defaultdict(list)
+    for name, (_field, n) in sorted(counted.items()):
+        by_delta[n].append(name)
+    for n, names in by_delta.items():
+        _stored_images().objects.filter(name__in=names).update(refs=F('refs') - n, touched_at=Now())
+    if collect and counted:
+        names = sorted(counted)
+        transaction.on_commit(lambda: collect_images(names), robust=True)
+
+
+def _name_difference(new, old):
+    """`(gained, lost)` `(field, name)` pairs between two lists of them, counting repeated names."""
+    fields = {name: field for field, name in old + new}
+    new_names = Counter(name for _field, name in new)
+    old_names = Counter(name for _field, name in old)
+    return (
+        [(fields[name], name) for name in (new_names - old_names).elements()],
+        [(fields[name], name) for name in (old_names - new_names).elements()],
+    )
+
+
+def move_image_references(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    """
+    pre_save of models with content-addressed fields. Moves references from the
+    names in the stored row, read and locked here rather than trusted from a
+    possibly stale instance, to the instance's names. Names counted by
+    `ContentAddressedImageFieldFile.save` during this save are not added again.
+    """
+    if raw:
+        return
+    fields = [
+        field for field in content_addressed_fields(sender)
+        if field.attname in instance.__dict__ and (update_fields is None or field.name in update_fields)
+    ]
+    if not fields:
+        return
+    counted = instance.__dict__.get('_counted_images', {})
+    new = [
+        (field, getattr(instance, field.attname).name) for field in fields
+        if counted.get(field.attname) != getattr(instance, field.attname).name
+    ]
+    old = []
+    if not instance._state.adding:
+        rows = sender._base_manager.using(using).filter(pk=instance.pk)
+        if transaction.get_connection(using).in_atomic_block:
+            rows = rows.select_for_update()
+        stored = rows.values_list(*[field.attname for field in fields]).first() or ()
+        old = list(zip(fields, stored))
+    gained, lost = _name_difference(new, old)
+    acquire_images(gained)
+    release_images(lost)
+
+
+def _forget_counted_images(sender, instance, **kwargs):
+    instance.__dict__.pop('_counted_images', None)
+
+
+def release_deleted_images(sender, instance, **kwargs):
+    """post_delete of models with content-addressed fields: drops the row's references and collects on commit."""
+    release_images([
+        (field, getattr(instance, field.attname).name)
+        for field in content_addressed_fields(sender) if field.attname in instance.__dict__
+    ], collect=True)
+
+
+def _delete_files(field_file):
+    for _spec, cache_file in _variant_files(field_file):
+        cache_file.storage.delete(cache_file.name)
+    field_file.storage.delete(field_file.name)
+
+
+def collect_images(names=None, unchanged_for=None, limit=None):
+    """
+    Deletes the files (and variants) of StoredImages without references, then
+    their rows: those among `names` or all, optionally only those unchanged for
+    `unchanged_for` (a timedelta), at most `limit`. The rows stay locked until
+    the files are gone; rows a writer holds are skipped. Returns the number of
+    files deleted.
+    """
+    model = _stored_images()
+    with transaction.atomic():
+        rows = model.objects.select_for_update(skip_locked=True).filter(refs__lte=0)
+        if names is not None:
+            rows = rows.filter(name__in=names)
+        if unchanged_for is not None:
+            rows = rows.filter(touched_at__lt=timezone.now() - unchanged_for)
+        doomed = list(rows.order_by('name').values_list('pk', 'name', 'field')[:limit])
+        for _pk, name, label in doomed:
+            model_label, field_name = label.rsplit('.', 1)
+            _delete_files(stored_field_file(apps.get_model(model_label), field_name, name))
+        model.objects.filter(pk__in=[pk for pk, _name, _label in doomed]).delete()
+    return len(doomed)
+
+
+def rebuild_image_references():
+    """
+    Recounts every StoredImage from the content-addressed columns, e.g. to start
+    counting on an existing database or after writes that bypassed the counts.
+    Names no column references keep a row without references for the
+    collector. Returns the number of referenced names.
+    """
+    counted = {}
+    for model in apps.get_models():
+        for field in content_addressed_fields(model):
+            rows = (
+                model._base_manager.filter(**{field.attname + '__startswith': CONTENT_ADDRESSED_DIR + '/'})
+                .order_by().values_list(field.attname).annotate(n=Count('pk'))
+            )
+            for name, n in rows:
+                _field, total = counted.get(name, (field, 0))
+                counted[name] = (_field, total + n)
+    with transaction.atomic():
+        _stored_images().objects.update(refs=0, touched_at=Now())
+        if counted:
+            _add_references(counted)
+    return len(counted)
+
+
+def release_image(field_file):
+    """
+    Deletes the file behind `field_file` and its variants, unless it is the
+    shared default or content-addressed (those are reference counted, see the
+    module docstring). Call it after the referencing row is gone (e.g. from
+    post_delete, on commit).
+    """
+    if owns_file(field_file) and not is_content_addressed(field_file.name):
+        _delete_files(field_file)
+
+
+class RegenerateOnSourceSave(Optimistic):
+    """
+    Optimistic, but rewrites the variants when the source is saved: some sources
+    keep the same name across uploads, so the variant names do not change
+    either. Content-addressed sources never change under a name, so their
+    existing variants are reused.
+    """
+
+    def on_source_saved(self, file):
+        source = file.generator.source
+        if owns_file(source):
+            file.generate(force=not is_content_addressed(source.name))
+
+
+def supported_formats():
+    """Configured IMAGE_VARIANT_FORMATS the installed Pillow can encode."""
+    Image.init()
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt.upper() in Image.SAVE]
+
+
+def variant_spec(fmt, width):
+    """ImageSpec class that fits the source into `width` pixels and encodes it as `fmt`."""
+    return type('%s%dSpec' % (fmt.capitalize(), width), (ImageSpec,), {
+        'processors': [ResizeToFit(width, width, upscale=False)],
+        'format': fmt.upper(),
+        'options': {'quality': VARIANT_QUALITY.get(fmt, 75)},
+        'cachefile_strategy': RegenerateOnSourceSave,
+        'fmt': fmt,
+        'width': width,
+    })
+
+
+def register_responsive_variants(model, field_name, max_width):
+    """
+    Registers the variants of `model.field_name`. Widths above `max_width` (the
+    size the field is stored at) are skipped since they would only upscale.
+    """
+    source_group = ImageFieldSourceGroup(model, field_name)
+    specs = _variant_specs.setdefault((model._meta.label_lower, field_name), [])
+    for fmt in supported_formats():
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            if width > max_width:
+                continue
+            spec = variant_spec(fmt, width)
+            generator_id = '%s:%s:%s:%s%d' % (model._meta.app_label, model._meta.model_name, field_name, fmt, width)
+            register.generator(generator_id, spec)
+            register.source_group(generator_id, source_group)
+            specs.append(spec)
+
+
+def _variant_files(field_file):
+    """Yields an ImageCacheFile per registered variant of `field_file`."""
+    if not owns_file(field_file):
+        return
+    key = (field_file.instance._meta.label_lower, field_file.field.name)
+    for spec in _variant_specs.get(key, ()):
+        yield spec, ImageCacheFile(spec(source=field_file))
+
+
+def generate_variants(field_file):
+    """
+    Writes the variants of `field_file`. Only needed where the image changes
+    without a model save (e.g. queryset updates); saves trigger it on their own.
+    """
+    for _spec, cache_file in _variant_files(field_file):
+        cache_file.generate(force=not is_content_addressed(field_file.name))
+
+
+def srcset(field_file):
+    """
+    Returns `{format: {width: url}}` for `field_file` (empty when it has no
+    variants, see `owns_file`).
+    """
+    variants = {}
+    for spec, cache_file in _variant_files(field_file):
+        variants.setdefault(spec.fmt, {})[spec.width] = cache_file.url
+    return variants
+
+
+@extend_schema_field({
+    'type': 'object',
+    'additionalProperties': {'type': 'object', 'additionalProperties': {'type': 'string', 'format': 'uri'}},
+    'example': {'webp': {'128': 'https://cdn.example.com/CACHE/images/.../a1b2.webp'}},
+})
+class SrcsetField(serializers.ReadOnlyField):
+    """
+    Read-only `{format: {width: url}}` map of an image field's responsive
+    variants; point `source` at the image field.
+    """
+
+    def to_representation(self, value):
+        variants = srcset(value)
+        request = self.context.get('request')
+        if request is not None:
+            for urls in variants.values():
+                for width, url in urls.items():
+                    urls[width] = request.build_absolute_uri(url)
+        return variants
@@ -11,6 +11,8 @@ from .channels_settings import * # CHANNEL_LAYERS
 from .email_settings import *    # EMAIL_*
 from .storage import *           # S3 / storages
 from .third_party import *       # Stripe/Twilio/etc.
+from .services import *          # Service catalog search/feeds
+from .images import *            # Stored images: content addressing, variants
 
 import warnings
 
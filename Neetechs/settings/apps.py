@@ -7,7 +7,7 @@ INSTALLED_APPS = [
     "storages",
      #"dj_rest_auth",
  
-    #"imagekit",
+    "imagekit",
     "payments",
  
     "accounts.apps.AccountsConfig",
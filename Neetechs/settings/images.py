@@ -0,0 +1,13 @@
+"""Neetechs.settings.images — stored image handling (see Neetechs.images)."""
+
+from decouple import Csv, config
+
+# Widths (px) and formats of the variants generated next to each stored image.
+# Formats the installed Pillow cannot encode are skipped (AVIF needs a Pillow
+# built with libavif, or the pillow-avif-plugin package).
+IMAGE_VARIANT_WIDTHS = config("IMAGE_VARIANT_WIDTHS", cast=Csv(int), default="128,256,512")
+IMAGE_VARIANT_FORMATS = config("IMAGE_VARIANT_FORMATS", cast=Csv(), default="webp,avif")
+
+# Store processed uploads of ContentAddressedImageFields under cas/<sha256>
+# so identical uploads are processed and stored once. Off: use `upload_to`.
+MEDIA_CONTENT_ADDRESSED = config("MEDIA_CONTENT_ADDRESSED", cast=bool, default=True)
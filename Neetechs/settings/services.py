@@ -0,0 +1,88 @@
+"""Neetechs.settings.services — knobs for the Service catalog."""
+
+from decouple import config
+
+# Route `?search=` on the service list endpoints through the Postgres
+# full-text index (ServicePost.search_vector) instead of ILIKE scans.
+SERVICE_FULLTEXT_SEARCH = config("SERVICE_FULLTEXT_SEARCH", cast=bool, default=True)
+
+# /services/facets/: cache lifetime per filter fingerprint, and the lower edges
+# of the price buckets (the last bucket is open-ended).
+SERVICE_FACETS_CACHE_SECONDS = config("SERVICE_FACETS_CACHE_SECONDS", cast=int, default=60)
+SERVICE_PRICE_FACET_EDGES = (0, 100, 250, 500, 1000, 2500, 5000)
+
+# /services/facets/price/: default and largest `?buckets=` of the price histogram.
+SERVICE_PRICE_HISTOGRAM_BUCKETS = 10
+SERVICE_PRICE_HISTOGRAM_MAX_BUCKETS = 50
+
+# /services/suggest/: suggestions per kind, shortest query answered, and the
+# per-process prefix cache (entries, seconds).
+SERVICE_SUGGEST_LIMIT = config("SERVICE_SUGGEST_LIMIT", cast=int, default=8)
+SERVICE_SUGGEST_MIN_LENGTH = 2
+SERVICE_SUGGEST_CACHE_SIZE = config("SERVICE_SUGGEST_CACHE_SIZE", cast=int, default=2048)
+SERVICE_SUGGEST_CACHE_SECONDS = config("SERVICE_SUGGEST_CACHE_SECONDS", cast=int, default=60)
+
+# Half-life of the freshness bonus in ServicePost.rank_score (Service.ranking).
+# `manage.py rerank_services` applies the decay; run it every hour or so.
+SERVICE_RANK_HALF_LIFE_HOURS = config("SERVICE_RANK_HALF_LIFE_HOURS", cast=float, default=72)
+
+# /services/<slug>/similar/: neighbours kept per post and the lowest TF-IDF
+# cosine similarity kept (Service.similarity, `manage.py build_similar_services`).
+SERVICE_SIMILAR_COUNT = config("SERVICE_SIMILAR_COUNT", cast=int, default=10)
+SERVICE_SIMILAR_MIN_SCORE = config("SERVICE_SIMILAR_MIN_SCORE", cast=float, default=0.05)
+
+# Write-behind view/impression counters (Service.analytics): a background
+# thread in each process flushes its buffered counts to ServicePostDailyStats
+# every this many seconds (0: right after each request) and early once this
+# many counters are pending.
+SERVICE_ANALYTICS_FLUSH_SECONDS = config("SERVICE_ANALYTICS_FLUSH_SECONDS", cast=int, default=30)
+SERVICE_ANALYTICS_MAX_BUFFERED = config("SERVICE_ANALYTICS_MAX_BUFFERED", cast=int, default=5000)
+# Longest `?days=` window of the owner stats endpoints.
+SERVICE_ANALYTICS_MAX_DAYS = 365
+
+# Posts rewritten per statement (and transaction) when a seller's profile
+# changes and `manage.py sync_seller_snapshots` copies it onto their posts.
+SERVICE_SELLER_SYNC_BATCH_SIZE = config("SERVICE_SELLER_SYNC_BATCH_SIZE", cast=int, default=500)
+
+# Saved searches per user (/services/saved-searches/). New listings are matched
+# on publish; `manage.py notify_saved_searches` pushes the matches.
+SERVICE_SAVED_SEARCH_LIMIT = config("SERVICE_SAVED_SEARCH_LIMIT", cast=int, default=20)
+
+# Most post ids accepted per call of the batch reactions endpoint
+# (/services/reactions/batch/?ids=).
+SERVICE_REACTIONS_BATCH_MAX = config("SERVICE_REACTIONS_BATCH_MAX", cast=int, default=100)
+
+# Location reference bundles (Service.locations): bundles kept for clients
+# holding an older pointer, and how long clients and proxies may cache the
+# pointer (/services/locations/). The bundles themselves are immutable.
+SERVICE_LOCATION_BUNDLES_KEPT = config("SERVICE_LOCATION_BUNDLES_KEPT", cast=int, default=5)
+SERVICE_LOCATION_POINTER_MAX_AGE = config("SERVICE_LOCATION_POINTER_MAX_AGE", cast=int, default=300)
+
+# Near-duplicate posts (Service.duplicates): estimated Jaccard similarity of
+# title + beskrivning from which two posts count as duplicates, and whether new
+# posts that duplicate one of the seller's listed posts get `duplicate_of` set
+# for moderation (they are still created).
+SERVICE_DUPLICATE_THRESHOLD = config("SERVICE_DUPLICATE_THRESHOLD", cast=float, default=0.8)
+SERVICE_DUPLICATE_CHECK = config("SERVICE_DUPLICATE_CHECK", cast=bool, default=True)
+
+# Lifetime of cached ServicePost detail responses (Service.detail_cache). Saves,
+# deletes, reactions and seller picture changes invalidate them earlier.
+SERVICE_DETAIL_CACHE_SECONDS = config("SERVICE_DETAIL_CACHE_SECONDS", cast=int, default=300)
+
+# 'sync' runs the ServicePost image resize/encode inside the request (imagekit
+# default). 'background' stores the raw upload and queues it for
+# `manage.py process_service_images`.
+SERVICE_IMAGE_PROCESSING = config("SERVICE_IMAGE_PROCESSING", default="sync")
+
+# Bulk import (Service.bulk_import): rows validated and inserted per batch,
+# threads fetching/processing image URLs, and the per-download timeout (seconds).
+SERVICE_IMPORT_BATCH_SIZE = config("SERVICE_IMPORT_BATCH_SIZE", cast=int, default=1000)
+SERVICE_IMPORT_IMAGE_WORKERS = config("SERVICE_IMPORT_IMAGE_WORKERS", cast=int, default=8)
+SERVICE_IMPORT_IMAGE_TIMEOUT = config("SERVICE_IMPORT_IMAGE_TIMEOUT", cast=int, default=20)
+
+# Upload limits enforced by Service.utils.validate_service_image. The aspect
+# ratio (width / height) check is off unless a minimum is configured.
+SERVICE_IMAGE_MAX_BYTES = config("SERVICE_IMAGE_MAX_BYTES", cast=int, default=8 * 1024 * 1024)
+SERVICE_IMAGE_MIN_ASPECT_RATIO = config(
+    "SERVICE_IMAGE_MIN_ASPECT_RATIO", cast=lambda v: float(v) if v else None, default=""
+)
@@ -3,6 +3,7 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from accounts.models import User
+from Neetechs.images import SrcsetField
 from Service.models import ModelCategory, ModelSubCategory
 
 from .models import Experience, Interest, CompetenceCertificate, Study
@@ -20,6 +21,7 @@ class ProfileSerializerBase(serializers.ModelSerializer):
     CategoryLastupdate = serializers.SerializerMethodField()
     SubcategoryLastupdate = serializers.SerializerMethodField()
     emailConfirmed = serializers.SerializerMethodField()
+    picture_srcset = SrcsetField(source="picture")
 
     stripeCustomerId = serializers.CharField(
         source="stripe_customer_id", allow_blank=True, allow_null=True, read_only=True
@@ -106,6 +108,7 @@ class ProfileSerializer(ProfileSerializerBase):
             "country",
             "member_since",
             "picture",
+            "picture_srcset",
             "Facebook_link",
             "twitter",
             "profile_completed",
@@ -190,7 +193,7 @@ class AllProfileInfoSerializer(ProfileSerializerBase):
         model = User
         # Specifies all fields to be included for a comprehensive profile view.
         fields = ('id', 'stripeCustomerId', 'emailConfirmed', 'subscriptionType', 'Interest', 'CompetenceCertificate', 'Study', 'Experience', 'CategoryLastupdate', 'SubcategoryLastupdate', 'email', 'name', 'first_name', 'phone', 'site_id', 'is_creator', 'bio', 'rating', 'members',
-		          'followers', 'earning', 'profession', 'picture_medium', 'picture_small', 'picture_tag', 'location', 'address1', 'address2', 'zip_code', 'city', 'state', 'country', 'member_since', 'picture','Facebook_link','twitter','profile_completed','Linkdin_link','sms','othersSocialMedia','about')
+		          'followers', 'earning', 'profession', 'picture_medium', 'picture_small', 'picture_tag', 'location', 'address1', 'address2', 'zip_code', 'city', 'state', 'country', 'member_since', 'picture', 'picture_srcset','Facebook_link','twitter','profile_completed','Linkdin_link','sms','othersSocialMedia','about')
 
     @extend_schema_field(serializers.ListSerializer(child=InterestSerializer()))
     def get_Interest(self, obj):
@@ -9,7 +9,12 @@ from django.contrib import admin
 from .models import ModelComments,ServicePost, ModelState, ModelCountry, ModelCategory,ModelSubCategory
 
 # Register ServicePost and related models
-admin.site.register(ServicePost)
+@admin.register(ServicePost)
+class ServicePostAdmin(admin.ModelAdmin):
+	"""Adds a near-duplicate filter (`duplicate_of`, set by `manage.py cluster_duplicate_services`) for moderation."""
+	list_display = ('title', 'slug', 'employee', 'duplicate_of', 'createdAt')
+	list_filter = (('duplicate_of', admin.EmptyFieldListFilter),)
+	raw_id_fields = ('employee', 'duplicate_of', 'likes', 'disLikes')
 
 # Register category models
 admin.site.register(ModelCategory)
@@ -0,0 +1,168 @@
+"""
+Write-behind view and impression counters for ServicePosts.
+
+Requests never touch the database to count: `record_view(slug)` (detail
+requests, including detail-cache hits) and `record_impressions(post_ids)`
+(posts rendered by list endpoints) add to a per-process buffer under a lock
+and return. A daemon thread per process, started by the first count, flushes
+the buffer into ServicePostDailyStats every SERVICE_ANALYTICS_FLUSH_SECONDS,
+early once SERVICE_ANALYTICS_MAX_BUFFERED keys are pending, and the rest at
+interpreter exit, so no request waits for a flush. A flush is two statements however
+many requests it covers: one query resolving the buffered slugs and ids, and
+one `INSERT ... ON CONFLICT DO UPDATE` adding the counts to each (post, day)
+row, so hot posts never take a row lock per request.
+
+Counts are best effort: a crashed process loses at most one flush interval.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from Service.models import ServicePost, ServicePostDailyStats
+
+logger = logging.getLogger(__name__)
+
+VIEWS = 'views'
+IMPRESSIONS = 'impressions'
+UPSERT_BATCH_SIZE = 1000
+
+
+class CounterBuffer:
+    """
+    Thread-safe `{(kind, post key, day): count}` flushed by its own daemon
+    thread. The thread is (re)started by the first `add()` in each process, so
+    forked workers get their own; counts inherited across a fork are dropped,
+    the parent writes them.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def add(self, kind, keys):
+        day = timezone.localdate()
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start_flusher()
+            for key in keys:
+                self._counts[kind, key, day] += 1
+            due = (
+                len(self._counts) >= settings.SERVICE_ANALYTICS_MAX_BUFFERED
+                or settings.SERVICE_ANALYTICS_FLUSH_SECONDS <= 0
+            )
+        if due:
+            self._wake.set()
+
+    def _start_flusher(self):
+        self._pid = os.getpid()
+        self._counts = Counter()
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, args=(self._wake,), name='service-analytics-flush', daemon=True).start()
+
+    def _run(self, wake):
+        while True:
+            wake.wait(settings.SERVICE_ANALYTICS_FLUSH_SECONDS or None)
+            wake.clear()
+            self.flush()
+            connection.close() # This thread's own connection; reopened by the next flush.
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def flush(self):
+        counts = self.drain()
+        if not counts:
+            return
+        try:
+            write_counts(counts)
+        except Exception:
+            logger.exception('Dropping %d buffered ServicePost counter(s)', len(counts))
+
+
+def write_counts(counts):
+    """
+    Adds `{(kind, post key, day): count}` to ServicePostDailyStats. View keys are
+    slugs and impression keys are post ids; keys of deleted posts are skipped.
+    """
+    slugs = {key for kind, key, _day in counts if kind == VIEWS}
+    ids = {key for kind, key, _day in counts if kind == IMPRESSIONS}
+    existing = ServicePost.objects.filter(Q(slug__in=slugs) | Q(pk__in=ids)).values_list('pk', 'slug')
+    id_of = {}
+    for pk, slug in existing:
+        id_of[VIEWS, slug] = pk
+        id_of[IMPRESSIONS, pk] = pk
+
+    rows = Counter()
+    for (kind, key, day), count in counts.items():
+        post_id = id_of.get((kind, key))
+        if post_id is not None:
+            rows[post_id, day, kind] += count
+    values = {}
+    for (post_id, day, kind), count in rows.items():
+        values.setdefault((post_id, day), {VIEWS: 0, IMPRESSIONS: 0})[kind] = count
+    _upsert([(post_id, day, c[VIEWS], c[IMPRESSIONS]) for (post_id, day), c in values.items()])
+
+
+def _upsert(rows):
+    table = connection.ops.quote_name(ServicePostDailyStats._meta.db_table)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        placeholders = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (post_id, day, views, impressions) VALUES {placeholders} '
+                f'ON CONFLICT (post_id, day) DO UPDATE SET '
+                f'views = {table}.views + EXCLUDED.views, impressions = {table}.impressions + EXCLUDED.impressions',
+                [value for row in batch for value in row],
+            )
+
+
+_buffer = CounterBuffer()
+atexit.register(_buffer.flush)
+
+
+def record_view(slug):
+    """Counts a detail request for the post at `slug`."""
+    _buffer.add(VIEWS, [slug])
+
+
+def record_impressions(post_ids):
+    """Counts one list appearance for each of `post_ids`."""
+    _buffer.add(IMPRESSIONS, post_ids)
+
+
+def flush():
+    """Writes this process's buffered counts now (e.g. before reading them back in tests or scripts)."""
+    _buffer.flush()
+
+
+def daily_stats(stats, days):
+    """
+    Sums the ServicePostDailyStats queryset `stats` per day over the last
+    `days` days (today included, days without counts as zeros):
+    `{'daily': [{'day', 'views', 'impressions'}, ...], 'totals': {'views', 'impressions'}}`.
+    """
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    counted = {
+        row['day']: row
+        for row in stats.filter(day__gte=since).values('day').annotate(views=Sum('views'), impressions=Sum('impressions')).order_by()
+    }
+    daily = [
+        counted.get(day, {'day': day, VIEWS: 0, IMPRESSIONS: 0})
+        for day in (since + timedelta(days=offset) for offset in range(days))
+    ]
+    totals = {kind: sum(row[kind] for row in daily) for kind in (VIEWS, IMPRESSIONS)}
+    return {'daily': daily, 'totals': totals}
@@ -0,0 +1,202 @@
+"""Filter backends for the Service API list endpoints."""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import FieldDoesNotExist
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from Service.api.serializers import SparseFieldsetMixin
+from Service.models import SEARCH_CONFIG
+
+
+class ServiceSearchFilter(SearchFilter):
+    """
+    `?search=` backed by the GIN-indexed `ServicePost.search_vector`.
+
+    Matches are ranked with `ts_rank` (best first, newest first on ties). An
+    explicit `?ordering=` still wins because OrderingFilter runs afterwards.
+    With `SERVICE_FULLTEXT_SEARCH` off this is the stock ILIKE SearchFilter
+    over the view's `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not getattr(settings, "SERVICE_FULLTEXT_SEARCH", False):
+            return super().filter_queryset(request, queryset, view)
+
+        terms = " ".join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "-updatedAt", "-id")
+        )
+
+
+class SparseFieldsFilter(BaseFilterBackend):
+    """
+    Loads only what the view's serializer renders (after `?fields=`/`?omit=`, see
+    SparseFieldsetMixin): `.only()` on the columns it reads, `select_related` for
+    related columns and prefetches for to-many fields. Views whose serializer is
+    not sparse-aware (e.g. the write serializers) are left alone.
+
+    The pk and the columns of the active ordering are always loaded: cursor
+    pagination reads its position from them on every row, so deferring one
+    would cost a query per row. Must run after OrderingFilter.
+    """
+
+    @staticmethod
+    def ordering_columns(queryset, view):
+        """`.only()` paths of the columns the queryset's ordering and the view's cursor paginator read."""
+        query = queryset.query
+        ordering = [name for name in query.order_by if isinstance(name, str)]
+        if not ordering and query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        paginator = getattr(view, "paginator", None)
+        cursor_ordering = getattr(paginator, "ordering", None) or getattr(getattr(paginator, "cursor_class", None), "ordering", ())
+        ordering += [cursor_ordering] if isinstance(cursor_ordering, str) else cursor_ordering
+        columns = {"pk"}
+        for name in ordering:
+            name = name.lstrip("-")
+            if name == "?" or name in query.annotations:
+                continue
+            try:
+                field = queryset.model._meta.get_field(name.split("__")[0])
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                columns.add(name)
+        return columns
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = view.get_serializer()
+        if not isinstance(serializer, SparseFieldsetMixin):
+            return queryset
+        columns = serializer.model_columns() | self.ordering_columns(queryset, view)
+        relations = {column.split("__")[0] for column in columns if "__" in column}
+        queryset = queryset.select_related(None)
+        if relations:  # select_related() without arguments would follow every FK
+            queryset = queryset.select_related(*relations)
+        return queryset.prefetch_related(*serializer.prefetches()).only(*columns)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": SparseFieldsetMixin.fields_param,
+                "required": False,
+                "in": "query",
+                "description": "Comma-separated fields to return (default: all).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": SparseFieldsetMixin.omit_param,
+                "required": False,
+                "in": "query",
+                "description": "Comma-separated fields to leave out.",
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+class AvailabilityFilter(BaseFilterBackend):
+    """
+    `?available_from=&available_to=`: posts whose availability window
+    (`tillganligFran`..`tillganligTill`) overlaps the requested one, answered
+    by the GiST index on the `ServicePost.availability` range. Either bound
+    may be left out for an open-ended window; `available_from=X&available_to=X`
+    asks for posts available at X.
+    """
+
+    from_param = "available_from"
+    to_param = "available_to"
+    query_param_names = (from_param, to_param)
+
+    def get_bound(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return serializers.DateTimeField().to_internal_value(value)
+        except ValidationError as exc:
+            raise ValidationError({param: exc.detail})
+
+    def filter_queryset(self, request, queryset, view):
+        lower = self.get_bound(request, self.from_param)
+        upper = self.get_bound(request, self.to_param)
+        if lower is None and upper is None:
+            return queryset
+        if lower is not None and upper is not None and lower > upper:
+            raise ValidationError({self.to_param: ["Must not be before %s." % self.from_param]})
+        return queryset.filter(availability__overlap=DateTimeTZRange(lower, upper, "[]"))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.from_param,
+                "required": False,
+                "in": "query",
+                "description": "Start of the window the service must be available in (ISO 8601).",
+                "schema": {"type": "string", "format": "date-time"},
+            },
+            {
+                "name": self.to_param,
+                "required": False,
+                "in": "query",
+                "description": "End of the window the service must be available in (ISO 8601).",
+                "schema": {"type": "string", "format": "date-time"},
+            },
+        ]
+
+
+class PriceRangeFilter(BaseFilterBackend):
+    """
+    `?pris_min=&pris_max=`: posts priced within the inclusive range, answered
+    by the `(is_listed, pris)` index. Either bound may be left out.
+    """
+
+    min_param = "pris_min"
+    max_param = "pris_max"
+    query_param_names = (min_param, max_param)
+
+    def get_bound(self, request, param):
+        value = request.query_params.get(param)
+        if value in (None, ""):
+            return None
+        try:
+            return serializers.IntegerField().to_internal_value(value)
+        except ValidationError as exc:
+            raise ValidationError({param: exc.detail})
+
+    def filter_queryset(self, request, queryset, view):
+        low = self.get_bound(request, self.min_param)
+        high = self.get_bound(request, self.max_param)
+        if low is not None and high is not None and low > high:
+            raise ValidationError({self.max_param: ["Must not be below %s." % self.min_param]})
+        if low is not None:
+            queryset = queryset.filter(pris__gte=low)
+        if high is not None:
+            queryset = queryset.filter(pris__lte=high)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.min_param,
+                "required": False,
+                "in": "query",
+                "description": "Lowest price (inclusive).",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.max_param,
+                "required": False,
+                "in": "query",
+                "description": "Highest price (inclusive).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,77 @@
+"""Pagination classes for the Service API list endpoints."""
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ServiceFeedCursorPagination(CursorPagination):
+    """
+    Keyset pagination over `(-updatedAt, id)`, matching the
+    `service_post_feed_idx` index, so every page costs the same no matter how
+    deep the client scrolls. No COUNT(*) and no OFFSET scans.
+    """
+
+    ordering = ("-updatedAt", "id")
+
+
+class ServiceRankCursorPagination(CursorPagination):
+    """Keyset pagination over `(-rank_score, id)`, matching `service_post_rank_idx`."""
+
+    ordering = ("-rank_score", "id")
+
+
+class ServiceCommentCursorPagination(CursorPagination):
+    """
+    A post's comments, oldest first, in keyset order over `(created, id)`;
+    with the post filter this walks `service_comment_post_idx`.
+    """
+
+    ordering = ("created", "id")
+
+
+class ServiceFeedPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; opt into cursor pagination with
+    `?paginate=cursor`. The `next`/`previous` links returned in cursor mode
+    carry both `paginate` and `cursor`, so clients just follow them.
+    """
+
+    mode_query_param = "paginate"
+    cursor_mode = "cursor"
+    cursor_class = ServiceFeedCursorPagination
+
+    def __init__(self):
+        self._cursor_paginator = None
+
+    def _wants_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self._wants_cursor(request):
+            self._cursor_paginator = self.cursor_class()
+            return self._cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self._cursor_paginator is not None:
+            return self._cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for keyset pagination (follow the `next`/`previous` links).",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+            *self.cursor_class().get_schema_operation_parameters(view),
+        ]
+
+
+class ServiceRankPagination(ServiceFeedPagination):
+    """ServiceFeedPagination for feeds in `rank_score` order."""
+
+    cursor_class = ServiceRankCursorPagination
@@ -1,14 +1,24 @@
 import os
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core import serializers as ser
 from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.validators import validate_image_file_extension
+from django.db.models import Prefetch
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.serializers import ImageField
 
-from Service.models import (ModelCategory, ModelComments, ModelCountry,
-                            ModelState, ModelSubCategory, ServicePost)
+from Neetechs.images import SrcsetField
+from Service.duplicates import find_duplicates
+from Service.facets import EQUAL_WIDTH, HISTOGRAM_MODES
+from Service.image_pipeline import enqueue_image_uploads, pop_image_uploads
+from Service.models import (SERVICE_IMAGE_FIELDS, ModelCategory,
+                            ModelComments, ModelCountry, ModelState,
+                            ModelSubCategory, SavedSearch, ServicePost)
+from Service.reactions import DISLIKE, LIKE, reactions_for_user
+from Service.utils import validate_service_image
 
 #from rest_framework_recaptcha.fields import ReCaptchaField # Assuming not used as per cleanup instruction for ServicePostCreateSerializer
 
@@ -17,6 +27,12 @@ IMAGE_SIZE_MAX_BYTES = 2000 * 2000 * 8  # 8MB - Maximum allowed size for image u
 MIN_TITLE_LENGTH = 3 # Minimum allowed length for title fields.
 MIN_BODY_LENGTH = 20 # Minimum allowed length for body/description fields.
 
+# Upload validation for the ServicePost image fields on the write serializers.
+IMAGE_FIELD_KWARGS = {
+	name: {'validators': [validate_image_file_extension, validate_service_image]}
+	for name in SERVICE_IMAGE_FIELDS
+}
+
 
 
 class SubCategorySerializer(serializers.ModelSerializer):
@@ -32,11 +48,12 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
 	via the `get_SubCategorys` method.
 	"""
 	children = serializers.SerializerMethodField('get_SubCategorys') # Field to embed subcategories.
+	img_srcset = SrcsetField(source='img') # WebP/AVIF variants of `img` by width.
 
 	class Meta:
 		model = ModelCategory
 		# Specifies fields to include in the serialized output.
-		fields = ['pk', 'name', 'img', 'children']
+		fields = ['pk', 'name', 'img', 'img_srcset', 'children']
 		ref_name = "ServiceCategory"
 
 	@extend_schema_field(SubCategorySerializer(many=True))
@@ -110,15 +127,91 @@ class CommentsSerializer(serializers.ModelSerializer):
         fields = '__all__' # Includes all fields from the ModelComments model.
 
 
-class ServicePostSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+	"""
+	Lets clients pick the rendered fields: `?fields=a,b` keeps only those, `?omit=c,d`
+	drops those (unknown names are ignored). Dropped fields are never evaluated, so
+	their SerializerMethodField lookups are skipped too.
+
+	`model_columns()` and `prefetches()` describe what the remaining fields read, for
+	Service.api.filters.SparseFieldsFilter to narrow the query with.
+	"""
+	fields_param = 'fields'
+	omit_param = 'omit'
+	field_columns = {} # Field name -> model columns it reads, for fields whose `source` is not a column.
+	field_prefetches = {} # Field name -> prefetch_related lookup for to-many fields.
+
+	def requested_names(self, param):
+		request = self.context.get('request')
+		value = getattr(request, 'query_params', {}).get(param, '')
+		return {name.strip() for name in value.split(',') if name.strip()}
+
+	def get_fields(self):
+		fields = super().get_fields()
+		keep = self.requested_names(self.fields_param)
+		omit = self.requested_names(self.omit_param)
+		for name in list(fields):
+			if (keep and name not in keep) or name in omit:
+				del fields[name]
+		return fields
+
+	def model_columns(self):
+		"""`.only()` paths of the columns read by the rendered fields."""
+		columns = set()
+		for name, field in self.fields.items():
+			if name in self.field_columns:
+				columns.update(self.field_columns[name])
+			elif name not in self.field_prefetches and field.source not in ('*', 'pk'):
+				columns.add(field.source.replace('.', '__'))
+		return columns
+
+	def prefetches(self):
+		return [lookup for name, lookup in self.field_prefetches.items() if name in self.fields]
+
+
+class ServicePostListSerializer(serializers.ListSerializer):
 	"""
-	Serializes ServicePost instances for read operations, including related employee
-	information like site_id and profile picture URL.
+	List serializer for ServicePostSerializer. In `?reactions=counts` mode it loads
+	the requesting user's reactions for the whole page up front, so `user_reaction`
+	costs two queries per page instead of one per post.
+	"""
+
+	def to_representation(self, data):
+		posts = list(data.all() if hasattr(data, 'all') else data)
+		if self.child.reaction_counts_mode():
+			user = self.child.request_user()
+			self.context['user_reactions'] = reactions_for_user(
+				user.pk if user else None, [post.pk for post in posts])
+		return super().to_representation(posts)
+
+
+class ServicePostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+	"""
+	Serializes ServicePost instances for read operations, including the seller's
+	name, about text, site_id and profile picture URL, read from the post's own
+	copies (SELLER_SNAPSHOT_FIELDS), so rendering never touches the employee.
 	It also explicitly formats DateTimeFields.
+
+	With `?reactions=counts` the unbounded `likes`/`disLikes` id lists are replaced by
+	`user_reaction` ('like', 'dislike' or null for the requesting user); the
+	`like_count`/`dislike_count` columns are always included. `comment_count` is
+	the cached number of comments (see `/services/<slug>/comments/`).
+
+	Supports `?fields=`/`?omit=` (SparseFieldsetMixin), e.g. a card view with
+	`?fields=pk,slug,title,pris,image_srcset`.
 	"""
-	site_id = serializers.SerializerMethodField('get_site_id_from_employee') # Custom field for employee's site_id.
-	picture = serializers.SerializerMethodField( # Custom field for employee's profile picture URL.
+	user_reaction = serializers.SerializerMethodField() # Requesting user's reaction; `?reactions=counts` only.
+	image_state = serializers.SerializerMethodField() # 'processing' while background image jobs are pending, else 'ready'.
+	picture = serializers.SerializerMethodField( # Seller's profile picture URL.
 	    'get_profilepicture_from_employee', required=False)
+	picture_srcset = SrcsetField(source='seller_picture_file') # WebP/AVIF variants of the seller's picture by width.
+
+	# WebP/AVIF variants of each image by width; the `image*` fields keep the original PNG.
+	image_srcset = SrcsetField(source='image')
+	image2_srcset = SrcsetField(source='image2')
+	image3_srcset = SrcsetField(source='image3')
+	image4_srcset = SrcsetField(source='image4')
+	image5_srcset = SrcsetField(source='image5')
 
 	# Explicitly defining DateTimeField formats for consistent API output.
 	createdAt = serializers.DateTimeField(
@@ -131,22 +224,60 @@ class ServicePostSerializer(serializers.ModelSerializer):
 	class Meta:
 		model = ServicePost
 		# Includes most fields from ServicePost, plus custom method fields.
-		fields = ['pk', 'expiration_date', 'stripeId', 'createdAt', 'enhet', 'likes', 'disLikes', 'picture', 'updatedAt', 'bedomning', 'title', 'AboutSeller', 'sellerName', 'slug', 'pris',
-		    'site_id', 'image', 'image2', 'image3', 'image4', 'image5', 'beskrivning', 'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
-
-	@extend_schema_field(serializers.CharField())
-	def get_site_id_from_employee(self, service_post):
-		"""Retrieves the site_id of the employee associated with the service post."""
-		site_id = service_post.employee.site_id
-		return site_id
-
-	@extend_schema_field(serializers.URLField())
+		fields = ['pk', 'expiration_date', 'stripeId', 'createdAt', 'enhet', 'likes', 'disLikes', 'like_count', 'dislike_count', 'comment_count', 'user_reaction', 'image_state', 'picture', 'picture_srcset', 'updatedAt', 'bedomning', 'title', 'AboutSeller', 'sellerName', 'slug', 'pris',
+		    'site_id', 'image', 'image2', 'image3', 'image4', 'image5', 'image_srcset', 'image2_srcset', 'image3_srcset', 'image4_srcset', 'image5_srcset', 'beskrivning', 'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
+		list_serializer_class = ServicePostListSerializer
+
+	field_columns = {
+		'user_reaction': (),
+		'image_state': ('images_pending',),
+		'picture': ('seller_picture',),
+		'picture_srcset': ('seller_picture',),
+	}
+	field_prefetches = {
+		'likes': Prefetch('likes', queryset=get_user_model().objects.only('pk')),
+		'disLikes': Prefetch('disLikes', queryset=get_user_model().objects.only('pk')),
+	}
+
+	def request_user(self):
+		"""Returns the authenticated user of the serializer's request, if any."""
+		request = self.context.get('request')
+		user = getattr(request, 'user', None)
+		return user if user is not None and user.is_authenticated else None
+
+	def reaction_counts_mode(self):
+		"""True when the request asked for `?reactions=counts`."""
+		request = self.context.get('request')
+		return getattr(request, 'query_params', {}).get('reactions') == 'counts'
+
+	def get_fields(self):
+		fields = super().get_fields()
+		if self.reaction_counts_mode():
+			fields.pop('likes', None)
+			fields.pop('disLikes', None)
+		else:
+			fields.pop('user_reaction', None)
+		return fields
+
+	@extend_schema_field(serializers.ChoiceField(choices=[LIKE, DISLIKE], allow_null=True))
+	def get_user_reaction(self, service_post):
+		"""Returns the requesting user's reaction to the post (prefetched per page by ServicePostListSerializer)."""
+		user_reactions = self.context.get('user_reactions')
+		if user_reactions is None:
+			user = self.request_user()
+			user_reactions = reactions_for_user(user.pk if user else None, [service_post.pk])
+		return user_reactions.get(service_post.pk)
+
+	@extend_schema_field(serializers.ChoiceField(choices=['processing', 'ready']))
+	def get_image_state(self, service_post):
+		"""Reports whether uploaded images are still queued for background processing."""
+		return 'processing' if service_post.images_pending else 'ready'
+
+	@extend_schema_field(serializers.URLField(allow_null=True))
 	def get_profilepicture_from_employee(self, service_post):
-		"""Retrieves the URL of the profile picture for the employee associated with the service post."""
-		# Note: Accessing .url might cause issues if the image file doesn't exist or storage fails.
-		# Consider adding error handling or using a method that safely gets the URL.
-		picture = service_post.employee.picture.url
-		return picture
+		"""Returns the URL of the seller's profile picture (from the post's `seller_picture` copy)."""
+		picture = service_post.seller_picture_file
+		return picture.url if picture else None
 
 	def validate_image_url(self, service_post):
 		"""Removes query parameters from the main image URL, if present."""
@@ -189,62 +320,113 @@ class ServicePostSerializer(serializers.ModelSerializer):
 		return new_url
 
 
-class ServicePostUpdateSerializer(serializers.ModelSerializer):
+class PriceHistogramQuerySerializer(serializers.Serializer):
+	"""Query parameters of the price histogram (`?buckets=&mode=`)."""
+	buckets = serializers.IntegerField(min_value=1, max_value=settings.SERVICE_PRICE_HISTOGRAM_MAX_BUCKETS, default=settings.SERVICE_PRICE_HISTOGRAM_BUCKETS)
+	mode = serializers.ChoiceField(choices=HISTOGRAM_MODES, default=EQUAL_WIDTH)
+
+
+class ServiceStatsQuerySerializer(serializers.Serializer):
+	"""Query parameters of the owner stats endpoints (`?days=`)."""
+	days = serializers.IntegerField(min_value=1, max_value=settings.SERVICE_ANALYTICS_MAX_DAYS, default=30)
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
 	"""
-	Serializer for updating existing ServicePost instances.
-	Includes a specific subset of fields that are considered updatable.
+	A saved search: exact category/underCategory/country/state/city values
+	(blank for any) and an inclusive pris range, as in servicesListAPIView's
+	filters. At least one of category, city and country is required.
 	"""
+
 	class Meta:
-		model = ServicePost
-		# Specifies the fields that can be updated.
-		# Note: 'expiration_date' is listed twice.
-		fields = ['title', 'expiration_date', 'expiration_date', 'stripeId', 'pris', 'enhet', 'image', 'image2', 'image3', 'image4',
-		    'image5', 'beskrivning', 'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
+		model = SavedSearch
+		fields = ['id', 'name', 'category', 'underCategory', 'country', 'state', 'city', 'pris_min', 'pris_max', 'notify', 'createdAt']
+		read_only_fields = ['createdAt']
+
+	def validate(self, attrs):
+		values = {**{name: getattr(self.instance, name) for name in self.Meta.fields if self.instance is not None}, **attrs}
+		if not any(values.get(name) for name in SavedSearch.MATCH_KEY_FIELDS):
+			raise serializers.ValidationError('Set at least one of category, city and country.')
+		if values.get('pris_min') is not None and values.get('pris_max') is not None and values['pris_min'] > values['pris_max']:
+			raise serializers.ValidationError({'pris_max': ['Must not be below pris_min.']})
+		return attrs
 
 
-# TODO: Review this custom validate() method. If image validation logic is still needed, integrate it properly or remove this block.
-"""
-	def validate(self, service_post):
+class ReactionStatesQuerySerializer(serializers.Serializer):
+	"""Query parameters of the batch reactions endpoint (`?ids=1,2,3`)."""
+	ids = serializers.CharField(help_text='Comma-separated ServicePost ids, at most SERVICE_REACTIONS_BATCH_MAX.')
+
+	def validate_ids(self, value):
 		try:
-			title = service_post['title']
-			if len(title) < MIN_TITLE_LENGTH:
-				raise serializers.ValidationError(
-				    {"response": "Enter a title longer than " + str(MIN_TITLE_LENGTH) + " characters."})
+			ids = {int(part) for part in value.split(',') if part.strip()}
+		except ValueError:
+			raise serializers.ValidationError('Expected comma-separated integers.')
+		if not ids:
+			raise serializers.ValidationError('Pass at least one id.')
+		if len(ids) > settings.SERVICE_REACTIONS_BATCH_MAX:
+			raise serializers.ValidationError('Pass at most %d ids.' % settings.SERVICE_REACTIONS_BATCH_MAX)
+		return sorted(ids)
 
-			beskrivning = service_post['beskrivning']
-			if len(beskrivning) < MIN_BODY_LENGTH:
-				raise serializers.ValidationError(
-				    {"response": "Enter a body longer than " + str(MIN_BODY_LENGTH) + " characters."})
 
-			image = service_post['image']
-			url = os.path.join(settings.TEMP , str(image))
-			storage = FileSystemStorage(location=url)
+class ServicePostImportSerializer(serializers.ModelSerializer):
+	"""
+	Validates one row of a bulk import (Service.bulk_import). Same fields as
+	ServicePostCreateSerializer, except that images are given as URLs, fetched
+	after the rows are inserted.
+	"""
+	image = serializers.URLField(required=False, allow_blank=True)
+	image2 = serializers.URLField(required=False, allow_blank=True)
+	image3 = serializers.URLField(required=False, allow_blank=True)
+	image4 = serializers.URLField(required=False, allow_blank=True)
+	image5 = serializers.URLField(required=False, allow_blank=True)
 
-			with storage.open('', 'wb+') as destination:
-				for chunk in image.chunks():
-					destination.write(chunk)
-				destination.close()
+	class Meta:
+		model = ServicePost
+		fields = ['title', 'expiration_date', 'stripeId', 'enhet', 'pris', 'image', 'image2', 'image3', 'image4', 'image5', 'beskrivning',
+		    'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
 
-			# Check image size
-			if not is_image_size_valid(url, IMAGE_SIZE_MAX_BYTES):
-				os.remove(url)
-				raise serializers.ValidationError(
-				    {"response": "That image is too large. Images must be less than 2 MB. Try a different image."})
 
-			# Check image aspect ratio
-			if not is_image_aspect_ratio_valid(url):
-				os.remove(url)
-				raise serializers.ValidationError(
-				    {"response": "Image height must not exceed image width. Try a different image."})
+class ServiceImportRequestSerializer(serializers.Serializer):
+	"""Upload for the staff bulk import endpoint."""
+	file = serializers.FileField() # CSV with a header row, or JSON Lines; columns as in ServicePostImportSerializer.
+	employee = serializers.SlugRelatedField(slug_field='email', queryset=get_user_model().objects.all()) # Seller the posts are created for.
+	format = serializers.ChoiceField(choices=('csv', 'jsonl'), required=False) # Defaults from the file extension.
 
-			os.remove(url)
-		except KeyError:
-			pass
-		return service_post
-"""
 
+class DeferredImagesMixin:
+	"""
+	Hands image uploads to Service.image_pipeline when SERVICE_IMAGE_PROCESSING is
+	'background', so create/update return without resizing or encoding images.
+	"""
+
+	def create(self, validated_data):
+		uploads = pop_image_uploads(validated_data)
+		instance = super().create(validated_data)
+		enqueue_image_uploads(instance, uploads)
+		return instance
 
-class ServicePostCreateSerializer(serializers.ModelSerializer):
+	def update(self, instance, validated_data):
+		uploads = pop_image_uploads(validated_data)
+		instance = super().update(instance, validated_data)
+		enqueue_image_uploads(instance, uploads)
+		return instance
+
+
+class ServicePostUpdateSerializer(DeferredImagesMixin, serializers.ModelSerializer):
+	"""
+	Serializer for updating existing ServicePost instances.
+	Includes a specific subset of fields that are considered updatable.
+	"""
+	class Meta:
+		model = ServicePost
+		# Specifies the fields that can be updated.
+		# Note: 'expiration_date' is listed twice.
+		fields = ['title', 'expiration_date', 'expiration_date', 'stripeId', 'pris', 'enhet', 'image', 'image2', 'image3', 'image4',
+		    'image5', 'beskrivning', 'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
+		extra_kwargs = IMAGE_FIELD_KWARGS # Streaming size / header checks (Service.utils.validate_service_image).
+
+
+class ServicePostCreateSerializer(DeferredImagesMixin, serializers.ModelSerializer):
 	"""
 	Serializer for creating new ServicePost instances.
 	Defines the fields required for creating a new service post.
@@ -259,6 +441,22 @@ class ServicePostCreateSerializer(serializers.ModelSerializer):
 		# Specifies the fields available during the creation of a ServicePost.
 		fields = ['title','expiration_date','stripeId','enhet', 'employee', 'pris', 'image', 'image2', 'image3', 'image4', 'image5', 'beskrivning', 'status', 'tillganligFran', 'tillganligTill', 'category', 'underCategory', 'country', 'state', 'city']
 		read_only_fields = ['employee']
+		extra_kwargs = IMAGE_FIELD_KWARGS # Streaming size / header checks (Service.utils.validate_service_image).
+
+	def validate(self, attrs):
+		"""
+		Flags reposts for moderation: a near duplicate (Service.duplicates) of one of the
+		requesting seller's listed posts is created with `duplicate_of` pointing at the
+		closest one. Expired or unlisted posts may be reposted freely.
+		"""
+		attrs = super().validate(attrs)
+		request = self.context.get('request')
+		user = getattr(request, 'user', None)
+		if settings.SERVICE_DUPLICATE_CHECK and user is not None and user.is_authenticated:
+			duplicates = find_duplicates(attrs.get('title'), attrs.get('beskrivning'), ServicePost.objects.filter(employee=user, is_listed=True))
+			if duplicates:
+				attrs['duplicate_of'] = duplicates[0][0]
+		return attrs
 	
 # TODO: CRITICAL REVIEW - This custom save() method manually handles instance creation, file saving, and validation.
 # This is highly unconventional for DRF ModelSerializers and prone to errors.
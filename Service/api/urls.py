@@ -12,7 +12,23 @@ from Service.api.views import (
     CountryViewSet,
     DisLikesViewSet,
     LikesViewSet,
+    LocationBundleContentView,
+    LocationBundleView,
     PostLikesAPIView,
+    SavedSearchDetailView,
+    SavedSearchListView,
+    SavedSearchMatchesView,
+    SellerStatsView,
+    ServiceCommentsView,
+    ServiceExportView,
+    ServiceFacetsView,
+    ServiceFeaturedView,
+    ServiceImportView,
+    ServicePriceHistogramView,
+    ServiceReactionStatesView,
+    ServiceStatsView,
+    ServiceSuggestView,
+    SimilarServicesView,
     StateViewSet,
     SubCategoryViewSet,
     api_create_service_view,
@@ -38,9 +54,10 @@ service_collection_view = ServicePostViewSet.as_view({"get": "list"})
 @api_view(["GET", "POST"])
 def services_collection(request, *args, **kwargs):
     """List services (GET) or create a service (POST)."""
+    # Hand the inner views the HttpRequest; they wrap it in their own Request.
     if request.method == "POST":
-        return api_create_service_view(request)
-    return service_collection_view(request, *args, **kwargs)
+        return api_create_service_view(request._request)
+    return service_collection_view(request._request, *args, **kwargs)
 
 
 @extend_schema(methods=["GET"], responses=ServicePostSerializer)
@@ -54,15 +71,15 @@ def services_collection(request, *args, **kwargs):
 def services_detail(request, slug, *args, **kwargs):
     """Retrieve, update, or delete a service post."""
     if request.method == "GET":
-        return api_detail_service_view(request, slug=slug)
+        return api_detail_service_view(request._request, slug=slug)
     if request.method == "PUT":
-        return api_update_service_view(request, slug=slug)
-    return api_delete_service_view(request, slug=slug)
+        return api_update_service_view(request._request, slug=slug)
+    return api_delete_service_view(request._request, slug=slug)
 
 
 urlpatterns = [
     path("", services_collection, name="collection"),
-    path("featured/", ApiServiceListView.as_view(), name="featured"),
+    path("featured/", ServiceFeaturedView.as_view(), name="featured"),
     path("filters/search/", servicesListAPIView.as_view(), name="filters-search"),
     path("filters/category/", CategoryViewSet.as_view(), name="filters-category"),
     path("filters/sub_category/", SubCategoryViewSet.as_view(), name="filters-sub-category"),
@@ -73,10 +90,25 @@ urlpatterns = [
     path("filters/likes/", LikesViewSet.as_view(), name="filters-likes"),
     path("filters/dislikes/", DisLikesViewSet.as_view(), name="filters-dislikes"),
     path("search/", servicesListAPIView.as_view(), name="search"),
+    path("facets/", ServiceFacetsView.as_view(), name="facets"),
+    path("facets/price/", ServicePriceHistogramView.as_view(), name="facets-price"),
+    path("suggest/", ServiceSuggestView.as_view(), name="suggest"),
     path("list/", ApiServiceListView.as_view(), name="list"),
+    path("export.ndjson", ServiceExportView.as_view(), name="export"),
+    path("import/", ServiceImportView.as_view(), name="import"),
+    path("stats/", SellerStatsView.as_view(), name="seller-stats"),
+    path("locations/", LocationBundleView.as_view(), name="locations"),
+    path("locations/<slug:version>.json", LocationBundleContentView.as_view(), name="locations-bundle"),
+    path("saved-searches/", SavedSearchListView.as_view(), name="saved-searches"),
+    path("saved-searches/<int:pk>/", SavedSearchDetailView.as_view(), name="saved-search-detail"),
+    path("saved-searches/<int:pk>/matches/", SavedSearchMatchesView.as_view(), name="saved-search-matches"),
     path("likes/toggle/", PostLikesAPIView.as_view(), name="likes-toggle"),
     path("<slug:slug>/is-employee/", api_is_employee_of_servicepost, name="is-employee"),
     path("reactions/", PostLikesAPIView.as_view(), name="reactions"),
+    path("reactions/batch/", ServiceReactionStatesView.as_view(), name="reactions-batch"),
     path("<slug:slug>/ownership/", api_is_employee_of_servicepost, name="ownership"),
+    path("<slug:slug>/comments/", ServiceCommentsView.as_view(), name="comments"),
+    path("<slug:slug>/similar/", SimilarServicesView.as_view(), name="similar"),
+    path("<slug:slug>/stats/", ServiceStatsView.as_view(), name="stats"),
     path("<slug:slug>/", services_detail, name="detail"),
 ]
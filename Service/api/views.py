@@ -2,17 +2,23 @@
 API views for managing services, categories, comments, likes/dislikes,
 and related data for the Service application.
 """
+import hashlib
+import json
+
 #from Service.utils import rotate_image # Assuming not used as per cleanup instruction for api_create_service_view
-from django.db.models.query_utils import Q
-from django.utils import timezone
-from drf_spectacular.utils import OpenApiResponse, OpenApiTypes, extend_schema
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, OpenApiTypes, extend_schema
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.generics import ListAPIView
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets,views
 
@@ -20,16 +26,31 @@ from rest_framework import viewsets,views
 from knox.auth import TokenAuthentication
 #from rest_framework.authentication import TokenAuthentication # Removed as per cleanup
 
-from Service.models import ModelComments,ServicePost,ModelCategory,ModelSubCategory,ModelCountry,ModelState
+from Service.api.filters import AvailabilityFilter, PriceRangeFilter, ServiceSearchFilter, SparseFieldsFilter
+from Service.analytics import daily_stats, record_impressions, record_view
+from Service.api.pagination import ServiceCommentCursorPagination, ServiceFeedPagination, ServiceRankPagination
+from Service.bulk_import import guess_format, import_services
+from Service.detail_cache import cache_detail_response, cached_detail_response, detail_version
+from Service.export import CONTENT_TYPE as NDJSON_CONTENT_TYPE, export_lines
+from Service.facets import facet_counts, price_histogram
+from Service.locations import BUNDLE_MAX_AGE as LOCATION_BUNDLE_MAX_AGE, bundle_content, current_bundle, rebuild_location_bundle
+from Service.models import ModelComments,SavedSearch,ServicePost,ServicePostDailyStats,ModelCategory,ModelSubCategory,ModelCountry,ModelState
+from Service.reactions import add_dislike, add_like, reaction_states, remove_dislike, remove_like
+from Service.suggest import suggest
 from Service.api.serializers import (
     CitySerializer,
     CountrySerializer,
     DisLikesSerializer,
     LikesSerializer,
+    PriceHistogramQuerySerializer,
+    ReactionStatesQuerySerializer,
+    SavedSearchSerializer,
     ServiceCategorySerializer,
     ServicePostCreateSerializer,
     ServicePostSerializer,
     ServicePostUpdateSerializer,
+    ServiceImportRequestSerializer,
+    ServiceStatsQuerySerializer,
     StateSerializer,
     SubCategorySerializer,
     CommentsSerializer,
@@ -62,30 +83,42 @@ class SubCategoryViewSet(ListAPIView):
 	queryset = ModelSubCategory.objects.all().order_by('Category') # Retrieves all subcategories, ordered by their parent category.
 
 class CountryViewSet(ListAPIView):
-	"""Lists all countries (ModelCountry instances)."""
+	"""
+	Lists all countries (ModelCountry instances).
+	Apps should load the cached location bundle instead (LocationBundleView).
+	"""
 	authentication_classes = (TokenAuthentication,)
 	permission_classes = (IsAuthenticatedOrReadOnly,)
 	serializer_class = CountrySerializer # Serializer for ModelCountry instances.
 	queryset = ModelCountry.objects.all() # Retrieves all ModelCountry objects.
 
 class StateViewSet(ListAPIView):
-	"""Lists all states/regions (ModelState instances)."""
+	"""
+	Lists all states/regions (ModelState instances).
+	Apps should load the cached location bundle instead (LocationBundleView).
+	"""
 	authentication_classes = (TokenAuthentication,)
 	permission_classes = (IsAuthenticatedOrReadOnly,)
 	serializer_class = StateSerializer # Serializer for ModelState instances.
 	queryset = ModelState.objects.all() # Retrieves all ModelState objects.
 
 class CityViewSet(ListAPIView):
-	"""Lists distinct city names found in ServicePost instances."""
+	"""
+	Lists distinct city names found in ServicePost instances.
+	Apps should load the cached location bundle instead (LocationBundleView).
+	"""
 	authentication_classes = (TokenAuthentication,)
 	permission_classes = (IsAuthenticatedOrReadOnly,)
 	serializer_class = CitySerializer # Serializer for city data (likely a custom serializer for distinct values).
 	queryset = ServicePost.objects.values('city').distinct() # Retrieves unique city values from ServicePost.
 
 
+@extend_schema(deprecated=True)
 class LikesViewSet(ListAPIView):
 	"""
 	Lists likes for all ServicePost instances.
+	Superseded by ServiceReactionStatesView (`/services/reactions/batch/?ids=`),
+	which returns counts and the caller's reaction for just the posts asked for.
 	NOTE: This view uses ServicePost as its queryset and LikesSerializer.
 	This implies LikesSerializer is designed to work with ServicePost,
 	likely to show users who liked a post or the count of likes.
@@ -96,6 +129,12 @@ class LikesViewSet(ListAPIView):
 	serializer_class = LikesSerializer # Serializer for handling 'likes' field of ServicePost.
 	queryset = ServicePost.objects.all() # Operates on all ServicePost instances.
 	
+def _reaction_response(message, service_post):
+	"""Builds the PostLikesAPIView payload: the message plus the post's current counters."""
+	service_post.refresh_from_db(fields=['like_count', 'dislike_count'])
+	return {"Success": message, "like_count": service_post.like_count, "dislike_count": service_post.dislike_count}
+
+
 class PostLikesAPIView(views.APIView):
 	"""
 	Handles toggling likes/dislikes on a ServicePost.
@@ -123,38 +162,27 @@ class PostLikesAPIView(views.APIView):
 			
 			userid = int(data['userid'])
 			try:
-				service_post_instance = ServicePost.objects.get(id=postNumber)
+				service_post_instance = ServicePost.objects.only('pk').get(id=postNumber)
 			except ServicePost.DoesNotExist:
 				return Response({"error": "ServicePost not found."}, status=status.HTTP_404_NOT_FOUND)
 
-			# Logic for handling like operations
+			# Each operation writes the through row and adjusts the counter in one transaction (Service.reactions).
 			if LikeDisLike == 1: # Like operations
 				if likeType == "add one like":
-					service_post_instance.likeType = "add one like" # Potentially for tracking last action type on the post.
-					service_post_instance.save(update_fields=['likeType'])
-					service_post_instance.likes.add(userid) # Add user to likes.
-					service_post_instance.disLikes.remove(userid) # Remove user from dislikes if present.
-					return Response({"Success": "You have added your like."},status=status.HTTP_201_CREATED)
+					add_like(service_post_instance.pk, userid) # Also drops an existing dislike.
+					return Response(_reaction_response("You have added your like.", service_post_instance),status=status.HTTP_201_CREATED)
 				if likeType == "remove one like":
-					service_post_instance.likeType = "remove one like"
-					service_post_instance.save(update_fields=['likeType'])
-					service_post_instance.likes.remove(userid) # Remove user from likes.
-					return Response({"Success": "You have removed your like."},status=status.HTTP_200_OK)
-			
-			# Logic for handling dislike operations
+					remove_like(service_post_instance.pk, userid)
+					return Response(_reaction_response("You have removed your like.", service_post_instance),status=status.HTTP_200_OK)
+
 			if LikeDisLike == 0: # Dislike operations
 				if likeType == "add one dislike":
-					service_post_instance.likeType = "add one dislike"
-					service_post_instance.save(update_fields=['likeType'])
-					service_post_instance.disLikes.add(userid) # Add user to dislikes.
-					service_post_instance.likes.remove(userid) # Remove user from likes if present.
-					return Response({"Success": "You have added your dislike."},status=status.HTTP_201_CREATED)
+					add_dislike(service_post_instance.pk, userid) # Also drops an existing like.
+					return Response(_reaction_response("You have added your dislike.", service_post_instance),status=status.HTTP_201_CREATED)
 				if likeType == "remove one dislike":
-					service_post_instance.likeType = "remove one dislike"
-					service_post_instance.save(update_fields=['likeType'])
-					service_post_instance.disLikes.remove(userid) # Remove user from dislikes.
-					return Response({"Success": "You have removed your dislike."},status=status.HTTP_200_OK)
-			
+					remove_dislike(service_post_instance.pk, userid)
+					return Response(_reaction_response("You have removed your dislike.", service_post_instance),status=status.HTTP_200_OK)
+
 			# Fallback if likeType doesn't match expected values, though the conditions above should cover valid cases.
 			# Consider returning a more specific error if likeType is invalid.
 			return Response(serializer.data,status=status.HTTP_200_OK) # Or status based on actual operation.
@@ -163,9 +191,11 @@ class PostLikesAPIView(views.APIView):
 	authentication_classes = (TokenAuthentication,)
 	permission_classes = [IsAuthenticatedOrReadOnly] # Allows read (GET, HEAD, OPTIONS) by anyone, write by authenticated users.
 
+@extend_schema(deprecated=True)
 class DisLikesViewSet(ListAPIView):
 	"""
 	Lists dislikes for all ServicePost instances.
+	Superseded by ServiceReactionStatesView, like LikesViewSet.
 	NOTE: Similar to LikesViewSet, this uses ServicePost as its queryset
 	and DisLikesSerializer, implying DisLikesSerializer handles the 'disLikes' field.
 	ModelDisLikes seems to have been removed or is not used here.
@@ -176,7 +206,10 @@ class DisLikesViewSet(ListAPIView):
 	queryset = ServicePost.objects.all() # Operates on all ServicePost instances.
 
 class CommentsViewSet(ListAPIView):
-	"""Lists all comments (ModelComments instances)."""
+	"""
+	Lists all comments (ModelComments instances).
+	Use ServiceCommentsView (`/services/<slug>/comments/`) for one post's comments.
+	"""
 	authentication_classes = (TokenAuthentication,)
 	permission_classes = (IsAuthenticatedOrReadOnly,)
 	serializer_class = CommentsSerializer # Serializer for ModelComments instances.
@@ -219,10 +252,10 @@ def api_create_service_view(request):
 			request.data = request.data.copy()
 		
 		request.data['employee'] = request.user.pk # Set the employee to the authenticated user.
-		serializer = ServicePostCreateSerializer(data=request.data)
+		serializer = ServicePostCreateSerializer(data=request.data, context={'request': request}) # The request user is needed for the repost check.
 		
 		if serializer.is_valid():
-			service_post = serializer.save()
+			service_post = serializer.save(employee=request.user) # `employee` is read-only on the serializer, so pass it here.
 			# Manually construct response data.
 			data = {
 				'response': CREATE_SUCCESS,
@@ -242,6 +275,8 @@ def api_create_service_view(request):
 				'state': service_post.state,
 				'city': service_post.city,
 				'slug': service_post.slug,
+				'duplicate_of': service_post.duplicate_of.slug if service_post.duplicate_of else None, # Listed post of the seller this one repeats.
+				'image_state': 'processing' if service_post.images_pending else 'ready', # See Service.image_pipeline.
 				# Consider adding image URLs if needed in response, similar to api_update_service_view.
 			}
 			return Response(data=data, status=status.HTTP_201_CREATED)
@@ -261,16 +296,22 @@ def api_detail_service_view(request, slug):
 	Path Parameter: slug (str) - The slug of the service post.
 	Permissions: IsAuthenticatedOrReadOnly (anyone can view).
 	Response:
-	    - HTTP 200 OK with serialized ServicePost data.
+	    - HTTP 200 OK with serialized ServicePost data (served from the detail cache when warm).
 	    - HTTP 404 NOT FOUND if the post does not exist.
+	Counts a view (Service.analytics), cache hits included.
 	"""
+	record_view(slug)
+	version = detail_version(slug)
+	response = cached_detail_response(slug, version)
+	if response is not None:
+		return response
 	try:
 		service_post = ServicePost.objects.get(slug=slug)
 	except ServicePost.DoesNotExist:
 		return Response(status=status.HTTP_404_NOT_FOUND)
 
 	serializer = ServicePostSerializer(service_post)
-	return Response(serializer.data)
+	return cache_detail_response(service_post, version, serializer.data)
 
 
 @api_view(['PUT',])
@@ -335,6 +376,7 @@ def api_update_service_view(request, slug):
 				'image4': request.build_absolute_uri(updated_service_post.image4.url) if updated_service_post.image4 else None,
 				'image5': request.build_absolute_uri(updated_service_post.image5.url) if updated_service_post.image5 else None,
 				'username': updated_service_post.employee.username,
+				'image_state': 'processing' if updated_service_post.images_pending else 'ready', # See Service.image_pipeline.
 			}
 			# Clean image URLs by removing query parameters, if any.
 			for img_key in ['image', 'image2', 'image3', 'image4', 'image5']:
@@ -417,7 +459,21 @@ def api_delete_service_view(request, slug):
 	return Response({}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class ApiServiceListView(ListAPIView):
+class RecordImpressionsMixin:
+	"""
+	For list views: counts an impression (Service.analytics) for every post
+	rendered by a GET list response, i.e. each post of the page.
+	"""
+
+	def get_serializer(self, *args, **kwargs):
+		if kwargs.get('many') and args and self.request.method == 'GET':
+			posts = list(args[0]) # Evaluated once here; the serializer gets the list.
+			record_impressions([post.pk for post in posts])
+			args = (posts,) + args[1:]
+		return super().get_serializer(*args, **kwargs)
+
+
+class ApiServiceListView(RecordImpressionsMixin, ListAPIView):
 	"""
 	Lists ServicePost instances that are either not expired or belong to users
 	with specific premium subscription types ('premiumplanMonthly', 'PremiumPlanYearly').
@@ -425,39 +481,345 @@ class ApiServiceListView(ListAPIView):
 
 	Authentication: TokenAuthentication
 	Permissions: IsAuthenticatedOrReadOnly (public read access, authenticated writes if added later)
-	Pagination: PageNumberPagination
-	Filtering: SearchFilter (on title, beskrivning, slug, employee__username), OrderingFilter.
+	Pagination: ServiceFeedPagination (page numbers, or keyset with `?paginate=cursor`)
+	Filtering: ServiceSearchFilter (full-text over the search vector, or ILIKE on
+	title, beskrivning, slug, employee__username when disabled), OrderingFilter,
+	SparseFieldsFilter (`?fields=`/`?omit=`).
 	"""
-	# Queryset filters services that are active (not expired) OR posted by premium users.
-	queryset = ServicePost.objects.filter(Q(expiration_date__gte=timezone.now()) | Q(employee__subscription_type="premiumplanMonthly") | Q(employee__subscription_type="PremiumPlanYearly"))
+	# Listed posts: not expired OR posted by premium users (precomputed in ServicePost.is_listed).
+	queryset = ServicePost.objects.filter(is_listed=True)
 	serializer_class = ServicePostSerializer # Serializer for ServicePost instances.
 	authentication_classes = (TokenAuthentication,) # Uses Knox token authentication.
 	permission_classes = (IsAuthenticatedOrReadOnly,) # Allows unrestricted access.
-	pagination_class = PageNumberPagination # Enables pagination for the list.
-	filter_backends = (SearchFilter, OrderingFilter) # Enables search and ordering.
-	search_fields = ('title', 'beskrivning', 'slug','employee__username') # Fields available for searching.
+	pagination_class = ServiceFeedPagination # Page-number pagination; `?paginate=cursor` switches to keyset.
+	filter_backends = (ServiceSearchFilter, OrderingFilter, SparseFieldsFilter) # Search, ordering, `?fields=`/`?omit=` projection.
+	search_fields = ('title', 'beskrivning', 'slug','employee__username') # ILIKE fallback fields when SERVICE_FULLTEXT_SEARCH is off.
 	# ordering_fields should be specified for OrderingFilter, e.g., ordering_fields = ['updatedAt', 'title']
 
-class servicesListAPIView(ListAPIView):
+class ServiceFeaturedView(ApiServiceListView):
+	"""
+	Lists the listed posts best first by their stored `rank_score` (likes,
+	rating, premium seller, freshness; see Service.ranking), read in
+	`service_post_rank_idx` order. Same pagination modes and `?fields=`/`?omit=`
+	as ApiServiceListView; no search or re-ordering.
+	"""
+	queryset = ServicePost.objects.filter(is_listed=True).order_by('-rank_score', 'id')
+	pagination_class = ServiceRankPagination # Page-number pagination; `?paginate=cursor` switches to keyset over (-rank_score, id).
+	filter_backends = (SparseFieldsFilter,)
+
+class SimilarServicesView(RecordImpressionsMixin, ListAPIView):
+	"""
+	Lists the listed posts most similar to the post at `slug`, best first, from
+	the neighbours precomputed by `manage.py build_similar_services` (see
+	Service.similarity). Supports `?fields=`/`?omit=`; not paginated (at most
+	SERVICE_SIMILAR_COUNT posts).
+	"""
+	serializer_class = ServicePostSerializer
+	authentication_classes = (TokenAuthentication,)
+	permission_classes = (IsAuthenticatedOrReadOnly,)
+	pagination_class = None
+	filter_backends = (SparseFieldsFilter,)
+
+	def get_queryset(self):
+		post = get_object_or_404(ServicePost.objects.only('pk'), slug=self.kwargs['slug'])
+		return (
+			ServicePost.objects.filter(is_listed=True, similar_from__post=post)
+			.order_by('-similar_from__score')
+		)
+
+class servicesListAPIView(RecordImpressionsMixin, ListAPIView):
     """
     Lists ServicePost instances with extensive filtering capabilities.
-    Similar to ApiServiceListView, it filters by expiration date or employee subscription type.
+    Like ApiServiceListView, it only lists posts flagged `is_listed` (not expired, or premium seller).
     Provides more detailed field-level filtering via DjangoFilterBackend.
 
     Authentication: TokenAuthentication
     Permissions: IsAuthenticatedOrReadOnly (public read access, authenticated writes if added later)
-    Filtering: DjangoFilterBackend (on many fields), SearchFilter, OrderingFilter.
+    Filtering: DjangoFilterBackend (on many fields), AvailabilityFilter (`?available_from=`/`?available_to=` window overlap), PriceRangeFilter (`?pris_min=`/`?pris_max=`), ServiceSearchFilter, OrderingFilter, SparseFieldsFilter.
+    Pagination: ServiceFeedPagination (page numbers, or keyset with `?paginate=cursor`)
     """
-    queryset = ServicePost.objects.filter(Q(expiration_date__gte=timezone.now()) | Q(employee__subscription_type="premiumplanMonthly") | Q(employee__subscription_type="PremiumPlanYearly"))
+    queryset = ServicePost.objects.filter(is_listed=True)
     serializer_class = ServicePostSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend,SearchFilter,OrderingFilter]
+    pagination_class = ServiceFeedPagination
+    filter_backends = [DjangoFilterBackend,AvailabilityFilter,PriceRangeFilter,ServiceSearchFilter,OrderingFilter,SparseFieldsFilter]
     OrderingFilter = ('title')
     filterset_fields = ['title', 'site_id', 'beskrivning','slug', 'city','state','country','underCategory','category','status','beskrivning','bedomning','updatedAt','pris','tillganligFran','tillganligTill']
-    # Fields available for searching via SearchFilter.
+    # ILIKE fallback fields for ServiceSearchFilter when SERVICE_FULLTEXT_SEARCH is off.
     search_fields = ['title', 'site_id', 'beskrivning','slug', 'city','state','country','underCategory','category','beskrivning',]
 
+class ServiceFacetsView(servicesListAPIView):
+    """
+    Returns value -> count maps for category, underCategory, city, state, country and
+    price buckets over the listed posts matching the request's `?search=` and field
+    filters (same query parameters as servicesListAPIView).
+
+    Replaces one request per filter dropdown with a single grouped query, cached for
+    SERVICE_FACETS_CACHE_SECONDS per filter fingerprint.
+    """
+    filter_backends = [DjangoFilterBackend, AvailabilityFilter, PriceRangeFilter, ServiceSearchFilter]
+    pagination_class = None
+
+    def filter_fingerprint(self, request):
+        """Hashes only the query parameters that change the filtered set."""
+        keys = set(self.filterset_fields) | {ServiceSearchFilter.search_param}
+        for backend in self.filter_backends:
+            keys.update(getattr(backend, 'query_param_names', ()))
+        items = sorted((key, value) for key in keys for value in request.query_params.getlist(key))
+        return hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+    @extend_schema(responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, *args, **kwargs):
+        cache_key = 'service-facets:' + self.filter_fingerprint(request)
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = facet_counts(self.filter_queryset(self.get_queryset()))
+            cache.set(cache_key, facets, settings.SERVICE_FACETS_CACHE_SECONDS)
+        return Response(facets)
+
+class ServicePriceHistogramView(ServiceFacetsView):
+    """
+    Returns a `pris` histogram for a price slider over the listed posts matching
+    the request's filters (as ServiceFacetsView, except `?pris_min=`/`?pris_max=`,
+    so the slider keeps showing the whole range). `?buckets=` sets the number of
+    buckets and `?mode=equal|quantile` equal-width or equal-population buckets.
+    Two aggregate queries, cached like the facets.
+    """
+    filter_backends = [DjangoFilterBackend, AvailabilityFilter, ServiceSearchFilter]
+
+    @extend_schema(parameters=[PriceHistogramQuerySerializer], responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, *args, **kwargs):
+        params = PriceHistogramQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        buckets, mode = params.validated_data['buckets'], params.validated_data['mode']
+        cache_key = 'service-price-histogram:%s:%d:%s' % (self.filter_fingerprint(request), buckets, mode)
+        histogram = cache.get(cache_key)
+        if histogram is None:
+            histogram = price_histogram(self.filter_queryset(self.get_queryset()), buckets, mode)
+            cache.set(cache_key, histogram, settings.SERVICE_FACETS_CACHE_SECONDS)
+        return Response(histogram)
+
+class ServiceExportView(views.APIView):
+    """
+    Streams every listed post as newline-delimited JSON (see Service.export):
+    one request and one server-side cursor instead of paging the list views.
+    Same rows as `manage.py export_services`.
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(responses={(200, NDJSON_CONTENT_TYPE): OpenApiTypes.STR})
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(export_lines(), content_type=NDJSON_CONTENT_TYPE)
+        response['Content-Disposition'] = 'attachment; filename="services.ndjson"'
+        return response
+
+class ServiceImportView(views.APIView):
+    """
+    Staff-only bulk import: creates the posts of a CSV/JSONL `file` for the
+    seller `employee` (email) through Service.bulk_import and returns its
+    report. Runs in the request; use `manage.py import_services` for very large
+    files.
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(request=ServiceImportRequestSerializer, responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def post(self, request, *args, **kwargs):
+        params = ServiceImportRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        upload = params.validated_data['file']
+        fmt = params.validated_data.get('format') or guess_format(upload.name)
+        if fmt is None:
+            return Response({'format': ['Cannot tell the format from the file name; pass csv or jsonl.']}, status=status.HTTP_400_BAD_REQUEST)
+        report = import_services(upload.file, fmt, params.validated_data['employee'])
+        return Response(report)
+
+class ServiceStatsView(views.APIView):
+    """
+    Owner-only daily views and impressions of the post at `slug` over the last
+    `?days=` days, with totals (see Service.analytics; counts reach the
+    database within SERVICE_ANALYTICS_FLUSH_SECONDS).
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(parameters=[ServiceStatsQuerySerializer], responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, slug, *args, **kwargs):
+        params = ServiceStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        post = get_object_or_404(ServicePost.objects.only('pk', 'employee_id'), slug=slug)
+        if post.employee_id != request.user.pk:
+            return Response({'response': "You don't have permission to view that."}, status=status.HTTP_403_FORBIDDEN)
+        stats = ServicePostDailyStats.objects.filter(post=post)
+        return Response(daily_stats(stats, params.validated_data['days']))
+
+class SellerStatsView(views.APIView):
+    """
+    Daily views and impressions summed over all posts of the requesting seller
+    over the last `?days=` days, with totals (as ServiceStatsView).
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(parameters=[ServiceStatsQuerySerializer], responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, *args, **kwargs):
+        params = ServiceStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        stats = ServicePostDailyStats.objects.filter(post__employee=request.user)
+        return Response(daily_stats(stats, params.validated_data['days']))
+
+class SavedSearchListView(ListCreateAPIView):
+    """
+    The requesting user's saved searches (GET) and saving a new one (POST), up
+    to SERVICE_SAVED_SEARCH_LIMIT per user. New listings that match a search
+    are recorded and pushed to the user (see Service.saved_searches).
+    """
+    serializer_class = SavedSearchSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        if self.get_queryset().count() >= settings.SERVICE_SAVED_SEARCH_LIMIT:
+            raise ValidationError('You can save at most %d searches.' % settings.SERVICE_SAVED_SEARCH_LIMIT)
+        serializer.save(user=self.request.user)
+
+class SavedSearchDetailView(RetrieveUpdateDestroyAPIView):
+    """Reads, changes or deletes one of the requesting user's saved searches."""
+    serializer_class = SavedSearchSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user=self.request.user)
+
+class SavedSearchMatchesView(RecordImpressionsMixin, ListAPIView):
+    """
+    Listed posts that matched one of the requesting user's saved searches when
+    they were published, newest match first. Reading this replaces re-running
+    the search. Supports `?fields=`/`?omit=`.
+    """
+    serializer_class = ServicePostSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    filter_backends = (SparseFieldsFilter,)
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ServicePost.objects.none()
+        search = get_object_or_404(SavedSearch.objects.only('pk'), pk=self.kwargs['pk'], user=self.request.user)
+        return (
+            ServicePost.objects.filter(is_listed=True, saved_search_matches__search=search)
+            .order_by('-saved_search_matches__id')
+        )
+
+class ServiceReactionStatesView(views.APIView):
+    """
+    Like/dislike counts and the caller's own reaction (`user_reaction`:
+    'like', 'dislike' or null; null for anonymous callers) for a batch of
+    posts, `?ids=1,2,3`, as `{post_id: {...}}`. Unknown ids are left out. One
+    query per call, so clients refresh the reactions of a visible page
+    without the full-table LikesViewSet/DisLikesViewSet.
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+
+    @extend_schema(parameters=[ReactionStatesQuerySerializer], responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, *args, **kwargs):
+        params = ReactionStatesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(reaction_states(params.validated_data['ids'], request.user.pk))
+
+class ServiceCommentsView(ListAPIView):
+    """
+    Comments on one post, oldest first, cursor-paginated (follow `next`), so
+    every page is one range read of `service_comment_post_idx` however many
+    comments the post or the site has. The total is the post's `comment_count`.
+    """
+    serializer_class = CommentsSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = ServiceCommentCursorPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ModelComments.objects.none()
+        post = get_object_or_404(ServicePost.objects.only('pk'), slug=self.kwargs['slug'])
+        return ModelComments.objects.filter(postNumber=post)
+
+class LocationBundleView(views.APIView):
+    """
+    Pointer to the current location bundle (see Service.locations):
+    `{"version", "url"}`. Clients and proxies may cache it for
+    SERVICE_LOCATION_POINTER_MAX_AGE, and `If-None-Match` with the current
+    version's ETag gets an empty 304, so checking for new data stays cheap.
+    Builds the first bundle if there is none yet.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    @extend_schema(responses={200: OpenApiResponse(OpenApiTypes.OBJECT), 304: OpenApiResponse(description='Not modified')})
+    def get(self, request, *args, **kwargs):
+        current = current_bundle()
+        if current is None:
+            rebuild_location_bundle()
+            current = current_bundle()
+        version = current['version']
+        etag = '"%s"' % version
+        # Parses If-None-Match as entity tags (lists, `W/`, `*`) and answers 304 on a match.
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # Relative to this view's path, so the URL holds wherever the app is mounted.
+            response = Response({'version': version, 'url': request.build_absolute_uri('%s.json' % version)})
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.SERVICE_LOCATION_POINTER_MAX_AGE)
+        return response
+
+class LocationBundleContentView(views.APIView):
+    """
+    One location bundle by version: `{"countries", "states", "cities"}`. The
+    version is the content hash, so the response never changes and is served
+    with far-future, immutable cache headers.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    @extend_schema(responses={200: OpenApiResponse(OpenApiTypes.OBJECT)})
+    def get(self, request, version, *args, **kwargs):
+        content = bundle_content(version)
+        if content is None:
+            raise Http404
+        etag = '"%s"' % version
+        response = get_conditional_response(request, etag=etag) or HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=LOCATION_BUNDLE_MAX_AGE, immutable=True)
+        return response
+
+class ServiceSuggestView(views.APIView):
+    """
+    Typeahead for the search box: `?q=` -> up to SERVICE_SUGGEST_LIMIT matching
+    titles, categories and cities of listed posts (see Service.suggest).
+    Unauthenticated so the token lookup is skipped on every keystroke.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    @extend_schema(
+        parameters=[OpenApiParameter('q', OpenApiTypes.STR, description='Text typed so far; shorter than SERVICE_SUGGEST_MIN_LENGTH returns empty lists.')],
+        responses={200: OpenApiResponse(OpenApiTypes.OBJECT)},
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(suggest(request.query_params.get('q', '')))
+
 # Removed commented-out lines related to '#from Service.utils import rotate_image' and '#from rest_framework.authentication import TokenAuthentication'
 # Removed commented-out '#	queryset = ModelLikes.objects.all()'
 # Removed commented-out Stripe and image rotation logic from api_create_service_view
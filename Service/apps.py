@@ -1,5 +1,23 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import pre_migrate
+
+
+def create_postgres_extensions(using, **kwargs):
+    """
+    Creates the Postgres extensions Service indexes depend on before its
+    migrations run (pg_trgm for the `gin_trgm_ops` trigram indexes).
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
 
 
 class ServiceConfig(AppConfig):
     name = 'Service'
+
+    def ready(self):
+        # Ensure signal handlers are registered
+        from . import signals  # noqa: F401
+        pre_migrate.connect(create_postgres_extensions, sender=self)
@@ -0,0 +1,214 @@
+"""
+Bulk import of ServicePosts for one seller from CSV or JSON Lines.
+
+The file is streamed and handled SERVICE_IMPORT_BATCH_SIZE rows at a time:
+rows are validated with ServicePostImportSerializer, slugs and the other
+`pre_save` denormalizations are filled in from the already loaded employee
+(no per-row queries), and the valid rows are inserted with one `bulk_create`.
+`bulk_create` sends no post_save, so the batch runs the ServicePost post_save
+side effects (Service.signals) itself, once: rank scores, and after commit
+saved-search matching and publishing new cities in the location bundle.
+Invalid rows are skipped and reported with their line numbers.
+
+Image URLs are fetched, validated and processed by a pool of
+SERVICE_IMPORT_IMAGE_WORKERS threads (downloads and Pillow release the GIL)
+while the next batch is being inserted; the results are written back with
+`bulk_update`. Images go through the fields' own imagekit specs and
+content-addressed storage, so they match API uploads. A failed image leaves
+the post with its default image and is reported. Workers count their stored
+images' references as they save them (Neetechs.images), and close their
+database connection after each image.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from Neetechs.images import generate_variants
+from Service.api.serializers import ServicePostImportSerializer
+from Service.locations import publish_new_cities
+from Service.models import SERVICE_IMAGE_FIELDS, ServicePost, pre_save_service_post_receiever
+from Service.ranking import refresh_rank_scores
+from Service.saved_searches import match_new_posts
+from Service.utils import validate_service_image
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 100 # Further errors are only counted.
+
+_http = threading.local()
+
+
+def guess_format(filename):
+    """'csv' or 'jsonl' from the file extension, or None."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(extension)
+
+
+def read_rows(stream, fmt):
+    """
+    Yields `(line_number, row)` from the binary `stream`. CSV needs a header
+    row; empty CSV cells are left out so model defaults apply. Unparseable
+    JSON lines are yielded with `row=None`.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, '')}
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _session():
+    if not hasattr(_http, 'session'):
+        _http.session = requests.Session()
+    return _http.session
+
+
+def fetch_image(url):
+    """Downloads `url` into a ContentFile, refusing bodies over SERVICE_IMAGE_MAX_BYTES."""
+    max_bytes = settings.SERVICE_IMAGE_MAX_BYTES
+    with _session().get(url, stream=True, timeout=settings.SERVICE_IMPORT_IMAGE_TIMEOUT) as response:
+        response.raise_for_status()
+        body = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            body += chunk
+            if len(body) > max_bytes:
+                raise ValidationError('Image is larger than %d bytes.' % max_bytes)
+    return ContentFile(bytes(body), name=os.path.basename(urlsplit(url).path) or 'image')
+
+
+def process_image(post, field_name, url):
+    """
+    Worker task: fetches `url` and stores it as `post.<field_name>` (processed,
+    content-addressed) plus its variants. Returns the stored name; the caller
+    writes it to the database.
+    """
+    try:
+        content = fetch_image(url)
+        validate_service_image(content)
+        field_file = getattr(post, field_name)
+        field_file.save(content.name, content, save=False)
+        generate_variants(field_file)
+        return field_file.name
+    finally:
+        connection.close() # The pool's threads are not request threads; nothing else closes it.
+
+
+class ServiceImporter:
+    """
+    Imports rows for `employee`. `run()` consumes an iterable of
+    `(line_number, row)` and returns a report:
+    `{'created', 'invalid', 'images', 'image_errors', 'errors': [...]}`.
+    """
+
+    def __init__(self, employee, batch_size=None, workers=None):
+        self.employee = employee
+        self.batch_size = batch_size or settings.SERVICE_IMPORT_BATCH_SIZE
+        self.workers = workers or settings.SERVICE_IMPORT_IMAGE_WORKERS
+        self.report = {'created': 0, 'invalid': 0, 'images': 0, 'image_errors': 0, 'errors': []}
+
+    def error(self, line_number, errors):
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'line': line_number, 'errors': errors})
+
+    def build(self, batch):
+        """
+        Validates a batch of rows with one serializer instance (its fields are
+        built once, not per row). Returns `[(post, {field: url}), ...]` for the
+        valid rows.
+        """
+        validator = ServicePostImportSerializer()
+        built = []
+        for line_number, row in batch:
+            if row is None:
+                self.report['invalid'] += 1
+                self.error(line_number, {'row': ['Not a JSON object.']})
+                continue
+            try:
+                data = validator.run_validation(row)
+            except serializers.ValidationError as exc:
+                self.report['invalid'] += 1
+                self.error(line_number, exc.detail)
+                continue
+            urls = {name: url for name in SERVICE_IMAGE_FIELDS if (url := data.pop(name, None))}
+            post = ServicePost(employee=self.employee, **data)
+            pre_save_service_post_receiever(ServicePost, post)
+            post._import_line = line_number
+            built.append((post, urls))
+        return built
+
+    @transaction.atomic
+    def insert(self, built):
+        posts = ServicePost.objects.bulk_create([post for post, _urls in built])
+        post_ids = [post.pk for post in posts]
+        refresh_rank_scores(ServicePost.objects.filter(pk__in=post_ids))
+        transaction.on_commit(lambda: match_new_posts(post_ids), robust=True)
+        publish_new_cities(post.city for post in posts if post.is_listed)
+        self.report['created'] += len(posts)
+
+    def submit_images(self, pool, built):
+        return [
+            (post, field_name, pool.submit(process_image, post, field_name, url))
+            for post, urls in built
+            for field_name, url in urls.items()
+        ]
+
+    def save_images(self, jobs):
+        """Waits for a batch's image jobs and writes the processed names back."""
+        updated = {}
+        for post, field_name, future in jobs:
+            try:
+                setattr(post, field_name, future.result())
+            except Exception as exc:
+                logger.warning('Import of %s for line %s failed: %r', field_name, post._import_line, exc)
+                self.report['image_errors'] += 1
+                self.error(post._import_line, {field_name: exc.messages if isinstance(exc, ValidationError) else [str(exc)]})
+                continue
+            self.report['images'] += 1
+            updated.setdefault(post.pk, post)
+        if updated:
+            ServicePost.objects.bulk_update(list(updated.values()), list(SERVICE_IMAGE_FIELDS), batch_size=self.batch_size)
+
+    def run(self, rows):
+        rows = iter(rows)
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while batch := list(islice(rows, self.batch_size)):
+                built = self.build(batch)
+                if built:
+                    self.insert(built)
+                # Images of this batch download while the previous batch's are written back.
+                jobs = self.submit_images(pool, built)
+                self.save_images(pending)
+                pending = jobs
+            self.save_images(pending)
+        return self.report
+
+
+def import_services(stream, fmt, employee, **options):
+    """Imports the CSV/JSONL `stream` (binary) for `employee`; see ServiceImporter."""
+    if fmt not in FORMATS:
+        raise ValueError('Unknown import format %r.' % fmt)
+    return ServiceImporter(employee, **options).run(read_rows(stream, fmt))
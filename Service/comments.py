@@ -0,0 +1,31 @@
+"""
+Comment bookkeeping for ServicePost.
+
+`ServicePost.comment_count` caches the number of ModelComments on the post so
+list cards never count. Comments are written through the admin, so the
+counter follows ModelComments' post_save (created) and post_delete signals
+(Service.signals) with an `F()` update, leaving the post's `updatedAt` alone.
+`rebuild_comment_counts` resynchronizes it after writes that bypass signals
+(`bulk_create`, moving comments with `update()`, raw SQL).
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from Service.detail_cache import invalidate_service_details
+from Service.models import ModelComments, ServicePost
+
+
+def comment_count_changed(post_id, delta):
+    """Adds `delta` to the post's `comment_count` and drops its cached detail responses."""
+    posts = ServicePost.objects.filter(pk=post_id)
+    posts.update(comment_count=F('comment_count') + delta)
+    invalidate_service_details(posts.values_list('slug', flat=True))
+
+
+def rebuild_comment_counts():
+    """Recomputes `comment_count` of every post from ModelComments. Returns the number of posts updated."""
+    counts = (
+        ModelComments.objects.filter(postNumber=OuterRef('pk'))
+        .order_by().values('postNumber').annotate(n=Count('pk')).values('n')
+    )
+    return ServicePost.objects.update(comment_count=Coalesce(Subquery(counts), 0))
@@ -0,0 +1,81 @@
+"""
+Cache of rendered ServicePost detail responses.
+
+`service-detail:<slug>` holds the slug's version, a counter that starts at a
+random value; the rendered JSON bytes are stored under that version and a
+request variant (renderings with absolute URLs differ per host). A cache hit
+costs two cache reads and no queries.
+
+Invalidating a slug increments its version once the transaction commits,
+which orphans every rendering of the old version at once; they then expire
+after SERVICE_DETAIL_CACHE_SECONDS. A miss reads the version *before* loading
+the post and stores its rendering under that version only, so a rendering of
+a row read before a concurrent commit lands under a version the commit has
+already moved past and is never served. Writers that bypass
+`ServicePost.save()` (reactions, the image worker) invalidate explicitly.
+"""
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+KEY_PREFIX = 'service-detail:'
+
+
+def _pointer_key(slug):
+    return KEY_PREFIX + slug
+
+
+def _body_key(slug, version, variant):
+    return '%s%s:%s:%s' % (KEY_PREFIX, slug, version, hashlib.md5(variant.encode()).hexdigest())
+
+
+def detail_version(slug):
+    """
+    The current version of `slug`'s cached responses (None when the cache keeps
+    nothing). Read it before loading the post and pass it to both functions below.
+    """
+    pointer = _pointer_key(slug)
+    version = cache.get(pointer)
+    if version is None:
+        # Random start: a dropped pointer must not restart at a version old renderings are stored under.
+        cache.add(pointer, secrets.randbits(48), settings.SERVICE_DETAIL_CACHE_SECONDS)
+        version = cache.get(pointer)
+    return version
+
+
+def cached_detail_response(slug, version, variant=''):
+    """Returns the cached detail response for `slug` at `version`, or None on a miss."""
+    if version is None:
+        return None
+    body = cache.get(_body_key(slug, version, variant))
+    if body is None:
+        return None
+    return HttpResponse(body, content_type='application/json')
+
+
+def cache_detail_response(service_post, version, data, variant=''):
+    """Renders serialized `data` for `service_post`, caches the bytes under `version` and returns the response."""
+    body = JSONRenderer().render(data)
+    if version is not None:
+        cache.set(_body_key(service_post.slug, version, variant), body, settings.SERVICE_DETAIL_CACHE_SECONDS)
+    return HttpResponse(body, content_type='application/json')
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass # No version yet; the next read starts a new one.
+
+
+def invalidate_service_details(slugs):
+    """Moves `slugs` to a new version, dropping their cached detail responses, when the current transaction commits."""
+    keys = [_pointer_key(slug) for slug in slugs if slug]
+    if keys:
+        transaction.on_commit(lambda: _bump(keys))
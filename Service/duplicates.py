@@ -0,0 +1,91 @@
+"""
+Near-duplicate ServicePosts, found through the MinHash/LSH columns (see
+Service.minhash) instead of comparing descriptions pairwise.
+
+`find_duplicates` checks one text: a single `lsh_bands && keys` lookup on the
+GIN index returns the candidates sharing a band (at most MAX_CANDIDATES),
+and their stored signatures confirm which reach the threshold. It backs the
+repost check on create (ServicePostCreateSerializer).
+
+`duplicate_clusters` groups a whole queryset for moderation: posts are
+bucketed by band key in one pass, only posts sharing a bucket are compared,
+and confirmed pairs are merged into clusters (union-find). `manage.py
+cluster_duplicate_services` stores the result in `ServicePost.duplicate_of`.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+
+from Service.minhash import band_keys, from_bytes, post_text, signature, similarity
+from Service.models import ServicePost
+
+MAX_CANDIDATES = 50 # Candidates compared per checked text; keeps the check constant-time.
+CHUNK_SIZE = 2000
+
+
+def find_duplicates(title, description, queryset=None, threshold=None):
+    """
+    `[(post, score), ...]`, best first, of the posts in `queryset` (default:
+    all) whose text has an estimated similarity of at least `threshold`
+    (default SERVICE_DUPLICATE_THRESHOLD) with `title` + `description`.
+    """
+    threshold = settings.SERVICE_DUPLICATE_THRESHOLD if threshold is None else threshold
+    sig = signature(post_text(title, description))
+    if sig is None:
+        return []
+    queryset = ServicePost.objects.all() if queryset is None else queryset
+    candidates = queryset.filter(lsh_bands__overlap=band_keys(sig)).only('pk', 'slug', 'title', 'minhash').order_by()[:MAX_CANDIDATES]
+    scored = [(post, similarity(sig, from_bytes(post.minhash))) for post in candidates]
+    return sorted([(post, score) for post, score in scored if score >= threshold], key=lambda item: -item[1])
+
+
+class _Clusters:
+    """Union-find over post ids."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, pk):
+        root = pk
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while pk != root:
+            self.parent[pk], pk = root, self.parent.get(pk, pk)
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent.setdefault(a, a)
+            self.parent.setdefault(b, b)
+            self.parent[max(a, b)] = min(a, b) # The root stays the oldest post.
+
+    def groups(self):
+        groups = defaultdict(list)
+        for pk in self.parent:
+            groups[self.find(pk)].append(pk)
+        return groups
+
+
+def duplicate_clusters(queryset=None, threshold=None):
+    """
+    Near-duplicate clusters in `queryset` (default: all posts) as
+    `{oldest_pk: [pk, ...]}` (members sorted, the oldest first), leaving out
+    posts without duplicates.
+    """
+    threshold = settings.SERVICE_DUPLICATE_THRESHOLD if threshold is None else threshold
+    queryset = ServicePost.objects.all() if queryset is None else queryset
+    signatures, buckets = {}, defaultdict(list)
+    rows = queryset.filter(minhash__isnull=False).order_by().values_list('pk', 'minhash', 'lsh_bands')
+    for pk, minhash, keys in rows.iterator(chunk_size=CHUNK_SIZE):
+        signatures[pk] = from_bytes(minhash)
+        for key in keys:
+            buckets[key].append(pk)
+
+    clusters = _Clusters()
+    for members in buckets.values():
+        for i, pk in enumerate(members):
+            for other in members[:i]:
+                if clusters.find(pk) != clusters.find(other) and similarity(signatures[pk], signatures[other]) >= threshold:
+                    clusters.union(pk, other)
+    return {root: sorted(members) for root, members in clusters.groups().items()}
@@ -0,0 +1,36 @@
+"""
+NDJSON export of the listed service catalog (one JSON object per line).
+
+Rows are read as plain `values()` through a server-side cursor
+(`QuerySet.iterator`) and encoded one at a time, so memory stays flat however
+large the catalog is and the whole export costs a single query. Used by
+`/services/export.ndjson` and `manage.py export_services`.
+"""
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from Service.models import SERVICE_IMAGE_FIELDS, ServicePost
+
+CONTENT_TYPE = 'application/x-ndjson'
+CHUNK_SIZE = 2000 # Rows fetched from the server-side cursor per round trip.
+
+EXPORT_FIELDS = (
+    'id', 'slug', 'title', 'pris', 'enhet', 'bedomning', 'beskrivning', 'status',
+    'category', 'underCategory', 'country', 'state', 'city',
+    'tillganligFran', 'tillganligTill', 'expiration_date', 'createdAt', 'updatedAt',
+    'like_count', 'dislike_count', 'site_id', 'sellerName', 'AboutSeller',
+)
+
+
+def export_queryset():
+    return ServicePost.objects.filter(is_listed=True).order_by('pk')
+
+
+def export_lines(queryset=None):
+    """Yields each post of `queryset` (default: every listed post) as one encoded NDJSON line."""
+    queryset = export_queryset() if queryset is None else queryset
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in queryset.values(*EXPORT_FIELDS, *SERVICE_IMAGE_FIELDS).iterator(chunk_size=CHUNK_SIZE):
+        images = [row.pop(name) for name in SERVICE_IMAGE_FIELDS]
+        row['images'] = [default_storage.url(name) for name in images if name]
+        yield (encoder.encode(row) + '\n').encode()
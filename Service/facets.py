@@ -0,0 +1,107 @@
+"""
+Faceted counts for the service filter bar.
+
+All facets are computed as one `UNION ALL` of grouped aggregates over the
+caller's filtered queryset, so the filter UI costs a single round trip.
+`price_histogram` buckets `pris` for a price slider in two aggregate queries.
+"""
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Aggregate, Case, CharField, Count, F, Func, IntegerField, Max, Min, Value, When
+from django.db.models.functions import Cast
+
+# Facet name -> ServicePost column it groups on.
+FACET_FIELDS = ('category', 'underCategory', 'city', 'state', 'country')
+PRICE_FACET = 'price'
+
+EQUAL_WIDTH = 'equal'
+QUANTILE = 'quantile'
+HISTOGRAM_MODES = (EQUAL_WIDTH, QUANTILE)
+
+
+def price_bucket_labels(edges):
+    """Returns bucket labels for ascending `edges`, e.g. (0, 100) -> ['0-99', '100+']."""
+    labels = [f'{low}-{high - 1}' for low, high in zip(edges, edges[1:])]
+    return labels + [f'{edges[-1]}+']
+
+
+def price_bucket_expression(edges):
+    """CASE expression mapping `pris` to its bucket label (prices below edges[0] fall in the first bucket)."""
+    labels = price_bucket_labels(edges)
+    whens = [When(pris__lt=high, then=Value(label)) for high, label in zip(edges[1:], labels)]
+    return Case(*whens, default=Value(labels[-1]), output_field=CharField())
+
+
+def _grouped(queryset, facet, expression):
+    return (
+        queryset.order_by()
+        .annotate(facet=Value(facet, output_field=CharField()), value=expression)
+        .values('facet', 'value')
+        .annotate(n=Count('pk'))
+    )
+
+
+def facet_counts(queryset, price_edges=None):
+    """
+    Returns `{facet: {value: count}}` for FACET_FIELDS plus price buckets over
+    `queryset`. Empty values are left out. Every facet key is always present.
+    """
+    price_edges = price_edges or settings.SERVICE_PRICE_FACET_EDGES
+    parts = [_grouped(queryset, name, Cast(F(name), CharField())) for name in FACET_FIELDS]
+    parts.append(_grouped(queryset, PRICE_FACET, price_bucket_expression(price_edges)))
+
+    facets = {name: {} for name in (*FACET_FIELDS, PRICE_FACET)}
+    for row in parts[0].union(*parts[1:], all=True):
+        if row['value'] not in (None, ''):
+            facets[row['facet']][row['value']] = row['n']
+    return facets
+
+
+class PercentilesDisc(Aggregate):
+    """`percentile_disc(ARRAY[fractions]) WITHIN GROUP (ORDER BY expression)`: one value per fraction."""
+    function = 'percentile_disc'
+    template = '%(function)s(ARRAY[%(fractions)s]::float8[]) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fractions, **extra):
+        fractions = ', '.join('%.6f' % float(fraction) for fraction in fractions)
+        super().__init__(expression, fractions=fractions, output_field=ArrayField(IntegerField()), **extra)
+
+
+def _bucket_lows(stats, buckets, mode):
+    """Ascending lower bounds of the histogram buckets."""
+    low, high = stats['low'], stats['high']
+    if mode == QUANTILE:
+        return sorted(set(stats['quantiles']))
+    width = -(-(high - low + 1) // buckets)
+    return list(range(low, high + 1, width))
+
+
+def price_histogram(queryset, buckets, mode=EQUAL_WIDTH):
+    """
+    Returns `{'mode', 'min', 'max', 'count', 'buckets': [{'min', 'max', 'count'}]}`
+    for `pris` over `queryset`. Bucket bounds are inclusive. EQUAL_WIDTH
+    splits min..max into up to `buckets` equal ranges; QUANTILE puts bucket
+    edges at price quantiles, so each bucket holds about the same number of
+    posts (fewer buckets when prices repeat).
+    """
+    queryset = queryset.order_by()
+    aggregates = {'low': Min('pris'), 'high': Max('pris'), 'count': Count('pk')}
+    if mode == QUANTILE:
+        aggregates['quantiles'] = PercentilesDisc('pris', [i / buckets for i in range(buckets)])
+    stats = queryset.aggregate(**aggregates)
+    histogram = {'mode': mode, 'min': stats['low'], 'max': stats['high'], 'count': stats['count'], 'buckets': []}
+    if not stats['count']:
+        return histogram
+
+    lows = _bucket_lows(stats, buckets, mode)
+    # width_bucket(pris, lows) is the 1-based index of the last lower bound <= pris.
+    counts = dict(
+        queryset.annotate(bucket=Func(F('pris'), Value(lows), function='width_bucket', output_field=IntegerField()))
+        .values('bucket').annotate(n=Count('pk')).values_list('bucket', 'n')
+    )
+    highs = [next_low - 1 for next_low in lows[1:]] + [stats['high']]
+    histogram['buckets'] = [
+        {'min': low, 'max': high, 'count': counts.get(index, 0)}
+        for index, (low, high) in enumerate(zip(lows, highs), start=1)
+    ]
+    return histogram
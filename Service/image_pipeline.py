@@ -0,0 +1,138 @@
+"""
+Background processing of ServicePost image uploads.
+
+With `SERVICE_IMAGE_PROCESSING = 'background'` API uploads skip the
+ProcessedImageField resize/encode inside the request: the raw file is stored
+under `service/raw/` and a ServiceImageJob is queued. `manage.py
+process_service_images` claims jobs, runs the field's own imagekit spec (so the
+output matches the synchronous path) and swaps the result into the post.
+Until then the post keeps its previous (or default) image and reports
+`image_state = 'processing'`.
+"""
+import logging
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from Neetechs.images import generate_variants, release_images
+from Service.detail_cache import invalidate_service_details
+from Service.models import SERVICE_IMAGE_FIELDS, ServiceImageJob, ServicePost
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3 # A job is marked failed after this many errors.
+
+
+def background_processing_enabled():
+    return settings.SERVICE_IMAGE_PROCESSING == 'background'
+
+
+def pop_image_uploads(validated_data):
+    """
+    Removes uploaded files for the image fields from serializer `validated_data`
+    and returns them as `{field_name: upload}`. A no-op in 'sync' mode.
+    """
+    if not background_processing_enabled():
+        return {}
+    return {name: validated_data.pop(name) for name in SERVICE_IMAGE_FIELDS if validated_data.get(name)}
+
+
+def raw_upload_location(post, filename):
+    """Storage name for an unprocessed upload: service/raw/<employee_id>/<token>-<filename>."""
+    return 'service/raw/{employee_id}/{token}-{filename}'.format(
+        employee_id=post.employee_id, token=uuid.uuid4().hex, filename=os.path.basename(filename)
+    )
+
+
+def sync_pending_count(post_id):
+    """
+    Sets `ServicePost.images_pending` from the number of pending jobs for the
+    post, and drops its cached detail response (images or state changed).
+    """
+    pending = (
+        ServiceImageJob.objects.filter(post_id=OuterRef('pk'), status=ServiceImageJob.PENDING)
+        .order_by().values('post_id').annotate(n=Count('pk')).values('n')
+    )
+    posts = ServicePost.objects.filter(pk=post_id)
+    posts.update(images_pending=Coalesce(Subquery(pending), Value(0)))
+    invalidate_service_details(posts.values_list('slug', flat=True))
+
+
+@transaction.atomic
+def enqueue_image_uploads(post, uploads):
+    """
+    Stores each raw upload and queues a job for it. Pending jobs for the same
+    fields are dropped, since the new upload replaces them.
+    """
+    if not uploads:
+        return
+    ServiceImageJob.objects.filter(
+        post=post, field_name__in=list(uploads), status=ServiceImageJob.PENDING
+    ).delete()
+    ServiceImageJob.objects.bulk_create([
+        ServiceImageJob(
+            post=post,
+            field_name=field_name,
+            raw_file=default_storage.save(raw_upload_location(post, upload.name), upload),
+        )
+        for field_name, upload in uploads.items()
+    ])
+    sync_pending_count(post.pk)
+    post.refresh_from_db(fields=['images_pending'])
+
+
+def _apply(job):
+    """
+    Runs the field's imagekit spec on the raw upload, stores the result on the
+    post and writes its responsive variants (the queryset update skips the
+    post_save hook that normally does that). Saving the file counts its
+    reference; the replaced image's reference is dropped here for the same
+    reason, leaving the file to `manage.py collect_stored_images`.
+    """
+    post = job.post
+    field_file = getattr(post, job.field_name)
+    with default_storage.open(job.raw_file, 'rb') as raw:
+        field_file.save(os.path.basename(job.raw_file), File(raw), save=False)
+    posts = ServicePost.objects.filter(pk=post.pk)
+    replaced = posts.select_for_update().values_list(job.field_name, flat=True).first()
+    posts.update(**{job.field_name: field_file.name})
+    release_images([(field_file.field, replaced)])
+    generate_variants(field_file)
+
+
+def process_next_job():
+    """
+    Claims the oldest pending job (skipping rows locked by other workers) and
+    processes it. Returns the job, or None when the queue is empty.
+    """
+    with transaction.atomic():
+        job = (
+            ServiceImageJob.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('post', 'post__employee')
+            .filter(status=ServiceImageJob.PENDING)
+            .order_by('pk')
+            .first()
+        )
+        if job is None:
+            return None
+        try:
+            with transaction.atomic():
+                _apply(job)
+        except Exception as exc:
+            logger.exception('Processing image job %s failed', job.pk)
+            job.attempts += 1
+            job.error = repr(exc)
+            if job.attempts >= MAX_ATTEMPTS:
+                job.status = ServiceImageJob.FAILED
+            job.save(update_fields=['attempts', 'error', 'status'])
+        else:
+            job.delete()
+        sync_pending_count(job.post_id)
+    return job
+
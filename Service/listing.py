@@ -0,0 +1,75 @@
+"""
+Maintenance of the denormalized `ServicePost.is_listed` flag.
+
+A post is listed while `expiration_date >= now` (a NULL `expiration_date`
+counts as expired) or while its employee is on one of `PREMIUM_SUBSCRIPTIONS`.
+The rule is defined here once, as `is_listed_value` for a single post (saves,
+see `pre_save_service_post_receiever`) and as the conditions below for the
+bulk helpers, which cover what changes without a post save: time passing and
+subscription changes.
+"""
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from Service.models import PREMIUM_SUBSCRIPTIONS, ServicePost
+
+
+def is_listed_value(expiration_date, subscription_type, now=None):
+    """Evaluates the visibility rule for one post's `expiration_date` and its employee's plan."""
+    now = now or timezone.now()
+    if expiration_date is not None:
+        if timezone.is_naive(expiration_date):
+            expiration_date = timezone.make_aware(expiration_date)
+        if expiration_date >= now:
+            return True
+    return subscription_type in PREMIUM_SUBSCRIPTIONS
+
+
+def unexpired_condition(now):
+    return Q(expiration_date__gte=now)
+
+
+def expired_condition(now):
+    """The complement of `unexpired_condition`, spelled out so NULL expiry matches (and the expiry index applies)."""
+    return Q(expiration_date__lt=now) | Q(expiration_date__isnull=True)
+
+
+def listed_condition(now=None):
+    """Returns the visibility rule as a Q object, for bulk recomputation."""
+    now = now or timezone.now()
+    return unexpired_condition(now) | Q(employee__subscription_type__in=PREMIUM_SUBSCRIPTIONS)
+
+
+def sweep_expired_posts(now=None):
+    """
+    Unlists posts whose `expiration_date` has passed and whose employee is not
+    on a premium plan. Returns the number of posts unlisted.
+    """
+    now = now or timezone.now()
+    lapsed = ServicePost.objects.filter(expired_condition(now), is_listed=True).exclude(
+        employee__subscription_type__in=PREMIUM_SUBSCRIPTIONS
+    )
+    return lapsed.update(is_listed=False)
+
+
+def rebuild_listing_flags(now=None):
+    """
+    Recomputes `is_listed` for every post, fixing rows changed behind the
+    model's back (e.g. queryset `.update()` calls). Returns the number of
+    rows changed.
+    """
+    now = now or timezone.now()
+    listed = ServicePost.objects.filter(listed_condition(now)).values('pk')
+    changed = ServicePost.objects.filter(is_listed=False, pk__in=listed).update(is_listed=True)
+    changed += ServicePost.objects.filter(is_listed=True).exclude(pk__in=listed).update(is_listed=False)
+    return changed
+
+
+def refresh_employee_posts(employee, now=None):
+    """Recomputes `is_listed` for all posts of `employee`, e.g. after a plan change."""
+    posts = ServicePost.objects.filter(employee=employee)
+    if employee.subscription_type in PREMIUM_SUBSCRIPTIONS:
+        return posts.filter(is_listed=False).update(is_listed=True)
+    now = now or timezone.now()
+    # A CASE rather than the bare comparison, which is NULL for NULL expiry.
+    return posts.update(is_listed=Case(When(unexpired_condition(now), then=Value(True)), default=Value(False)))
@@ -0,0 +1,111 @@
+"""
+Versioned location reference bundles.
+
+The countries, states and cities of listed posts change rarely, yet the apps
+load them on every start. `rebuild_location_bundle` serializes them to
+canonical JSON and names the bytes by their SHA-256 (the version); a new
+LocationBundle is published only when the version differs from the current
+one. `/services/locations/<version>.json` serves a bundle with far-future,
+immutable cache headers, and `/services/locations/` returns the current
+version and URL (with an ETag), so the apps check one small response and
+download the bundle only after a change.
+
+Rebuilds run after commit when a ModelCountry or ModelState is saved or
+deleted, and when a listed post names a city missing from the current bundle
+(Service.signals, and once per batch for bulk imports). A city whose last post is unlisted, deleted or moved is
+dropped by `manage.py build_location_bundle`, run periodically from cron;
+until then the bundle lists one city too many. The newest
+SERVICE_LOCATION_BUNDLES_KEPT bundles are kept so that clients that just read
+the pointer can still download the version it named.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from Service.models import LocationBundle, ModelCountry, ModelState, ServicePost
+
+CURRENT_KEY = 'service-locations:current'
+CONTENT_KEY = 'service-locations:%s'
+CURRENT_CACHE_SECONDS = 300 # Bounds how long another process's cached pointer can lag a rebuild.
+VERSION_LENGTH = 16 # Hex digits of the SHA-256 kept as the version.
+BUNDLE_MAX_AGE = 365 * 24 * 3600 # Cache-Control max-age of a bundle; its URL changes with its content.
+
+
+def location_data():
+    return {
+        'countries': list(ModelCountry.objects.order_by('pk').values('id', 'name')),
+        'states': list(ModelState.objects.order_by('pk').values('id', 'name', 'country')),
+        'cities': list(
+            ServicePost.objects.filter(is_listed=True).exclude(city__isnull=True).exclude(city='')
+            .order_by('city').values_list('city', flat=True).distinct()
+        ),
+    }
+
+
+def serialize(data):
+    """Canonical JSON bytes: equal data always gives equal bytes, hence the same version."""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode()
+
+
+def _newest():
+    return LocationBundle.objects.order_by('-createdAt', '-pk')
+
+
+def current_bundle():
+    """`{'version', 'cities'}` of the current bundle, or None before the first build."""
+    current = cache.get(CURRENT_KEY)
+    if current is None:
+        bundle = _newest().first()
+        if bundle is None:
+            return None
+        current = {'version': bundle.version, 'cities': frozenset(json.loads(bytes(bundle.content))['cities'])}
+        cache.set(CURRENT_KEY, current, CURRENT_CACHE_SECONDS)
+    return current
+
+
+def bundle_content(version):
+    """The bytes of bundle `version`, or None if it is unknown. Bundles never change, so they are cached without expiry."""
+    key = CONTENT_KEY % version
+    content = cache.get(key)
+    if content is None:
+        bundle = LocationBundle.objects.filter(version=version).only('content').first()
+        if bundle is None:
+            return None
+        content = bytes(bundle.content)
+        cache.set(key, content, None)
+    return content
+
+
+def is_new_city(city):
+    """Whether `city` is missing from the current bundle."""
+    current = current_bundle()
+    return current is None or city not in current['cities']
+
+
+def publish_new_cities(cities):
+    """Rebuilds the bundle after commit when any of `cities` (of listed posts) is missing from it."""
+    if any(city and is_new_city(city) for city in set(cities)):
+        transaction.on_commit(rebuild_location_bundle, robust=True)
+
+
+def rebuild_location_bundle():
+    """
+    Builds the bundle from the current data and publishes it unless it equals
+    the current one. Content that reverts to an older bundle republishes that
+    row. Returns `(version, published)`.
+    """
+    content = serialize(location_data())
+    version = hashlib.sha256(content).hexdigest()[:VERSION_LENGTH]
+    if _newest().values_list('version', flat=True).first() == version:
+        return version, False
+    LocationBundle.objects.bulk_create(
+        [LocationBundle(version=version, content=content)],
+        update_conflicts=True, unique_fields=['version'], update_fields=['createdAt'],
+    )
+    pruned = list(_newest().values_list('version', flat=True)[settings.SERVICE_LOCATION_BUNDLES_KEPT:])
+    LocationBundle.objects.filter(version__in=pruned).delete()
+    cache.delete_many([CURRENT_KEY] + [CONTENT_KEY % old for old in pruned])
+    return version, True
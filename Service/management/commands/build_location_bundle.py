@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from Service.locations import rebuild_location_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the location reference bundle (countries, states, cities of listed posts) and publish it "
+        "if its content changed. Run periodically, e.g. hourly from cron, so cities without posts drop out."
+    )
+
+    def handle(self, *args, **options):
+        version, published = rebuild_location_bundle()
+        if published:
+            self.stdout.write(self.style.SUCCESS(f"Published location bundle {version}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Location bundle {version} is up to date."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from Service.similarity import build_similarities
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the similar services of listed posts (TF-IDF cosine similarity) for "
+        "/services/<slug>/similar/. Run periodically, e.g. every few minutes from cron, "
+        "to cover new and edited posts, and with --full nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute the neighbours of every listed post instead of only those affected by recent saves.",
+        )
+
+    def handle(self, *args, **options):
+        recomputed = build_similarities(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed similar services for {recomputed} post(s)."))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Service.duplicates import duplicate_clusters
+from Service.minhash import signature_fields
+from Service.models import ServicePost
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Clusters near-duplicate ServicePosts (MinHash/LSH over title + beskrivning) and points each "
+        "duplicate's `duplicate_of` at the oldest post of its cluster, for moderation in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, help="Estimated similarity from which posts are duplicates (default: SERVICE_DUPLICATE_THRESHOLD).")
+        parser.add_argument("--listed", action="store_true", help="Only cluster listed posts.")
+        parser.add_argument("--backfill", action="store_true", help="First compute signatures for posts saved before they existed.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the clusters without writing `duplicate_of`.")
+
+    def handle(self, *args, **options):
+        if options["backfill"]:
+            missing = ServicePost.objects.filter(minhash__isnull=True).only("pk", "title", "beskrivning")
+            batch, computed = [], 0
+            for post in missing.iterator(chunk_size=BATCH_SIZE):
+                post.minhash, post.lsh_bands = signature_fields(post.title, post.beskrivning)
+                batch.append(post)
+                if len(batch) == BATCH_SIZE:
+                    computed += ServicePost.objects.bulk_update(batch, ["minhash", "lsh_bands"])
+                    batch = []
+            computed += ServicePost.objects.bulk_update(batch, ["minhash", "lsh_bands"])
+            self.stdout.write(f"Computed {computed} signature(s).")
+
+        posts = ServicePost.objects.filter(is_listed=True) if options["listed"] else ServicePost.objects.all()
+        clusters = duplicate_clusters(posts, options["threshold"])
+        duplicates = sum(len(members) - 1 for members in clusters.values())
+        for root, members in sorted(clusters.items(), key=lambda item: -len(item[1]))[:20]:
+            self.stdout.write(f"{root}: {len(members)} posts ({', '.join(map(str, members[:10]))}{', ...' if len(members) > 10 else ''})")
+        if not options["dry_run"]:
+            with transaction.atomic():
+                posts.filter(duplicate_of__isnull=False).update(duplicate_of=None)
+                for root, members in clusters.items():
+                    ServicePost.objects.filter(pk__in=members[1:]).update(duplicate_of=root)
+        self.stdout.write(self.style.SUCCESS(f"{len(clusters)} cluster(s), {duplicates} duplicate post(s)."))
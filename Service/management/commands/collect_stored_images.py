@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from Neetechs.images import collect_images, rebuild_image_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed image files (and their variants) no row references any more. "
+        "Run periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recount the references from the image columns first (required once on existing databases).",
+        )
+        parser.add_argument(
+            "--unchanged-hours",
+            type=float,
+            default=24,
+            help="Only delete files whose reference count has not changed for this many hours (default 24).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Files deleted per transaction.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            referenced = rebuild_image_references()
+            self.stdout.write(f"Recounted references of {referenced} stored image(s).")
+        unchanged_for = timedelta(hours=options["unchanged_hours"])
+        deleted = 0
+        while True:
+            batch = collect_images(unchanged_for=unchanged_for, limit=options["batch_size"])
+            deleted += batch
+            if batch < options["batch_size"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced image file(s)."))
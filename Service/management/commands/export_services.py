@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from Service.export import export_lines
+
+
+class Command(BaseCommand):
+    help = "Write every listed service post as newline-delimited JSON (same rows as /services/export.ndjson)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write to (default: stdout).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            self._write(sys.stdout.buffer)
+            return
+        with open(options["output"], "wb") as output:
+            count = self._write(output)
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} post(s) to {options['output']}."))
+
+    def _write(self, output):
+        count = 0
+        for line in export_lines():
+            output.write(line)
+            count += 1
+        return count
@@ -0,0 +1,44 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from Service.bulk_import import FORMATS, guess_format, import_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import service posts for one seller from a CSV (with header row) or JSON Lines file. "
+        "Columns as for creating a post; image, image2..image5 hold image URLs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--employee", required=True, help="Email of the seller the posts are created for.")
+        parser.add_argument("--format", choices=FORMATS, help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, help="Rows validated and inserted per batch.")
+        parser.add_argument("--workers", type=int, help="Threads fetching and processing images.")
+
+    def handle(self, *args, **options):
+        try:
+            employee = get_user_model().objects.get(email=options["employee"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['employee']!r}.")
+        fmt = options["format"] or guess_format(options["path"])
+        if fmt is None:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+
+        run_options = {"batch_size": options["batch_size"], "workers": options["workers"]}
+        if options["path"] == "-":
+            report = import_services(sys.stdin.buffer, fmt, employee, **run_options)
+        else:
+            with open(options["path"], "rb") as stream:
+                report = import_services(stream, fmt, employee, **run_options)
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} post(s) with {report['images']} image(s); "
+            f"{report['invalid']} invalid row(s), {report['image_errors']} failed image(s)."
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Service.saved_searches import notify_pending_matches
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker that pushes new saved search matches to their owners' devices. "
+        "Several workers can run side by side; each claims matches with SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the pending matches and exit instead of polling.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds to sleep when nothing is pending.")
+
+    def handle(self, *args, **options):
+        handled = 0
+        while True:
+            count = notify_pending_matches()
+            if count:
+                handled += count
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Handled {handled} saved search match(es)."))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Service.image_pipeline import process_next_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker for background ServicePost image processing (SERVICE_IMAGE_PROCESSING='background'). "
+        "Several workers can run side by side; each claims jobs with SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            job = process_next_job()
+            if job is not None:
+                processed += 1
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} image job(s)."))
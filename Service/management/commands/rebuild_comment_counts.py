@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from Service.comments import rebuild_comment_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute ServicePost.comment_count from the ModelComments table."
+
+    def handle(self, *args, **options):
+        updated = rebuild_comment_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt comment counts for {updated} post(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from Service.reactions import rebuild_reaction_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute ServicePost.like_count/dislike_count from the likes/disLikes tables."
+
+    def handle(self, *args, **options):
+        updated = rebuild_reaction_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt reaction counts for {updated} post(s)."))
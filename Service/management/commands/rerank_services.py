@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from Service.ranking import decay_rank_scores, rebuild_rank_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Decay the freshness term of service post rank scores (the /services/featured/ order). "
+        "Run periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute rank_score for every post, e.g. after changing the ranking weights.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            updated = rebuild_rank_scores()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt rank scores for {updated} post(s)."))
+            return
+        updated = decay_rank_scores()
+        self.stdout.write(self.style.SUCCESS(f"Rescored {updated} post(s)."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from Service.listing import rebuild_listing_flags, sweep_expired_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Unlist service posts whose expiration date has passed (premium sellers excepted). "
+        "Run periodically, e.g. every few minutes from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute is_listed for every post instead of only sweeping lapsed ones.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            changed = rebuild_listing_flags()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt listing flags; {changed} post(s) changed."))
+            return
+        unlisted = sweep_expired_posts()
+        self.stdout.write(self.style.SUCCESS(f"Unlisted {unlisted} expired post(s)."))
@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from Service.models import ServicePost
+from Service.seller_snapshot import process_next_job, queue_seller_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker that copies changed seller profiles (name, about, site_id, picture) onto their ServicePosts "
+        "in batches. Several workers can run side by side; each claims jobs with SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument(
+            "--all", action="store_true", help="First queue every seller with posts, e.g. to backfill the copies."
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            sellers = get_user_model().objects.filter(pk__in=ServicePost.objects.values("employee_id"))
+            for seller in sellers.only("pk").iterator():
+                queue_seller_snapshot(seller)
+        processed = 0
+        while True:
+            job = process_next_job()
+            if job is not None:
+                processed += 1
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed the posts of {processed} seller(s)."))
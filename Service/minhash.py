@@ -0,0 +1,88 @@
+"""
+MinHash signatures and LSH band keys for near-duplicate ServicePosts.
+
+A post's text (title and beskrivning, lowercased, runs of non-word characters
+collapsed to one space) is cut into overlapping SHINGLE_SIZE-character
+shingles. Its signature is the minimum of each of NUM_PERM universal hashes
+`(a * x + b) mod (2**61 - 1)` over the shingles, and the fraction of equal
+positions in two signatures estimates the Jaccard similarity of their
+shingle sets. The signature is split into BANDS bands of ROWS values and
+each band is hashed to one 64-bit key: two posts share at least one key with
+probability `1 - (1 - s**ROWS)**BANDS`, about 0.98 at s = 0.8 and 0.06 at
+s = 0.4. The keys are stored in the GIN-indexed `ServicePost.lsh_bands`, so
+the candidates for a text are one index lookup away (Service.duplicates).
+
+The permutations come from a fixed seed: stored signatures are only
+comparable with signatures computed by the same parameters.
+"""
+import hashlib
+import re
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5 # Characters per shingle.
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20260118)
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64) # a * x stays below 2**63 for 32-bit x.
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+_SEPARATOR_RE = re.compile(r'[\W_]+')
+
+
+def post_text(title, description):
+    return f'{title or ""} {description or ""}'
+
+
+def shingles(text):
+    """The set of SHINGLE_SIZE-character shingles of the normalized `text`."""
+    text = _SEPARATOR_RE.sub(' ', text.lower()).strip()
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _hash32(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), 'little')
+
+
+def signature(text):
+    """NUM_PERM uint32 MinHash values of `text`, or None when it has no shingles."""
+    values = shingles(text)
+    if not values:
+        return None
+    hashes = np.fromiter((_hash32(value) for value in values), dtype=np.uint64, count=len(values))
+    permuted = (np.outer(hashes, _A) + _B) % _PRIME
+    return (permuted & np.uint64(0xFFFFFFFF)).min(axis=0).astype(np.uint32)
+
+
+def band_keys(sig):
+    """One signed 64-bit key per band; the band number is hashed in, so bands never collide with each other."""
+    rows = sig.astype('<u4').reshape(BANDS, ROWS)
+    return [
+        int.from_bytes(hashlib.blake2b(bytes([band]) + rows[band].tobytes(), digest_size=8).digest(), 'little', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def to_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind signatures `a` and `b`."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def signature_fields(title, description):
+    """`(minhash, lsh_bands)` column values for a post with this text (both None without text)."""
+    sig = signature(post_text(title, description))
+    if sig is None:
+        return None, None
+    return to_bytes(sig), band_keys(sig)
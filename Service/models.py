@@ -1,19 +1,58 @@
 import os
 from binascii import hexlify
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField, DateTimeRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.files.storage import default_storage
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Func, Q, Value, When
+from django.db.models.functions import Upper
 from django.db.models.signals import post_delete, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from imagekit.models.fields import ProcessedImageField
-from imagekit.processors import ResizeToFill  # , ResizeToFill
+from imagekit.processors import ResizeToFill, Transpose
 from PIL import Image
 
+from Neetechs.images import (ContentAddressedImageField, register_responsive_variants,
+                             release_image, stored_field_file)
+from Service.minhash import signature_fields
+from Service.utils import DecodeAtScale
+
+# Text search configuration used for the ServicePost search vector. Listings are
+# written in several languages, so 'simple' (no stemming) is used rather than a
+# language-specific dictionary. Queries must use the same configuration.
+SEARCH_CONFIG = 'simple'
+
+# Subscription types whose posts stay listed after `expiration_date` has passed.
+PREMIUM_SUBSCRIPTIONS = ('premiumplanMonthly', 'PremiumPlanYearly')
+
+# How long a new service post stays listed for non-premium sellers.
+SERVICE_POST_LIFETIME = timedelta(days=30)
+
+
+# ServicePost fields copied from the seller (see `seller_snapshot`).
+SELLER_SNAPSHOT_FIELDS = ('sellerName', 'AboutSeller', 'site_id', 'seller_picture')
+
+# ServicePost image fields, in display order.
+SERVICE_IMAGE_FIELDS = ('image', 'image2', 'image3', 'image4', 'image5')
+
+# Processing chain for ServicePost images. One decode per upload: JPEGs are decoded at
+# the smallest DCT scale covering 512x512, EXIF orientation is applied to that decode,
+# then the image is cropped/resized.
+SERVICE_IMAGE_PROCESSORS = [DecodeAtScale(512, 512), Transpose(Transpose.AUTO), ResizeToFill(512, 512)]
+
+
+def default_expiration_date():
+	"""Returns the default `expiration_date` for a new ServicePost (evaluated per post, not at import)."""
+	return timezone.now() + SERVICE_POST_LIFETIME
+
 
 def upload_location(instance, filename, **kwargs):
 	"""
@@ -73,6 +112,8 @@ class ModelCategory(models.Model):
     def __str__(self):
         return self.name
 
+register_responsive_variants(ModelCategory, 'img', max_width=128)
+
 class ModelSubCategory(models.Model):
     """
     Represents a sub-category under a main ModelCategory.
@@ -141,13 +182,16 @@ class ServicePost(models.Model):
         default="published", verbose_name="Is published?")
     tillganligFran = models.DateTimeField(default=timezone.now) # Field 'tillganligFran' (Swedish: availableFrom). Consider renaming to 'available_from'.
     tillganligTill = models.DateTimeField(default=timezone.now) # Field 'tillganligTill' (Swedish: availableTo). Consider renaming to 'available_to'.
-    image = ProcessedImageField(default='ServiceDefaultImage.jpg',format='PNG', processors=[ResizeToFill(512, 512)], options={'quality': 70}, upload_to=upload_location, blank=False, null=False) # Main image for the service.
-    image2 = ProcessedImageField(format='PNG', processors=[ResizeToFill(512, 512)], options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
-    image3 = ProcessedImageField(format='PNG', processors=[ResizeToFill(512, 512)], options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
-    image4 = ProcessedImageField(format='PNG', processors=[ResizeToFill(512, 512)], options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
-    image5 = ProcessedImageField(format='PNG', processors=[ResizeToFill(512, 512)], options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
+    image = ContentAddressedImageField(default='ServiceDefaultImage.jpg',format='PNG', processors=SERVICE_IMAGE_PROCESSORS, options={'quality': 70}, upload_to=upload_location, blank=False, null=False) # Main image for the service.
+    image2 = ContentAddressedImageField(format='PNG', processors=SERVICE_IMAGE_PROCESSORS, options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
+    image3 = ContentAddressedImageField(format='PNG', processors=SERVICE_IMAGE_PROCESSORS, options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
+    image4 = ContentAddressedImageField(format='PNG', processors=SERVICE_IMAGE_PROCESSORS, options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
+    image5 = ContentAddressedImageField(format='PNG', processors=SERVICE_IMAGE_PROCESSORS, options={'quality': 70}, upload_to=upload_location, blank=True, null=True) # Optional additional image.
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL,related_name="post_like", blank=True) # Users who liked this service post.
     disLikes = models.ManyToManyField(settings.AUTH_USER_MODEL,related_name="post_disLikes", blank=True) # Users who disliked this service post.
+    like_count = models.PositiveIntegerField(default=0, editable=False) # Cached size of `likes`, maintained by Service.reactions.
+    dislike_count = models.PositiveIntegerField(default=0, editable=False) # Cached size of `disLikes`, maintained by Service.reactions.
+    comment_count = models.PositiveIntegerField(default=0, editable=False) # Cached number of ModelComments on the post, maintained by Service.comments.
     # TODO: Review or remove these commented-out fields.
     #likes = models.ManyToManyField(ModelLikes,related_name="post_like", on_delete=models.CASCADE, blank=True)
     #disLikes = models.ManyToManyField(ModelDisLikes,related_name="post_disLikes", on_delete=models.CASCADE, blank=True)
@@ -161,17 +205,285 @@ class ServicePost(models.Model):
     city = models.CharField(verbose_name="City/Municipality", max_length=1024, blank=True, null=True) # City/Municipality. Changed verbose_name from "Kommun".
     AboutSeller = models.CharField(verbose_name="About Seller", max_length=1024, blank=True, null=True) # Information about the seller. Note: Non-snake_case. Consider renaming to `about_seller`.
     sellerName = models.CharField(verbose_name="Seller Name", max_length=1024, blank=True, null=True) # Name of the seller. Note: Non-snake_case. Consider renaming to `seller_name`.
-    expiration_date = models.DateTimeField(default=datetime.now() + timedelta(days=30),auto_now=False, auto_now_add=False, null=True, blank=True) # Date when the service post expires.
+    seller_picture = models.CharField(max_length=100, blank=True, editable=False) # Storage name of the seller's `picture`, so reads need no join.
+    expiration_date = models.DateTimeField(default=default_expiration_date,auto_now=False, auto_now_add=False, null=True, blank=True) # Date when the service post expires.
+    # Denormalized visibility: not expired OR seller on a premium plan. Kept current by
+    # pre_save below, Service.signals (subscription changes) and `manage.py sweep_expired_services`.
+    is_listed = models.BooleanField(default=True, editable=False)
+    images_pending = models.PositiveSmallIntegerField(default=0, editable=False) # Uploads still queued in ServiceImageJob (background image processing).
+    rank_score = models.FloatField(default=0, editable=False) # Featured-feed quality score, maintained by Service.ranking.
+    rank_computed_at = models.DateTimeField(null=True, blank=True, editable=False) # When rank_score was last computed (its freshness term decays from here).
+    similar_computed_at = models.DateTimeField(null=True, blank=True, editable=False) # When the post's ServiceSimilarity rows were last computed (Service.similarity).
+    minhash = models.BinaryField(null=True, editable=False) # MinHash signature of title + beskrivning (Service.minhash), set on save.
+    lsh_bands = ArrayField(models.BigIntegerField(), null=True, editable=False) # LSH band keys of `minhash`; candidate near-duplicates share one.
+    duplicate_of = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='duplicates') # Oldest post of its near-duplicate cluster, set by `manage.py cluster_duplicate_services` for moderation.
+    # Weighted full-text document (title > description > location), maintained by Postgres as a stored generated column.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('beskrivning', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('city', 'state', 'country', weight='C', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    # Availability window tillganligFran..tillganligTill (inclusive) as a tstzrange, maintained by Postgres;
+    # NULL when the window is inverted. Backs `?available_from=`/`?available_to=` (Service.api.filters.AvailabilityFilter).
+    availability = models.GeneratedField(
+        expression=Case(
+            When(tillganligTill__gte=F('tillganligFran'), then=Func(
+                F('tillganligFran'), F('tillganligTill'), Value('[]'), function='tstzrange', output_field=DateTimeRangeField()
+            )),
+            default=None,
+            output_field=DateTimeRangeField(),
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
 
     objects = models.Manager()  # Default model manager.
     postobjects = PostObjects()  # Custom manager for filtering published posts.
     
     class Meta:
         ordering = ('-updatedAt',) # Default ordering for queries, by last updated timestamp descending. Note: `updatedAt` is non-snake_case.
+        indexes = [
+            GinIndex(fields=['search_vector'], name='service_post_search_gin'), # Backs `?search=` via Service.api.filters.ServiceSearchFilter.
+            models.Index(fields=['-updatedAt', 'id'], name='service_post_feed_idx', condition=Q(is_listed=True)), # Listed feed in keyset order (Service.api.pagination.ServiceFeedCursorPagination).
+            models.Index(fields=['expiration_date'], name='service_post_listed_exp_idx', condition=Q(is_listed=True)), # Lets the expiration sweeper find lapsed posts without a table scan.
+            models.Index(fields=['-rank_score', 'id'], name='service_post_rank_idx', condition=Q(is_listed=True)), # Featured feed in rank order (Service.api.pagination.ServiceRankCursorPagination).
+            GistIndex(fields=['availability'], name='service_post_availability_gist'), # Availability window overlap (`&&`) queries.
+            models.Index(fields=['is_listed', 'pris'], name='service_post_listed_pris_idx'), # `?pris_min=`/`?pris_max=` and the price histogram.
+            GinIndex(fields=['lsh_bands'], name='service_post_lsh_gin'), # Near-duplicate candidates (`lsh_bands && keys`, Service.duplicates).
+            # Trigram indexes for `icontains` on listed posts (Service.suggest); they index UPPER(col) to match Django's icontains SQL.
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='service_post_title_trgm', condition=Q(is_listed=True)),
+            GinIndex(OpClass(Upper('category'), name='gin_trgm_ops'), name='service_post_category_trgm', condition=Q(is_listed=True)),
+            GinIndex(OpClass(Upper('city'), name='gin_trgm_ops'), name='service_post_city_trgm', condition=Q(is_listed=True)),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def seller_picture_file(self):
+        """The seller's picture as a FieldFile, built from the `seller_picture` copy."""
+        from django.contrib.auth import get_user_model
+        return stored_field_file(get_user_model(), 'picture', self.seller_picture)
+
+    def compute_is_listed(self, now=None):
+        """Evaluates the visibility rule that `is_listed` caches for this post (Service.listing)."""
+        from Service.listing import is_listed_value
+        return is_listed_value(self.expiration_date, self.employee.subscription_type, now)
+
+
+for _field_name in SERVICE_IMAGE_FIELDS:
+	register_responsive_variants(ServicePost, _field_name, max_width=512)
+
+
+class ServiceImageJob(models.Model):
+    """
+    A queued background resize/encode of one uploaded ServicePost image (see
+    Service.image_pipeline). Rows are deleted once processed; failed rows are
+    kept with their error for inspection.
+    """
+    PENDING = 'pending'
+    FAILED = 'failed'
+    StatusOptions = (
+        (PENDING, 'Pending'),
+        (FAILED, 'Failed'),
+    )
+    post = models.ForeignKey(ServicePost, on_delete=models.CASCADE, related_name='image_jobs') # The post the image belongs to.
+    field_name = models.CharField(max_length=20) # One of SERVICE_IMAGE_FIELDS.
+    raw_file = models.CharField(max_length=500) # Storage name of the unprocessed upload.
+    status = models.CharField(max_length=10, choices=StatusOptions, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], name='service_image_job_pending_idx', condition=Q(status='pending')), # Worker queue scan.
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}.{self.field_name} ({self.status})'
+
+
+class StoredImage(models.Model):
+    """
+    Reference count of one content-addressed image file (see Neetechs.images):
+    how many ContentAddressedImageField columns, across all models, name it.
+    Changed with `F()` in the transaction of the row write; the file is deleted
+    once the count drops to zero. The row is also the lock that keeps an
+    upload reusing the file from racing its deletion.
+    """
+    name = models.CharField(max_length=255, unique=True) # Storage name, `cas/ab/<digest>.png`.
+    field = models.CharField(max_length=100) # `app_label.model.field` of a referencing column; finds the file's variants.
+    refs = models.IntegerField(default=0) # Referencing columns.
+    touched_at = models.DateTimeField() # Last change of `refs`; `manage.py collect_stored_images` spares recent rows.
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['touched_at'], name='stored_image_unreferenced_idx', condition=Q(refs__lte=0)), # Collector scan.
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.refs})'
+
+
+class SellerSnapshotJob(models.Model):
+    """
+    A queued refresh of the seller fields copied onto a user's ServicePosts
+    (see Service.seller_snapshot). One row per user: queueing a user again
+    only moves `queued_at`, which tells a running worker to go over the posts
+    once more.
+    """
+    employee = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='seller_snapshot_job') # The seller whose posts are refreshed.
+    queued_at = models.DateTimeField() # Last time the seller's snapshot fields changed.
+    started_at = models.DateTimeField(null=True, blank=True) # When a worker claimed the job; reclaimable once stale.
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['queued_at'], name='seller_snapshot_job_queue_idx'), # Worker queue scan.
+        ]
+
+    def __str__(self):
+        return f'{self.employee_id} (queued {self.queued_at:%Y-%m-%d %H:%M:%S})'
+
+
+class ServiceSimilarity(models.Model):
+    """
+    One precomputed "similar services" neighbour of a post: the TF-IDF cosine
+    similarity of their texts. Each post keeps its top SERVICE_SIMILAR_COUNT
+    neighbours, written by `manage.py build_similar_services`.
+    """
+    post = models.ForeignKey(ServicePost, on_delete=models.CASCADE, related_name='similarities') # The post the neighbour is listed for.
+    similar = models.ForeignKey(ServicePost, on_delete=models.CASCADE, related_name='similar_from') # The neighbouring post.
+    score = models.FloatField() # Cosine similarity in (0, 1].
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'similar'], name='service_similarity_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score'], name='service_similarity_post_idx'), # Neighbours of a post, best first.
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} ~ {self.similar_id} ({self.score:.3f})'
+
+
+class ServicePostDailyStats(models.Model):
+    """
+    Views (detail requests) and impressions (appearances in list responses) of
+    a post per day. Written in batches by Service.analytics, never per request.
+    """
+    post = models.ForeignKey(ServicePost, on_delete=models.CASCADE, related_name='daily_stats') # The post counted.
+    day = models.DateField() # Local date (TIME_ZONE) of the counted requests.
+    views = models.PositiveIntegerField(default=0)
+    impressions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'day'], name='service_post_daily_stats_unique'), # Upsert target; also serves per-post ranges.
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} {self.day}: {self.views} views, {self.impressions} impressions'
+
+
+class SavedSearch(models.Model):
+    """
+    A user's stored servicesListAPIView filter combination (exact field values,
+    blank for any, and an inclusive price range). New listed posts are matched
+    against it by Service.saved_searches, which records SavedSearchMatch rows
+    and pushes a notification, so the user does not have to poll the search.
+
+    `match_key` is the search's entry in the inverted index the matcher reads:
+    `<field>:<value>` for the first of MATCH_KEY_FIELDS it filters on (a post
+    can only match if it has that value), or MATCH_ANY for searches on none of them.
+    """
+    MATCH_KEY_FIELDS = ('city', 'category', 'country') # Most selective first.
+    MATCH_ANY = '*'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches') # Owner, notified of matches.
+    name = models.CharField(max_length=100, blank=True) # Label shown in notifications.
+    category = models.CharField(max_length=1024, blank=True)
+    underCategory = models.CharField(max_length=1024, blank=True) # Note: Non-snake_case, as on ServicePost.
+    country = models.CharField(max_length=1024, blank=True)
+    state = models.CharField(max_length=1024, blank=True)
+    city = models.CharField(max_length=1024, blank=True)
+    pris_min = models.IntegerField(null=True, blank=True)
+    pris_max = models.IntegerField(null=True, blank=True)
+    notify = models.BooleanField(default=True) # Push a notification for new matches.
+    match_key = models.CharField(max_length=1100, editable=False) # Inverted-index entry, see above.
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('-createdAt',)
+        indexes = [
+            models.Index(fields=['match_key'], name='saved_search_match_key_idx'), # Candidate lookup per new post.
+        ]
+
+    def __str__(self):
+        return self.name or self.match_key
+
+    @classmethod
+    def index_key(cls, field_name, value):
+        return f'{field_name}:{value}'
+
+    def compute_match_key(self):
+        for name in self.MATCH_KEY_FIELDS:
+            if getattr(self, name):
+                return self.index_key(name, getattr(self, name))
+        return self.MATCH_ANY
+
+    def accepts(self, post):
+        """True if the ServicePost `post` passes every filter of the search."""
+        for name in ('category', 'underCategory', 'country', 'state', 'city'):
+            if getattr(self, name) and getattr(self, name) != getattr(post, name):
+                return False
+        if self.pris_min is not None and post.pris < self.pris_min:
+            return False
+        return self.pris_max is None or post.pris <= self.pris_max
+
+    def save(self, *args, **kwargs):
+        self.match_key = self.compute_match_key()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'match_key'}
+        super().save(*args, **kwargs)
+
+
+class SavedSearchMatch(models.Model):
+    """A listed post that matched a SavedSearch when it was created or published."""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    post = models.ForeignKey(ServicePost, on_delete=models.CASCADE, related_name='saved_search_matches')
+    createdAt = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True) # Set once the push for this match was sent (or skipped).
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'post'], name='saved_search_match_unique'), # Also serves the per-search listing.
+        ]
+        indexes = [
+            models.Index(fields=['id'], name='saved_search_match_pending_idx', condition=Q(notified_at__isnull=True)), # Notification worker queue.
+        ]
+
+    def __str__(self):
+        return f'{self.search_id} <- {self.post_id}'
+
+
+class LocationBundle(models.Model):
+    """
+    One published snapshot of the location reference data (countries, states
+    and the cities of listed posts) as JSON, named by the hash of its content
+    (see Service.locations). Rows are never changed; the newest is current.
+    """
+    version = models.CharField(max_length=64, unique=True) # Content hash; part of the bundle's URL.
+    content = models.BinaryField() # The serialized bundle, served byte for byte.
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.version
 
 
 def _createHash():
@@ -185,13 +497,40 @@ def _createHash():
    return hexlify(os.urandom(5)).decode()
 
 
+def service_post_slug(employee, title):
+	"""Slug for a new post: <employee email>-<title>-<random hash>, unique without a lookup."""
+	return slugify(employee.email + "-" + title + "-" + _createHash())
+
+
+def seller_snapshot(employee):
+	"""Values of SELLER_SNAPSHOT_FIELDS for the posts of `employee`."""
+	return {
+		'sellerName': employee.first_name,
+		'AboutSeller': employee.about,
+		'site_id': employee.site_id,
+		'seller_picture': employee.picture.name or '',
+	}
+
+
 @receiver(post_delete, sender=ServicePost)
 def submission_delete(sender, instance, **kwargs):
 	"""
-	Signal receiver that deletes the associated image file when a ServicePost instance is deleted.
+	Signal receiver that deletes the associated image files when a ServicePost instance is deleted.
 	Connected to the `post_delete` signal from the `ServicePost` sender.
+	Runs after the transaction commits and only for files named by `upload_to`; content-addressed
+	files are reference counted and collected once no row references them (see Neetechs.images).
+	"""
+	field_files = [getattr(instance, name) for name in SERVICE_IMAGE_FIELDS]
+	transaction.on_commit(lambda: [release_image(field_file) for field_file in field_files])
+
+
+@receiver(post_delete, sender=ServiceImageJob)
+def image_job_delete(sender, instance, **kwargs):
+	"""
+	Signal receiver that deletes a ServiceImageJob's raw upload once the job row is gone
+	(processed, superseded, or cascaded from its post), after the transaction commits.
 	"""
-	instance.image.delete(False) # False ensures the model field is not saved again after deletion.
+	transaction.on_commit(lambda: default_storage.delete(instance.raw_file))
 
 
 def pre_save_service_post_receiever(sender, instance, *args, **kwargs):
@@ -201,19 +540,24 @@ def pre_save_service_post_receiever(sender, instance, *args, **kwargs):
 
 	Populates:
 	- `slug`: Generates a URL-friendly slug from employee email, title, and a hash if not already set.
-	- `site_id`: Copies from the employee's `site_id` if not set.
-	- `AboutSeller`: Copies from the employee's `about` field if not set.
-	- `sellerName`: Copies from the employee's `first_name` if not set.
+	- `sellerName`, `AboutSeller`, `site_id`, `seller_picture`: Copied from the employee on every
+	  save (`seller_snapshot`); Service.seller_snapshot refreshes them when the employee changes.
+	- `minhash`, `lsh_bands`: Near-duplicate signature of the title and beskrivning (Service.minhash).
+	- `is_listed`: Recomputed from `expiration_date` and the employee's subscription. A post
+	  that is new and listed, or was unlisted and becomes listed, is flagged `_newly_listed`
+	  for the saved search matcher (Service.signals).
+
+	Needs no queries once `instance.employee` is loaded, so bulk inserts
+	(Service.bulk_import) call it directly on each unsaved instance.
 	"""
 	if not instance.slug:
-		# FIXME: Slug generation uses str(_createHash) which refers to the function object, not its return value. It should be _createHash().
-		instance.slug = slugify(instance.employee.email + "-" + instance.title + "-" + str(_createHash))
-	if not instance.site_id:
-		instance.site_id = instance.employee.site_id
-	if not instance.AboutSeller: # Note: Non-snake_case
-		instance.AboutSeller = instance.employee.about
-	if not instance.sellerName: # Note: Non-snake_case
-		instance.sellerName = instance.employee.first_name
+		instance.slug = service_post_slug(instance.employee, instance.title)
+	for name, value in seller_snapshot(instance.employee).items():
+		setattr(instance, name, value)
+	instance.minhash, instance.lsh_bands = signature_fields(instance.title, instance.beskrivning)
+	was_listed = instance.is_listed and not instance._state.adding
+	instance.is_listed = instance.compute_is_listed()
+	instance._newly_listed = instance.is_listed and not was_listed
 pre_save.connect(pre_save_service_post_receiever, sender=ServicePost)
 
 
@@ -237,4 +581,10 @@ class ModelComments(models.Model):
     """
     comment = models.CharField(verbose_name="Seller name", max_length=1024, blank=True) # The content of the comment. Verbose name "Seller name" seems incorrect for a comment field.
     postNumber = models.ForeignKey(ServicePost, on_delete=models.CASCADE) # The ServicePost to which this comment is associated. Note: Non-snake_case. Consider renaming to `service_post`.
+    created = models.DateTimeField(default=timezone.now, editable=False) # When the comment was posted; existing rows get the migration time.
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['postNumber', 'created', 'id'], name='service_comment_post_idx'), # A post's comments in keyset order (Service.api.pagination.ServiceCommentCursorPagination).
+        ]
 
@@ -0,0 +1,82 @@
+"""
+Maintenance of the stored `ServicePost.rank_score` that orders /services/featured/.
+
+    rank_score = LIKE_WEIGHT * ln(1 + like_count)
+               - DISLIKE_WEIGHT * ln(1 + dislike_count)
+               + RATING_WEIGHT * bedomning
+               + PREMIUM_BOOST              (seller on a premium plan)
+               + FRESHNESS_WEIGHT * 0.5 ^ (age of updatedAt / SERVICE_RANK_HALF_LIFE_HOURS)
+
+The score is evaluated by Postgres in a single UPDATE, so the same expression
+serves one post (after a reaction, save or plan change) and the periodic decay
+of the freshness term (`manage.py rerank_services`). The featured feed then
+reads `service_post_rank_idx` in order with no per-request math.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import (Case, DurationField, Exists, ExpressionWrapper, F, FloatField, OuterRef, Q,
+                              Value, When)
+from django.db.models.functions import Cast, Extract, Ln, Power
+from django.utils import timezone
+
+from Service.models import PREMIUM_SUBSCRIPTIONS, ServicePost
+
+LIKE_WEIGHT = 1.0
+DISLIKE_WEIGHT = 1.0
+RATING_WEIGHT = 0.5 # Per rating point (bedomning is 0-5).
+PREMIUM_BOOST = 1.0
+FRESHNESS_WEIGHT = 3.0 # Bonus of a post updated just now; halves every half-life.
+
+# Freshness is treated as fully decayed after this many half-lives (2^-10 < 0.1%).
+DECAY_HORIZON_HALF_LIVES = 10
+
+
+def _half_life():
+    return timedelta(hours=settings.SERVICE_RANK_HALF_LIFE_HOURS)
+
+
+def rank_expression(now):
+    """The rank_score formula as a database expression, with ages measured at `now`."""
+    premium = Exists(get_user_model().objects.filter(pk=OuterRef('employee_id'), subscription_type__in=PREMIUM_SUBSCRIPTIONS))
+    age = ExpressionWrapper(Value(now) - F('updatedAt'), output_field=DurationField())
+    half_lives = Extract(age, 'epoch') / _half_life().total_seconds()
+    return ExpressionWrapper(
+        LIKE_WEIGHT * Ln(F('like_count') + 1.0)
+        - DISLIKE_WEIGHT * Ln(F('dislike_count') + 1.0)
+        + RATING_WEIGHT * Cast('bedomning', FloatField())
+        + Case(When(premium, then=Value(PREMIUM_BOOST)), default=Value(0.0))
+        + Case(
+            When(updatedAt__isnull=True, then=Value(0.0)),
+            default=FRESHNESS_WEIGHT * Power(Value(0.5), Cast(half_lives, FloatField())),
+        ),
+        output_field=FloatField(),
+    )
+
+
+def refresh_rank_scores(posts, now=None):
+    """Recomputes `rank_score` for the ServicePost queryset `posts`. Returns the number of rows updated."""
+    now = now or timezone.now()
+    return posts.update(rank_score=rank_expression(now), rank_computed_at=now)
+
+
+def decay_rank_scores(now=None):
+    """
+    Recomputes the listed posts whose freshness term had not fully decayed when
+    they were last scored. Posts older than the decay horizon keep their score
+    until a reaction, save or plan change rescores them. Returns the number of
+    rows updated.
+    """
+    now = now or timezone.now()
+    horizon = _half_life() * DECAY_HORIZON_HALF_LIVES
+    stale = ServicePost.objects.filter(
+        Q(rank_computed_at__isnull=True) | Q(rank_computed_at__lt=F('updatedAt') + horizon),
+        is_listed=True,
+    )
+    return refresh_rank_scores(stale, now)
+
+
+def rebuild_rank_scores(now=None):
+    """Recomputes `rank_score` for every post, e.g. after changing the weights."""
+    return refresh_rank_scores(ServicePost.objects.all(), now)
@@ -0,0 +1,135 @@
+"""
+Like/dislike bookkeeping for ServicePost.
+
+Every reaction change writes the M2M through row and adjusts the matching
+denormalized counter (`like_count` / `dislike_count`) with an `F()` update in
+the same transaction, so counters never drift from the through tables and
+toggles never rewrite the post row itself (`updatedAt` is left alone). The
+post's `rank_score` is rescored from the new counts right after.
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from Service.detail_cache import invalidate_service_details
+from Service.models import ServicePost
+from Service.ranking import rebuild_rank_scores, refresh_rank_scores
+
+LIKE = 'like'
+DISLIKE = 'dislike'
+
+# M2M field on ServicePost -> counter column caching its size.
+_COUNTERS = {
+    'likes': 'like_count',
+    'disLikes': 'dislike_count',
+}
+
+
+def _through(field):
+    return ServicePost._meta.get_field(field).remote_field.through
+
+
+def _changed(post_id, counter, delta):
+    posts = ServicePost.objects.filter(pk=post_id)
+    posts.update(**{counter: F(counter) + delta})
+    refresh_rank_scores(posts)
+    invalidate_service_details(posts.values_list('slug', flat=True))
+
+
+def _add(field, post_id, user_id):
+    _, created = _through(field).objects.get_or_create(servicepost_id=post_id, user_id=user_id)
+    if created:
+        _changed(post_id, _COUNTERS[field], 1)
+    return created
+
+
+def _remove(field, post_id, user_id):
+    deleted, _ = _through(field).objects.filter(servicepost_id=post_id, user_id=user_id).delete()
+    if deleted:
+        _changed(post_id, _COUNTERS[field], -deleted)
+    return bool(deleted)
+
+
+@transaction.atomic
+def add_like(post_id, user_id):
+    """Likes the post for the user, dropping any dislike they had on it."""
+    _remove('disLikes', post_id, user_id)
+    return _add('likes', post_id, user_id)
+
+
+@transaction.atomic
+def remove_like(post_id, user_id):
+    return _remove('likes', post_id, user_id)
+
+
+@transaction.atomic
+def add_dislike(post_id, user_id):
+    """Dislikes the post for the user, dropping any like they had on it."""
+    _remove('likes', post_id, user_id)
+    return _add('disLikes', post_id, user_id)
+
+
+@transaction.atomic
+def remove_dislike(post_id, user_id):
+    return _remove('disLikes', post_id, user_id)
+
+
+def reactions_for_user(user_id, post_ids):
+    """
+    Returns `{post_id: LIKE | DISLIKE}` for the posts in `post_ids` the user
+    has reacted to, using one indexed lookup per through table.
+    """
+    post_ids = list(post_ids)
+    if not user_id or not post_ids:
+        return {}
+    reactions = {}
+    for field, reaction in (('disLikes', DISLIKE), ('likes', LIKE)):
+        rows = _through(field).objects.filter(user_id=user_id, servicepost_id__in=post_ids)
+        for post_id in rows.values_list('servicepost_id', flat=True):
+            reactions[post_id] = reaction
+    return reactions
+
+
+def reaction_states(post_ids, user_id=None):
+    """
+    Returns `{post_id: {'like_count', 'dislike_count', 'user_reaction'}}` for
+    the existing posts in `post_ids`, in one query: the counters are the
+    denormalized columns and the user's reaction two EXISTS probes on the
+    through tables' (servicepost, user) indexes.
+    """
+    reacted = {}
+    for field, alias in (('likes', 'liked'), ('disLikes', 'disliked')):
+        if user_id:
+            reacted[alias] = Exists(_through(field).objects.filter(servicepost_id=OuterRef('pk'), user_id=user_id))
+        else:
+            reacted[alias] = Value(False)
+    rows = (
+        ServicePost.objects.filter(pk__in=post_ids).order_by()
+        .annotate(**reacted).values_list('pk', 'like_count', 'dislike_count', 'liked', 'disliked')
+    )
+    return {
+        pk: {
+            'like_count': like_count,
+            'dislike_count': dislike_count,
+            'user_reaction': LIKE if liked else DISLIKE if disliked else None,
+        }
+        for pk, like_count, dislike_count, liked, disliked in rows
+    }
+
+
+def rebuild_reaction_counts():
+    """
+    Recomputes both counters from the through tables, e.g. after backfilling
+    or after reactions were changed with `post.likes.add()` directly.
+    Returns the number of posts updated.
+    """
+    updates = {}
+    for field, counter in _COUNTERS.items():
+        counts = (
+            _through(field).objects.filter(servicepost_id=OuterRef('pk'))
+            .order_by().values('servicepost_id').annotate(n=Count('pk')).values('n')
+        )
+        updates[counter] = Coalesce(Subquery(counts), 0)
+    updated = ServicePost.objects.update(**updates)
+    rebuild_rank_scores()
+    return updated
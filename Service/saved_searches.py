@@ -0,0 +1,105 @@
+"""
+Matching of new listings against SavedSearches, and the match notifications.
+
+A post that is created listed or becomes listed (see
+`pre_save_service_post_receiever`, Service.signals and Service.bulk_import)
+is matched once, after commit, by `match_new_posts`. The post's candidate
+keys (`city:<city>`, `category:<category>`, `country:<country>` and
+SavedSearch.MATCH_ANY) are looked up in the `match_key` index. Only the
+searches stored under one of them are checked against the post, so the cost
+of a new post depends on the searches sharing its city, category or country,
+not on the number of saved searches. Hits become SavedSearchMatch rows.
+
+`manage.py notify_saved_searches` claims unnotified matches (SKIP LOCKED) and
+sends one FCM push per search and batch to the owner's devices, so clients
+read `/services/saved-searches/<id>/matches/` instead of polling the search.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from fcm_django.models import FCMDevice
+
+from Service.models import SavedSearch, SavedSearchMatch, ServicePost
+
+logger = logging.getLogger(__name__)
+
+MATCH_FIELDS = ('category', 'underCategory', 'country', 'state', 'city', 'pris')
+NOTIFY_BATCH_SIZE = 500 # Matches claimed per notification round.
+
+
+def candidate_keys(post):
+    """The `match_key`s of the saved searches `post` could match."""
+    keys = {SavedSearch.MATCH_ANY}
+    for name in SavedSearch.MATCH_KEY_FIELDS:
+        if getattr(post, name):
+            keys.add(SavedSearch.index_key(name, getattr(post, name)))
+    return keys
+
+
+def match_new_posts(post_ids):
+    """
+    Records a SavedSearchMatch for each listed post of `post_ids` and each
+    saved search (of another user) it passes. Returns the number of matches.
+    """
+    posts = list(ServicePost.objects.filter(pk__in=post_ids, is_listed=True).only('pk', 'employee_id', *MATCH_FIELDS))
+    if not posts:
+        return 0
+    keys = {post.pk: candidate_keys(post) for post in posts}
+    searches = defaultdict(list)
+    for search in SavedSearch.objects.filter(match_key__in=set().union(*keys.values())).order_by():
+        searches[search.match_key].append(search)
+    matches = [
+        SavedSearchMatch(search=search, post=post)
+        for post in posts
+        for key in keys[post.pk]
+        for search in searches.get(key, ())
+        if search.user_id != post.employee_id and search.accepts(post)
+    ]
+    SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return len(matches)
+
+
+def send_match_notification(search, posts):
+    """Pushes "N new services" for `search` to its owner's active devices."""
+    from firebase_admin import messaging
+
+    title = search.name or 'Saved search'
+    body = posts[0].title if len(posts) == 1 else '%d new services' % len(posts)
+    FCMDevice.objects.filter(user=search.user_id, active=True).send_message(
+        messaging.Message(notification=messaging.Notification(title=title, body=body), data={
+            'title': title,
+            'body': body,
+            'notificationType': 'SavedSearch',
+            'detailsId': str(search.pk),
+        })
+    )
+
+
+def notify_pending_matches(batch_size=NOTIFY_BATCH_SIZE):
+    """
+    Claims up to `batch_size` unnotified matches, sends one push per search
+    (searches with `notify` off are skipped) and marks them notified. A failed
+    push is logged and not retried. Returns the number of matches handled.
+    """
+    with transaction.atomic():
+        pending = list(
+            SavedSearchMatch.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('search', 'post')
+            .only('search__user_id', 'search__name', 'search__notify', 'post__title') # What the pushes read.
+            .filter(notified_at__isnull=True)
+            .order_by('pk')[:batch_size]
+        )
+        by_search = defaultdict(list)
+        for match in pending:
+            by_search[match.search].append(match.post)
+        for search, posts in by_search.items():
+            if not search.notify:
+                continue
+            try:
+                send_match_notification(search, posts)
+            except Exception:
+                logger.exception('Notifying saved search %s failed', search.pk)
+        SavedSearchMatch.objects.filter(pk__in=[match.pk for match in pending]).update(notified_at=timezone.now())
+    return len(pending)
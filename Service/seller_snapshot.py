@@ -0,0 +1,87 @@
+"""
+Maintenance of the seller fields copied onto ServicePosts (SELLER_SNAPSHOT_FIELDS:
+name, about, site_id and picture), so post reads never join the user table.
+
+Post saves copy them from the employee (`pre_save_service_post_receiever`).
+When a user changes one of the source fields, Service.signals queues a
+SellerSnapshotJob instead of touching the posts in the request. `manage.py
+sync_seller_snapshots` claims jobs and rewrites the seller's posts
+SERVICE_SELLER_SYNC_BATCH_SIZE rows per statement and transaction, dropping
+their cached detail responses as it goes, so a seller with many posts never
+holds long row locks. A seller who changes again while their job runs is
+processed again; a worker that dies leaves its job to be reclaimed after
+CLAIM_TIMEOUT.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from Service.detail_cache import invalidate_service_details
+from Service.models import SellerSnapshotJob, ServicePost, seller_snapshot
+
+CLAIM_TIMEOUT = timedelta(minutes=15) # A claimed job is handed to another worker after this long.
+
+# User fields copied by `seller_snapshot`.
+SNAPSHOT_SOURCE_FIELDS = ('first_name', 'about', 'site_id', 'picture')
+
+
+def queue_seller_snapshot(employee):
+    """Queues a refresh of `employee`'s posts, or moves an already queued one's `queued_at`."""
+    SellerSnapshotJob.objects.bulk_create(
+        [SellerSnapshotJob(employee=employee, queued_at=timezone.now())],
+        update_conflicts=True, unique_fields=['employee'], update_fields=['queued_at'],
+    )
+
+
+def refresh_seller_posts(employee, batch_size=None):
+    """
+    Writes `employee`'s current snapshot to each of their posts, one batch of
+    primary keys per transaction. Returns the number of posts written.
+    """
+    batch_size = batch_size or settings.SERVICE_SELLER_SYNC_BATCH_SIZE
+    values = seller_snapshot(employee)
+    posts = ServicePost.objects.filter(employee=employee).order_by('pk')
+    last_pk, written = 0, 0
+    while batch := list(posts.filter(pk__gt=last_pk).values_list('pk', 'slug')[:batch_size]):
+        last_pk = batch[-1][0]
+        with transaction.atomic():
+            written += ServicePost.objects.filter(pk__in=[pk for pk, _slug in batch]).update(**values)
+        invalidate_service_details([slug for _pk, slug in batch])
+    return written
+
+
+def claim_next_job(now=None):
+    """Claims the oldest unclaimed (or stale) job, skipping rows locked by other workers."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        job = (
+            SellerSnapshotJob.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('employee')
+            .filter(Q(started_at__isnull=True) | Q(started_at__lt=now - CLAIM_TIMEOUT))
+            .order_by('queued_at')
+            .first()
+        )
+        if job is not None:
+            job.started_at = now
+            job.save(update_fields=['started_at'])
+    return job
+
+
+def process_next_job():
+    """
+    Claims and runs one job. The job is deleted if the seller did not change
+    meanwhile, otherwise released to run again. Returns the job, or None when
+    the queue is empty.
+    """
+    job = claim_next_job()
+    if job is None:
+        return None
+    job.employee.refresh_from_db(fields=SNAPSHOT_SOURCE_FIELDS)
+    refresh_seller_posts(job.employee)
+    finished = SellerSnapshotJob.objects.filter(pk=job.pk, queued_at=job.queued_at).delete()[0]
+    if not finished:
+        SellerSnapshotJob.objects.filter(pk=job.pk).update(started_at=None)
+    return job
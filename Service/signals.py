@@ -0,0 +1,101 @@
+"""Signal handlers that keep ServicePost denormalizations and caches in sync with other models."""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from Service.comments import comment_count_changed
+from Service.detail_cache import invalidate_service_details
+from Service.listing import refresh_employee_posts
+from Service.locations import publish_new_cities, rebuild_location_bundle
+from Service.models import PREMIUM_SUBSCRIPTIONS, ModelComments, ModelCountry, ModelState, ServicePost
+from Service.ranking import refresh_rank_scores
+from Service.saved_searches import match_new_posts
+from Service.seller_snapshot import SNAPSHOT_SOURCE_FIELDS, queue_seller_snapshot
+
+# User fields whose changes affect the user's ServicePosts.
+TRACKED_USER_FIELDS = ('subscription_type',) + SNAPSHOT_SOURCE_FIELDS
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_tracked_user_fields(sender, instance, update_fields=None, **kwargs):
+    """Stashes the stored TRACKED_USER_FIELDS so post_save can tell which of them changed."""
+    if instance.pk is None:
+        return
+    fields = [name for name in TRACKED_USER_FIELDS if update_fields is None or name in update_fields]
+    if not fields:
+        return
+    instance._previous_tracked_fields = sender.objects.filter(pk=instance.pk).values(*fields).first() or {}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sync_posts_on_user_change(sender, instance, created, **kwargs):
+    """
+    Re-evaluates `is_listed` and `rank_score` on the user's posts when they
+    move on or off a premium plan, and queues a refresh of the seller fields
+    copied onto them (Service.seller_snapshot) when one of those changes.
+    """
+    if '_previous_tracked_fields' not in instance.__dict__:
+        return
+    previous = instance.__dict__.pop('_previous_tracked_fields')
+    if 'subscription_type' in previous and (
+        (previous['subscription_type'] in PREMIUM_SUBSCRIPTIONS) != (instance.subscription_type in PREMIUM_SUBSCRIPTIONS)
+    ):
+        refresh_employee_posts(instance)
+        refresh_rank_scores(ServicePost.objects.filter(employee=instance))
+    # FieldFile compares equal to its name, so `picture` needs no special case.
+    if any(name in previous and previous[name] != getattr(instance, name) for name in SNAPSHOT_SOURCE_FIELDS):
+        if ServicePost.objects.filter(employee=instance).exists():
+            queue_seller_snapshot(instance)
+
+
+@receiver(post_save, sender=ServicePost)
+@receiver(post_delete, sender=ServicePost)
+def drop_cached_service_detail(sender, instance, **kwargs):
+    """Drops the post's cached detail responses whenever the row is saved or deleted."""
+    invalidate_service_details([instance.slug])
+
+
+@receiver(post_save, sender=ServicePost)
+def rescore_saved_post(sender, instance, **kwargs):
+    """Rescores the post after a save: its rating or `updatedAt` (freshness) may have changed."""
+    refresh_rank_scores(ServicePost.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=ServicePost)
+def match_saved_searches(sender, instance, **kwargs):
+    """Matches a post that was created listed or just became listed against the saved searches, after commit."""
+    if instance.__dict__.pop('_newly_listed', False):
+        post_id = instance.pk
+        transaction.on_commit(lambda: match_new_posts([post_id]), robust=True)
+
+
+@receiver(post_save, sender=ModelComments)
+def count_added_comment(sender, instance, created, raw=False, **kwargs):
+    """Keeps `ServicePost.comment_count` in step with new comments (Service.comments)."""
+    if created and not raw:
+        comment_count_changed(instance.postNumber_id, 1)
+
+
+@receiver(post_delete, sender=ModelComments)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    """Decrements `comment_count`, except for comments cascading from their post's own deletion."""
+    if isinstance(origin, ServicePost) or getattr(origin, 'model', None) is ServicePost:
+        return
+    comment_count_changed(instance.postNumber_id, -1)
+
+
+@receiver(post_save, sender=ServicePost)
+def publish_new_city(sender, instance, **kwargs):
+    """Rebuilds the location bundle after commit when a listed post names a city it lacks (Service.locations)."""
+    if instance.is_listed:
+        publish_new_cities([instance.city])
+
+
+@receiver(post_save, sender=ModelCountry)
+@receiver(post_delete, sender=ModelCountry)
+@receiver(post_save, sender=ModelState)
+@receiver(post_delete, sender=ModelState)
+def rebuild_locations_on_change(sender, **kwargs):
+    """Rebuilds the location bundle after commit; unchanged content publishes nothing."""
+    transaction.on_commit(rebuild_location_bundle, robust=True)
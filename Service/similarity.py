@@ -0,0 +1,157 @@
+"""
+Precomputed "similar services" (ServiceSimilarity rows) from TF-IDF vectors.
+
+Each listed post becomes a bag of words from its title (counted twice),
+category, underCategory and beskrivning. Terms are weighted by sublinear tf
+(1 + ln count) times smoothed idf, and rows are L2-normalized, so the dot
+product of two rows is their cosine similarity. The vectors form a SciPy CSR
+matrix that is rebuilt from the listed posts on every run (linear in the
+corpus). Comparing posts is the expensive part, so it is done in row blocks
+and, for incremental builds, only for the posts that need it:
+
+- posts saved since their neighbours were last computed (`similar_computed_at`);
+- posts whose stored lists contain one of those;
+- posts that one of those would now enter (it beats their weakest neighbour).
+
+`manage.py build_similar_services` runs this; `--full` recomputes every post,
+e.g. nightly, to also pick up posts that were relisted or drifted through idf
+changes.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from scipy import sparse
+
+from Service.models import ServicePost, ServiceSimilarity
+
+TITLE_WEIGHT = 2 # Title words are counted this many times.
+BLOCK_ROWS = 1024 # Posts compared against the corpus per sparse product.
+
+_TOKEN_RE = re.compile(r'[^\W\d_]{2,}') # Words of two or more letters, in any script.
+
+
+def document_terms(title, category, under_category, description):
+    """The terms of one post, repeated per occurrence."""
+    def words(text):
+        return _TOKEN_RE.findall((text or '').lower())
+    return words(title) * TITLE_WEIGHT + words(category) + words(under_category) + words(description)
+
+
+def tfidf_matrix(documents):
+    """L2-normalized TF-IDF CSR matrix with one row per term list in `documents`."""
+    vocabulary = {}
+    indptr, indices, counts = [0], [], []
+    for terms in documents:
+        term_counts = Counter(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+        indices.extend(term_counts.keys())
+        counts.extend(term_counts.values())
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), len(vocabulary)),
+    )
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + matrix.shape[0]) / (1 + document_frequency)) + 1
+    matrix.data = (1 + np.log(matrix.data)) * idf[matrix.indices]
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def nearest_neighbours(matrix, rows, count, min_score):
+    """
+    Yields `(row, [(neighbour_row, score), ...])` for each of `rows`, best
+    first, leaving out the row itself and scores below `min_score`.
+    """
+    transposed = matrix.T.tocsc()
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block_rows = rows[start:start + BLOCK_ROWS]
+        scores = (matrix[block_rows] @ transposed).tocsr()
+        for offset, row in enumerate(block_rows):
+            begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+            columns, values = scores.indices[begin:end], scores.data[begin:end]
+            keep = (columns != row) & (values >= min_score)
+            columns, values = columns[keep], values[keep]
+            if len(values) > count:
+                top = np.argpartition(-values, count)[:count]
+                columns, values = columns[top], values[top]
+            order = np.argsort(-values, kind='stable')
+            yield row, list(zip(columns[order].tolist(), values[order].tolist()))
+
+
+def _neighbour_floors(count, min_score):
+    """`{post_id: score}` a new neighbour has to beat to enter the post's stored list."""
+    floors = {}
+    rows = ServiceSimilarity.objects.values('post_id').annotate(n=Count('pk'), low=Min('score'))
+    for row in rows:
+        floors[row['post_id']] = row['low'] if row['n'] >= count else min_score
+    return floors
+
+
+def _affected_rows(matrix, ids, changed_rows, count, min_score):
+    """Rows to recompute in an incremental build: see the module docstring."""
+    affected = set(changed_rows)
+    changed_ids = ids[changed_rows].tolist()
+    row_of = {post_id: row for row, post_id in enumerate(ids.tolist())}
+    listing = ServiceSimilarity.objects.filter(similar_id__in=changed_ids).values_list('post_id', flat=True)
+    affected.update(row_of[post_id] for post_id in listing if post_id in row_of)
+    floors = _neighbour_floors(count, min_score)
+    for start in range(0, len(changed_rows), BLOCK_ROWS):
+        scores = (matrix[changed_rows[start:start + BLOCK_ROWS]] @ matrix.T).tocsc()
+        best = scores.max(axis=0).toarray().ravel()
+        for row in np.flatnonzero(best >= min_score).tolist():
+            if best[row] > floors.get(int(ids[row]), min_score):
+                affected.add(row)
+    return np.asarray(sorted(affected), dtype=np.int64)
+
+
+def build_similarities(full=False, now=None):
+    """
+    Recomputes ServiceSimilarity rows for listed posts (all of them with
+    `full`, otherwise only those affected by recent saves). Returns the number
+    of posts whose neighbours were recomputed.
+    """
+    now = now or timezone.now()
+    count, min_score = settings.SERVICE_SIMILAR_COUNT, settings.SERVICE_SIMILAR_MIN_SCORE
+    posts = list(
+        ServicePost.objects.filter(is_listed=True).order_by('pk')
+        .values_list('pk', 'title', 'category', 'underCategory', 'beskrivning')
+    )
+    if not posts:
+        if full:
+            ServiceSimilarity.objects.all().delete()
+        return 0
+    ids = np.asarray([post[0] for post in posts], dtype=np.int64)
+    matrix = tfidf_matrix([document_terms(*post[1:]) for post in posts])
+
+    if full:
+        rows = np.arange(len(ids))
+    else:
+        changed = ServicePost.objects.filter(
+            Q(similar_computed_at__isnull=True) | Q(updatedAt__gt=F('similar_computed_at')), is_listed=True
+        ).values_list('pk', flat=True)
+        changed_rows = np.flatnonzero(np.isin(ids, np.fromiter(changed, dtype=np.int64)))
+        if not len(changed_rows):
+            return 0
+        rows = _affected_rows(matrix, ids, changed_rows, count, min_score)
+
+    with transaction.atomic():
+        if full:
+            ServiceSimilarity.objects.all().delete()
+        else:
+            ServiceSimilarity.objects.filter(post_id__in=ids[rows].tolist()).delete()
+        ServiceSimilarity.objects.bulk_create(
+            (
+                ServiceSimilarity(post_id=int(ids[row]), similar_id=int(ids[neighbour]), score=score)
+                for row, neighbours in nearest_neighbours(matrix, rows, count, min_score)
+                for neighbour, score in neighbours
+            ),
+            batch_size=1000,
+        )
+        ServicePost.objects.filter(pk__in=ids[rows].tolist()).update(similar_computed_at=now)
+    return len(rows)
@@ -0,0 +1,136 @@
+"""
+Typeahead suggestions for the service search box.
+
+`suggest(q)` returns the best matching titles, categories and cities of listed
+posts in one `UNION ALL` query. Matching is a case-insensitive substring test
+(`UPPER(col) LIKE UPPER('%q%')`), answered by the partial `gin_trgm_ops`
+indexes on `UPPER(title|category|city)`. Prefix matches rank first, then
+trigram similarity to the query, then the number of posts.
+
+Results are kept in a per-process LRU keyed by the normalized query. A cached
+shorter prefix that returned fewer than `limit` rows of every kind holds every
+possible match, so longer queries typed after it are filtered from it in memory
+without touching the database.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, CharField, Count, F, IntegerField, Value, When
+
+from Service.models import ServicePost
+
+# Response key -> ServicePost column suggested from.
+SUGGEST_FIELDS = {
+    'titles': 'title',
+    'categories': 'category',
+    'cities': 'city',
+}
+
+
+def normalize_query(q):
+    return ' '.join(q.split()).lower()[:ServicePost._meta.get_field('title').max_length]
+
+
+def _sort_key(row):
+    return (-row['prefix'], -row['similarity'], -row['posts'], row['value'])
+
+
+def _matches(queryset, kind, column, q, limit):
+    return (
+        queryset.filter(**{column + '__icontains': q})
+        .order_by()
+        .values(value=F(column))
+        .annotate(
+            kind=Value(kind, output_field=CharField()),
+            prefix=Case(When(**{column + '__istartswith': q}, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            similarity=TrigramSimilarity(column, q),
+            posts=Count('pk'),
+        )
+        .order_by('-prefix', '-similarity', '-posts', 'value')[:limit]
+    )
+
+
+def query_suggestions(q, limit):
+    """Runs the suggestion query; returns `{kind: [row, ...]}` with rows in rank order."""
+    listed = ServicePost.objects.filter(is_listed=True)
+    parts = [_matches(listed, kind, column, q, limit) for kind, column in SUGGEST_FIELDS.items()]
+    rows = {kind: [] for kind in SUGGEST_FIELDS}
+    for row in parts[0].union(*parts[1:], all=True):
+        if row['value']:
+            rows[row['kind']].append(row)
+    for kind_rows in rows.values():
+        kind_rows.sort(key=_sort_key)
+    return rows
+
+
+class PrefixCache:
+    """Thread-safe LRU of suggestion rows per normalized query, with a TTL."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, rows):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = PrefixCache(settings.SERVICE_SUGGEST_CACHE_SIZE, settings.SERVICE_SUGGEST_CACHE_SECONDS)
+
+
+def _narrowed(rows, q):
+    """Filters complete rows of a shorter prefix down to those matching `q`."""
+    narrowed = {}
+    for kind, kind_rows in rows.items():
+        matching = [dict(row, prefix=int(row['value'].lower().startswith(q))) for row in kind_rows if q in row['value'].lower()]
+        narrowed[kind] = sorted(matching, key=_sort_key)
+    return narrowed
+
+
+def suggestion_rows(q, limit):
+    """Rows for normalized query `q`, from the prefix cache when possible."""
+    rows = _cache.get(q)
+    if rows is not None:
+        return rows
+    for end in range(len(q) - 1, settings.SERVICE_SUGGEST_MIN_LENGTH - 1, -1):
+        shorter = _cache.get(q[:end])
+        if shorter is not None and all(len(kind_rows) < limit for kind_rows in shorter.values()):
+            rows = _narrowed(shorter, q)
+            break
+    else:
+        rows = query_suggestions(q, limit)
+    _cache.set(q, rows)
+    return rows
+
+
+def suggest(q):
+    """Returns `{'titles': [...], 'categories': [...], 'cities': [...]}` for the raw query `q`."""
+    limit = settings.SERVICE_SUGGEST_LIMIT
+    q = normalize_query(q)
+    if len(q) < settings.SERVICE_SUGGEST_MIN_LENGTH:
+        return {kind: [] for kind in SUGGEST_FIELDS}
+    rows = suggestion_rows(q, limit)
+    return {kind: [row['value'] for row in kind_rows[:limit]] for kind, kind_rows in rows.items()}
@@ -3,7 +3,13 @@ for the Service app.
 """
 #import cv2 # Commented out as it's not used in the current active code.
 import os
-from PIL import Image, ExifTags
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from PIL import Image, ExifTags, UnidentifiedImageError
+
+# EXIF orientations that rotate the image by 90 degrees, swapping width and height.
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
 
 def is_image_aspect_ratio_valid(img_url):
 	"""
@@ -63,4 +69,78 @@ def rotate_image(img):
   except (AttributeError, KeyError, IndexError):
     # Silently ignore errors if EXIF data is missing or malformed.
     # Consider logging these errors for debugging if issues arise.
-    pass
\ No newline at end of file
+    pass
+
+
+def upload_size_within(upload, max_bytes):
+	"""
+	Checks that an uploaded file is at most `max_bytes` long without writing it anywhere.
+	Uses the size reported by the upload handler when known, otherwise counts the
+	bytes chunk by chunk and stops as soon as the limit is passed.
+	"""
+	if getattr(upload, 'size', None) is not None:
+		return upload.size <= max_bytes
+	total = 0
+	for chunk in upload.chunks():
+		total += len(chunk)
+		if total > max_bytes:
+			return False
+	return True
+
+
+def read_image_header(upload):
+	"""
+	Returns the displayed (width, height) of an uploaded image, i.e. after EXIF
+	orientation is applied. Only the header is parsed; no pixel data is decoded.
+	"""
+	upload.seek(0)
+	with Image.open(upload) as img:
+		width, height = img.size
+		orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+	upload.seek(0)
+	if orientation in _TRANSPOSED_ORIENTATIONS:
+		return height, width
+	return width, height
+
+
+def validate_service_image(upload):
+	"""
+	Upload validator for ServicePost images: enforces SERVICE_IMAGE_MAX_BYTES and,
+	when set, SERVICE_IMAGE_MIN_ASPECT_RATIO (width / height) from the image header.
+	Replaces the old write-to-TEMP, stat, reopen-with-PIL round trip.
+	"""
+	max_bytes = settings.SERVICE_IMAGE_MAX_BYTES
+	if not upload_size_within(upload, max_bytes):
+		raise ValidationError(
+			"That image is too large. Images must be less than %(mb)g MB. Try a different image.",
+			code='image_too_large', params={'mb': round(max_bytes / (1024 * 1024), 1)})
+
+	min_aspect_ratio = settings.SERVICE_IMAGE_MIN_ASPECT_RATIO
+	if min_aspect_ratio is None:
+		return
+	try:
+		width, height = read_image_header(upload)
+	except (UnidentifiedImageError, OSError):
+		raise ValidationError("Upload a valid image.", code='invalid_image')
+	if not height or width / height < min_aspect_ratio:
+		raise ValidationError(
+			"Image height must not exceed image width. Try a different image.",
+			code='image_aspect_ratio')
+
+
+class DecodeAtScale:
+	"""
+	pilkit processor that lets Pillow's JPEG decoder produce a reduced-scale image
+	(1/2, 1/4 or 1/8) that still covers `width` x `height`, so large photos are never
+	decoded at full size. It must come first in a processor list, before anything
+	forces a decode; EXIF transposition and resizing then run on that one decode.
+	"""
+
+	def __init__(self, width, height):
+		# Requested as a square so the covered size holds whichever way EXIF rotates the image.
+		self.size = (max(width, height), max(width, height))
+
+	def process(self, img):
+		if img.format == 'JPEG':
+			img.draft(img.mode, self.size)
+		return img
@@ -15,9 +15,10 @@ from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
-from imagekit.models.fields import ProcessedImageField
 from imagekit.processors import ResizeToFill
 
+from Neetechs.images import ContentAddressedImageField, register_responsive_variants
+
 
 # ---------- helpers ----------
 
@@ -38,7 +39,8 @@ def _avatar_upload_path(instance, filename: str, *, variant: str) -> str:
     """
     Stable, non-colliding upload path for each avatar variant.
     IMPORTANT: Each ProcessedImageField MUST write to a unique path, otherwise
-    different sizes overwrite each other.
+    different sizes overwrite each other. (Only used with MEDIA_CONTENT_ADDRESSED
+    off; the avatar fields are content-addressed by default.)
     """
     ext = (filename.rsplit(".", 1)[-1] if "." in filename else "png").lower() or "png"
     return f"pictures/{instance.site_id}/avatar_{variant}.{ext}"
@@ -205,7 +207,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     member_since = models.DateTimeField(default=timezone.now, null=True, blank=True)
     
     # AVATARS (imagekit)
-    picture = ProcessedImageField(
+    picture = ContentAddressedImageField(
         format="PNG",
         processors=[ResizeToFill(512, 512)],
         options={"quality": 70},
@@ -214,7 +216,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True,
         default="ProfileDefaultImage.png",
     )
-    picture_medium = ProcessedImageField(
+    picture_medium = ContentAddressedImageField(
         format="PNG",
         processors=[ResizeToFill(256, 256)],
         options={"quality": 70},
@@ -223,7 +225,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True,
         default="ProfileDefaultImage.png",
     )
-    picture_small = ProcessedImageField(
+    picture_small = ContentAddressedImageField(
         format="PNG",
         processors=[ResizeToFill(128, 128)],
         options={"quality": 70},
@@ -232,7 +234,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True,
         default="ProfileDefaultImage.png",
     )
-    picture_tag = ProcessedImageField(
+    picture_tag = ContentAddressedImageField(
         format="PNG",
         processors=[ResizeToFill(28, 28)],
         options={"quality": 70},
@@ -315,3 +317,6 @@ class User(AbstractBaseUser, PermissionsMixin):
     def name(self) -> str:
         """Backwards-compatible 'name' property for templates / serializers."""
         return self.display_name or f"{self.first_name} {self.last_name}".strip() or self.username
+
+
+register_responsive_variants(User, "picture", max_width=512)
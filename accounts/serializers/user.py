@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from allauth.account.models import EmailAddress
 
+from Neetechs.images import SrcsetField
+
 from ..models import User
 
 
@@ -27,6 +29,9 @@ class UserSerializer(serializers.ModelSerializer):
     CategoryLastupdate = serializers.SerializerMethodField()
     SubcategoryLastupdate = serializers.SerializerMethodField()
 
+    # WebP/AVIF variants of `picture` by width
+    picture_srcset = SrcsetField(source="picture")
+
     class Meta:
         model = User
         # NOTE: depth=1 removed on purpose (slow + unpredictable)
@@ -57,6 +62,7 @@ class UserSerializer(serializers.ModelSerializer):
             "country",
             "member_since",
             "picture",
+            "picture_srcset",
             "picture_medium",
             "picture_small",
             "picture_tag",
@@ -4,6 +4,8 @@ from imagekit.models.fields import ProcessedImageField
 
 from imagekit.processors import ResizeToFill#, ResizeToFill
 
+from Neetechs.images import register_responsive_variants
+
 def Home_upload_location(instance, filename, **kwargs):
 	file_path = 'home/{name}-{filename}'.format(
 			name=str(instance.name), filename=filename
@@ -32,6 +34,8 @@ class HomeSliderMoudel(models.Model):
     def __str__(self):
         return self.name
 
+register_responsive_variants(HomeSliderMoudel, 'img_x_large', max_width=512)
+
 class HomeContainersModel(models.Model):
     Added_at = models.DateTimeField(auto_now_add=True, verbose_name="Added at")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated at")
@@ -54,3 +58,5 @@ class HomeContainersModel(models.Model):
 
     def __str__(self):
         return self.name
+
+register_responsive_variants(HomeContainersModel, 'img_x_large', max_width=512)
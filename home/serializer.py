@@ -1,12 +1,19 @@
 from rest_framework import serializers
+
+from Neetechs.images import SrcsetField
+
 from .models import HomeSliderMoudel,HomeContainersModel
 
 class HomeSliderSerializer(serializers.ModelSerializer):
+    img_x_large_srcset = SrcsetField(source='img_x_large')
+
     class Meta:
         model = HomeSliderMoudel
-        fields = ('id','description','name','img_x_large')
+        fields = ('id','description','name','img_x_large','img_x_large_srcset')
 
 class HomeContainersSerializer(serializers.ModelSerializer):
+    img_x_large_srcset = SrcsetField(source='img_x_large')
+
     class Meta:
         model = HomeContainersModel
-        fields = ('id','description','name','img_x_large')
\ No newline at end of file
+        fields = ('id','description','name','img_x_large','img_x_large_srcset')
\ No newline at end of file
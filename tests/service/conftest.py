@@ -0,0 +1,76 @@
+"""Shared fixtures for the Service tests."""
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import override_settings
+
+from accounts.models import User
+from PIL import Image
+
+from Service.models import ServicePost
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _no_timed_analytics_flush():
+    # Tests flush the view counters explicitly; a timed background flush would race them.
+    with override_settings(SERVICE_ANALYTICS_FLUSH_SECONDS=24 * 3600):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Throttle counters and cached responses must not leak between tests.
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    counter = iter(range(1, 10_000))
+
+    def make(**fields):
+        return User.objects.create_user(f"user{next(counter)}@example.com", "pw", **fields)
+
+    return make
+
+
+@pytest.fixture
+def seller(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def make_post(seller):
+    counter = iter(range(1, 10_000))
+
+    def make(**fields):
+        n = next(counter)
+        fields.setdefault("employee", seller)
+        fields.setdefault("title", f"Service {n}")
+        fields.setdefault("pris", 100)
+        fields.setdefault("beskrivning", f"Description of service number {n}")
+        return ServicePost.objects.create(**fields)
+
+    return make
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_CONTENT_ADDRESSED = True
+    return tmp_path
+
+
+@pytest.fixture
+def png(media):
+    """Factory of PNG uploads; equal colors give equal files."""
+
+    def make(color="red", size=(32, 32)):
+        raw = io.BytesIO()
+        Image.new("RGB", size, color).save(raw, format="PNG")
+        return SimpleUploadedFile(f"{color}.png", raw.getvalue(), content_type="image/png")
+
+    return make
@@ -0,0 +1,40 @@
+"""Write-behind view and impression counters (Service.analytics)."""
+import time
+
+import pytest
+
+from Service import analytics
+from Service.models import ServicePostDailyStats
+
+
+@pytest.mark.django_db
+def test_counts_are_buffered_until_flushed(make_post, django_assert_num_queries):
+    post = make_post()
+
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            analytics.record_view(post.slug)
+        analytics.record_impressions([post.pk, post.pk])
+
+    analytics.flush()
+    stats = ServicePostDailyStats.objects.get(post=post)
+    assert (stats.views, stats.impressions) == (3, 2)
+
+    analytics.record_view(post.slug)
+    analytics.flush()
+    stats.refresh_from_db()
+    assert stats.views == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_full_buffer_is_flushed_by_the_background_thread(make_post, settings):
+    settings.SERVICE_ANALYTICS_MAX_BUFFERED = 1
+    post = make_post()
+
+    analytics.record_view(post.slug)  # Returns without writing ...
+
+    deadline = time.monotonic() + 5
+    while not ServicePostDailyStats.objects.filter(post=post).exists():  # ... the flusher does.
+        assert time.monotonic() < deadline, "counts were not flushed"
+        time.sleep(0.05)
+    assert ServicePostDailyStats.objects.get(post=post).views == 1
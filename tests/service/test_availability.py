@@ -0,0 +1,45 @@
+"""`?available_from=`/`?available_to=` window overlap (AvailabilityFilter)."""
+from datetime import datetime, timezone
+
+import pytest
+
+URL = "/api/v1/services/search/"
+
+
+def day(n):
+    return datetime(2030, 6, n, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def windows(make_post):
+    return {
+        "early": make_post(tillganligFran=day(1), tillganligTill=day(5)),
+        "late": make_post(tillganligFran=day(10), tillganligTill=day(20)),
+        "inverted": make_post(tillganligFran=day(9), tillganligTill=day(2)),
+    }
+
+
+def found(client, windows, **params):
+    slugs = {row["slug"] for row in client.get(URL, params).json()["results"]}
+    return {name for name, post in windows.items() if post.slug in slugs}
+
+
+@pytest.mark.django_db
+def test_windows_overlapping_the_request_match(client, windows):
+    assert found(client, windows, available_from=day(4).isoformat(), available_to=day(11).isoformat()) == {"early", "late"}
+    assert found(client, windows, available_from=day(6).isoformat(), available_to=day(9).isoformat()) == set()
+
+
+@pytest.mark.django_db
+def test_bounds_are_inclusive_and_may_be_open(client, windows):
+    assert found(client, windows, available_from=day(5).isoformat(), available_to=day(5).isoformat()) == {"early"}
+    assert found(client, windows, available_from=day(15).isoformat()) == {"late"}
+    assert found(client, windows, available_to=day(1).isoformat()) == {"early"}
+
+
+@pytest.mark.django_db
+def test_reversed_request_window_is_rejected(client, windows):
+    response = client.get(URL, {"available_from": day(5).isoformat(), "available_to": day(1).isoformat()})
+
+    assert response.status_code == 400
+    assert "available_to" in response.json()["errors"]
@@ -0,0 +1,40 @@
+"""Bulk import of ServicePosts (Service.bulk_import)."""
+import io
+import json
+
+import pytest
+from django.utils import timezone
+
+from Service.bulk_import import import_services
+from Service.locations import current_bundle, rebuild_location_bundle
+from Service.models import ServicePost
+
+
+def jsonl(*rows):
+    return io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+
+def row(**fields):
+    expires = (timezone.now() + timezone.timedelta(days=30)).isoformat()
+    return {"title": "Imported service", "pris": 50, "beskrivning": "Imported description", "expiration_date": expires, **fields}
+
+
+@pytest.mark.django_db
+def test_valid_rows_are_created_and_invalid_ones_reported(seller):
+    report = import_services(jsonl(row(), {"title": "No price"}, row(title="Second")), "jsonl", seller)
+
+    assert report["created"] == 2
+    assert report["invalid"] == 1
+    assert [error["line"] for error in report["errors"]] == [2]
+    assert ServicePost.objects.filter(employee=seller, is_listed=True).count() == 2
+
+
+@pytest.mark.django_db
+def test_import_publishes_new_cities_once_committed(seller, django_capture_on_commit_callbacks):
+    rebuild_location_bundle()
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        import_services(jsonl(row(city="Uppsala"), row(city="Uppsala"), row(city="Lund")), "jsonl", seller)
+
+    assert callbacks.count(rebuild_location_bundle) == 1
+    assert {"Uppsala", "Lund"} <= current_bundle()["cities"]
@@ -0,0 +1,74 @@
+"""Comment counters and the per-post comments endpoint (Service.comments)."""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Service.comments import rebuild_comment_counts
+from Service.models import ModelComments, ServicePost
+
+
+def comment_count(post):
+    return ServicePost.objects.values_list("comment_count", flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_counter_follows_created_and_deleted_comments(make_post):
+    post = make_post()
+    updated_at = ServicePost.objects.get(pk=post.pk).updatedAt
+    first = ModelComments.objects.create(postNumber=post, comment="one")
+    ModelComments.objects.create(postNumber=post, comment="two")
+    assert comment_count(post) == 2
+
+    first.comment = "edited"
+    first.save()
+    first.delete()
+
+    assert comment_count(post) == 1
+    assert ServicePost.objects.get(pk=post.pk).updatedAt == updated_at
+
+
+@pytest.mark.django_db
+def test_deleting_the_post_cascades_without_counting(make_post):
+    post = make_post()
+    ModelComments.objects.create(postNumber=post, comment="one")
+
+    post.delete()
+
+    assert not ModelComments.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_resyncs_after_bulk_writes(make_post):
+    post, other = make_post(), make_post()
+    ModelComments.objects.bulk_create([ModelComments(postNumber=post, comment=str(n)) for n in range(3)])
+    ModelComments.objects.create(postNumber=other, comment="moved")
+    ModelComments.objects.filter(postNumber=other).update(postNumber=post)
+
+    rebuild_comment_counts()
+
+    assert (comment_count(post), comment_count(other)) == (4, 0)
+
+
+@pytest.mark.django_db
+def test_endpoint_pages_a_posts_comments_oldest_first(make_post):
+    post, other = make_post(), make_post()
+    start = timezone.now()
+    ModelComments.objects.bulk_create(
+        [ModelComments(postNumber=post, comment=str(n), created=start + timedelta(seconds=n)) for n in range(20)]
+        + [ModelComments(postNumber=other, comment="elsewhere")]
+    )
+    client = APIClient()
+
+    first = client.get(f"/api/v1/services/{post.slug}/comments/").json()
+    second = client.get(first["next"]).json()
+
+    comments = [row["comment"] for row in first["results"] + second["results"]]
+    assert comments == [str(n) for n in range(20)]
+    assert second["next"] is None
+
+
+@pytest.mark.django_db
+def test_endpoint_404s_for_unknown_posts():
+    assert APIClient().get("/api/v1/services/no-such-post/comments/").status_code == 404
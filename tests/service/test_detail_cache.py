@@ -0,0 +1,41 @@
+"""Cached ServicePost detail responses (Service.detail_cache)."""
+import pytest
+from django.db import transaction
+
+from Service.detail_cache import cache_detail_response, cached_detail_response, detail_version
+from Service.models import ServicePost
+
+
+def detail(client, slug):
+    response = client.get(f"/api/v1/services/{slug}/")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_save_invalidates_the_cached_detail(client, make_post, django_capture_on_commit_callbacks):
+    post = make_post(title="Old title")
+    assert detail(client, post.slug)["title"] == "Old title"
+    assert cached_detail_response(post.slug, detail_version(post.slug)) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "New title"
+        post.save()
+
+    assert detail(client, post.slug)["title"] == "New title"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rendering_read_before_a_commit_is_not_served(make_post):
+    post = make_post(title="Old title")
+    version = detail_version(post.slug)  # A cache miss reads the version first ...
+    stale = ServicePost.objects.get(pk=post.pk)  # ... then the row.
+
+    with transaction.atomic():
+        post.title = "New title"
+        post.save()  # Invalidates on commit.
+
+    cache_detail_response(stale, version, {"title": stale.title})
+
+    assert detail_version(post.slug) != version
+    assert cached_detail_response(post.slug, detail_version(post.slug)) is None
@@ -0,0 +1,42 @@
+"""Near-duplicate detection of reposts (Service.duplicates, ServicePostCreateSerializer)."""
+from types import SimpleNamespace
+
+import pytest
+from django.utils import timezone
+
+from Service.api.serializers import ServicePostCreateSerializer
+
+TITLE = "Window cleaning for homes and offices"
+TEXT = "We clean windows inside and out, including frames and sills, with eco friendly products in the whole city area."
+
+
+def create(seller, **fields):
+    data = {"title": TITLE, "beskrivning": TEXT, "pris": 300, **fields}
+    serializer = ServicePostCreateSerializer(data=data, context={"request": SimpleNamespace(user=seller)})
+    assert serializer.is_valid(), serializer.errors
+    return serializer.save(employee=seller)
+
+
+@pytest.mark.django_db
+def test_repost_of_a_listed_post_is_created_and_flagged(seller, make_post):
+    original = make_post(title=TITLE, beskrivning=TEXT, expiration_date=timezone.now() + timezone.timedelta(days=30))
+    assert original.is_listed
+
+    repost = create(seller)
+
+    assert repost.pk != original.pk
+    assert repost.duplicate_of == original
+
+
+@pytest.mark.django_db
+def test_expired_posts_may_be_reposted(seller, make_post):
+    make_post(title=TITLE, beskrivning=TEXT, expiration_date=timezone.now() - timezone.timedelta(days=1))
+
+    assert create(seller).duplicate_of is None
+
+
+@pytest.mark.django_db
+def test_other_sellers_posts_are_not_duplicates(seller, make_user, make_post):
+    make_post(employee=make_user(), title=TITLE, beskrivning=TEXT, expiration_date=timezone.now() + timezone.timedelta(days=30))
+
+    assert create(seller).duplicate_of is None
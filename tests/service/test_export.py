@@ -0,0 +1,48 @@
+"""NDJSON export of the listed catalog (Service.export)."""
+import json
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Service.export import export_lines
+
+
+@pytest.fixture
+def catalog(make_post):
+    listed = [make_post(title="Första tjänsten"), make_post()]
+    make_post(expiration_date=timezone.now() - timezone.timedelta(days=1))  # Not listed.
+    return listed
+
+
+@pytest.mark.django_db
+def test_one_line_per_listed_post_in_one_query(catalog, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        rows = [json.loads(line) for line in export_lines()]
+
+    assert [row["slug"] for row in rows] == [post.slug for post in catalog]
+    assert rows[0]["title"] == "Första tjänsten"
+    assert rows[0]["images"] == [catalog[0].image.url]
+
+
+@pytest.mark.django_db
+def test_endpoint_streams_the_export_to_signed_in_users(client, seller, catalog):
+    assert client.get("/api/v1/services/export.ndjson").status_code == 401
+    api = APIClient()
+    api.force_authenticate(seller)
+
+    response = api.get("/api/v1/services/export.ndjson")
+
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert b"".join(response.streaming_content) == b"".join(export_lines())
+
+
+@pytest.mark.django_db
+def test_command_writes_the_same_lines(catalog, tmp_path):
+    output = tmp_path / "services.ndjson"
+
+    call_command("export_services", output=str(output))
+
+    assert output.read_bytes() == b"".join(export_lines())
@@ -0,0 +1,42 @@
+"""Faceted counts for the filter bar (Service.facets, ServiceFacetsView)."""
+import pytest
+
+from Service.facets import facet_counts
+from Service.models import ServicePost
+
+URL = "/api/v1/services/facets/"
+
+
+@pytest.fixture
+def catalog(make_post):
+    make_post(category="Home", city="Uppsala", pris=50)
+    make_post(category="Home", city="Lund", pris=120)
+    make_post(category="Garden", city="Uppsala", pris=6000)
+    make_post(category="Garden", city="", pris=300)
+
+
+@pytest.mark.django_db
+def test_all_facets_come_from_one_query(catalog, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        facets = facet_counts(ServicePost.objects.filter(is_listed=True))
+
+    assert facets["category"] == {"Home": 2, "Garden": 2}
+    assert facets["city"] == {"Uppsala": 2, "Lund": 1}  # Empty values are left out.
+    assert facets["price"] == {"0-99": 1, "100-249": 1, "250-499": 1, "5000+": 1}
+    assert facets["country"] == {}
+
+
+@pytest.mark.django_db
+def test_facets_follow_the_request_filters(client, catalog):
+    facets = client.get(URL, {"category": "Home"}).json()
+
+    assert facets["city"] == {"Uppsala": 1, "Lund": 1}
+    assert client.get(URL, {"pris_max": 100}).json()["category"] == {"Home": 1}
+
+
+@pytest.mark.django_db
+def test_parameters_that_do_not_filter_share_a_cache_entry(client, catalog, django_assert_num_queries):
+    client.get(URL, {"category": "Home"})
+
+    with django_assert_num_queries(0):
+        client.get(URL, {"category": "Home", "utm_source": "app"})
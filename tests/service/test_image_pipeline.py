@@ -0,0 +1,65 @@
+"""Background processing of ServicePost image uploads (Service.image_pipeline)."""
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from Service.api.serializers import ServicePostUpdateSerializer
+from Service.image_pipeline import MAX_ATTEMPTS, enqueue_image_uploads, process_next_job
+from Service.models import ServiceImageJob, StoredImage
+
+
+@pytest.fixture(autouse=True)
+def _background(settings, media):
+    settings.SERVICE_IMAGE_PROCESSING = "background"
+
+
+def upload_image(post, upload):
+    serializer = ServicePostUpdateSerializer(post, data={"image": upload}, partial=True)
+    assert serializer.is_valid(), serializer.errors
+    return serializer.save()
+
+
+@pytest.mark.django_db
+def test_upload_is_queued_and_swapped_in_by_the_worker(make_post, png, django_capture_on_commit_callbacks):
+    post = make_post()
+    default_image = post.image.name
+
+    post = upload_image(post, png())
+    assert post.images_pending == 1
+    assert post.image.name == default_image  # Unchanged until processed.
+    raw_file = ServiceImageJob.objects.get(post=post).raw_file
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_next_job() is not None
+    post.refresh_from_db()
+
+    assert post.images_pending == 0
+    assert post.image.name.startswith("cas/")
+    assert StoredImage.objects.get(name=post.image.name).refs == 1
+    assert not ServiceImageJob.objects.exists()
+    assert not default_storage.exists(raw_file)
+    assert process_next_job() is None
+
+
+@pytest.mark.django_db
+def test_new_upload_replaces_a_pending_one(make_post, png):
+    post = upload_image(make_post(), png("red"))
+    post = upload_image(post, png("blue"))
+
+    assert ServiceImageJob.objects.filter(post=post).count() == 1
+    assert post.images_pending == 1
+
+
+@pytest.mark.django_db
+def test_broken_upload_fails_after_the_last_attempt(make_post):
+    post = make_post()
+    enqueue_image_uploads(post, {"image": SimpleUploadedFile("broken.png", b"not an image")})
+
+    for _ in range(MAX_ATTEMPTS):
+        process_next_job()
+
+    job = ServiceImageJob.objects.get(post=post)
+    assert job.status == ServiceImageJob.FAILED and job.attempts == MAX_ATTEMPTS
+    post.refresh_from_db()
+    assert post.images_pending == 0
+    assert process_next_job() is None
@@ -0,0 +1,52 @@
+"""Header-only validation and single decode of service images (Service.utils)."""
+import io
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from Service.utils import DecodeAtScale, read_image_header, validate_service_image
+
+
+def jpeg(size, orientation=None):
+    image = Image.new("RGB", size, "green")
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    raw = io.BytesIO()
+    image.save(raw, format="JPEG", exif=exif)
+    return SimpleUploadedFile("photo.jpg", raw.getvalue(), content_type="image/jpeg")
+
+
+def test_header_size_follows_exif_orientation():
+    assert read_image_header(jpeg((40, 20))) == (40, 20)
+    assert read_image_header(jpeg((40, 20), orientation=6)) == (20, 40)  # Rotated 90 degrees.
+
+
+def test_oversized_uploads_are_rejected_by_size(settings):
+    settings.SERVICE_IMAGE_MAX_BYTES = 100
+
+    with pytest.raises(ValidationError) as excinfo:
+        validate_service_image(jpeg((64, 64)))
+    assert excinfo.value.code == "image_too_large"
+
+
+def test_aspect_ratio_is_checked_on_the_displayed_size(settings):
+    settings.SERVICE_IMAGE_MIN_ASPECT_RATIO = 1.0
+
+    validate_service_image(jpeg((40, 20)))
+    with pytest.raises(ValidationError) as excinfo:
+        validate_service_image(jpeg((40, 20), orientation=6))
+    assert excinfo.value.code == "image_aspect_ratio"
+
+    with pytest.raises(ValidationError) as excinfo:
+        validate_service_image(SimpleUploadedFile("x.png", b"not an image"))
+    assert excinfo.value.code == "invalid_image"
+
+
+def test_large_jpegs_are_decoded_at_a_reduced_scale():
+    with Image.open(jpeg((2000, 1000))) as image:
+        image = DecodeAtScale(300, 300).process(image)
+        assert image.size == (1000, 500)  # 1/2: the smallest scale still covering 300 x 300.
+        image.load()
@@ -0,0 +1,37 @@
+"""Responsive WebP/AVIF variants and `*_srcset` maps (Neetechs.images)."""
+import pytest
+from django.core.files.storage import default_storage
+
+from Neetechs.images import srcset, supported_formats
+
+
+@pytest.mark.django_db
+def test_saved_image_gets_a_variant_per_format_and_width(make_post, png):
+    post = make_post(image=png(size=(600, 400)))
+
+    variants = srcset(post.image)
+
+    assert set(variants) == set(supported_formats())
+    assert "webp" in variants
+    for urls in variants.values():
+        assert sorted(urls) == [128, 256, 512]  # Widths up to the stored 512 px.
+    some_url = variants["webp"][128]
+    assert default_storage.exists(some_url.removeprefix(default_storage.base_url))
+
+
+@pytest.mark.django_db
+def test_default_image_has_no_variants(client, make_post, media):
+    post = make_post()
+
+    assert srcset(post.image) == {}
+    row = client.get("/api/v1/services/list/", {"fields": "image_srcset,image2_srcset"}).json()["results"][0]
+    assert row == {"image_srcset": {}, "image2_srcset": {}}
+
+
+@pytest.mark.django_db
+def test_srcset_urls_are_absolute_in_responses(client, make_post, png):
+    make_post(image=png())
+
+    row = client.get("/api/v1/services/list/", {"fields": "image_srcset"}).json()["results"][0]
+
+    assert row["image_srcset"]["webp"]["256"].startswith("http://testserver/")
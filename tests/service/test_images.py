@@ -0,0 +1,66 @@
+"""Reference counting of content-addressed post images (Neetechs.images)."""
+import pytest
+from django.core.files.storage import default_storage
+
+from Neetechs.images import collect_images, rebuild_image_references
+from Service.models import StoredImage
+
+
+def refs(name):
+    return StoredImage.objects.get(name=name).refs
+
+
+@pytest.mark.django_db(transaction=True)
+def test_shared_upload_is_stored_once_and_deleted_with_its_last_row(make_post, png):
+    first = make_post(image=png())
+    second = make_post(image=png())
+    name = first.image.name
+    assert second.image.name == name
+    assert refs(name) == 2
+
+    first.delete()
+    assert refs(name) == 1
+    assert default_storage.exists(name)
+
+    second.delete()
+    assert not StoredImage.objects.filter(name=name).exists()
+    assert not default_storage.exists(name)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replaced_image_is_released_and_collected(make_post, png):
+    post = make_post(image=png("red"))
+    old = post.image.name
+    post.image = png("blue")
+    post.save()
+
+    assert refs(old) == 0
+    assert refs(post.image.name) == 1
+    assert default_storage.exists(old)  # Left for the collector.
+
+    assert collect_images() == 1
+    assert not default_storage.exists(old)
+    assert default_storage.exists(post.image.name)
+
+
+@pytest.mark.django_db
+def test_saving_a_stale_instance_moves_the_stored_reference(make_post, png):
+    post = make_post(image=png("red"))
+    stale = type(post).objects.get(pk=post.pk)
+    post.image = png("blue")
+    post.save()
+
+    stale.title = "Renamed"
+    stale.save()  # Writes the red image back over the blue one.
+
+    assert refs(stale.image.name) == 1
+    assert refs(post.image.name) == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_recounts_from_the_image_columns(make_post, png):
+    post = make_post(image=png(), image2=png())
+    StoredImage.objects.update(refs=7)
+
+    assert rebuild_image_references() == 1
+    assert refs(post.image.name) == 2
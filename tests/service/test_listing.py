@@ -0,0 +1,63 @@
+"""ServicePost.is_listed maintenance (Service.listing)."""
+import pytest
+from django.utils import timezone
+
+from Service.listing import rebuild_listing_flags, refresh_employee_posts, sweep_expired_posts
+from Service.models import PREMIUM_SUBSCRIPTIONS, ServicePost
+
+pytestmark = pytest.mark.django_db
+
+
+def test_downgrade_unlists_posts_without_expiration_date(seller, make_post):
+    seller.subscription_type = PREMIUM_SUBSCRIPTIONS[0]
+    seller.save()
+    post = make_post()
+    ServicePost.objects.filter(pk=post.pk).update(expiration_date=None)
+
+    seller.subscription_type = "groundplan"
+    seller.save()
+
+    post.refresh_from_db()
+    assert post.is_listed is False
+
+
+def test_null_expiration_date_counts_as_expired_everywhere(seller, make_post):
+    post = make_post()
+    ServicePost.objects.filter(pk=post.pk).update(expiration_date=None)
+    post.refresh_from_db()
+
+    assert post.compute_is_listed() is False
+    assert sweep_expired_posts() == 1
+    refresh_employee_posts(seller)
+    assert ServicePost.objects.get(pk=post.pk).is_listed is False
+
+
+def test_sweep_unlists_lapsed_posts_except_premium_ones(make_user, make_post):
+    premium = make_user(subscription_type=PREMIUM_SUBSCRIPTIONS[0])
+    soon = timezone.now() + timezone.timedelta(minutes=5)
+    lapsing = make_post(expiration_date=soon)
+    kept = make_post(employee=premium, expiration_date=soon)
+    assert lapsing.is_listed and kept.is_listed
+
+    assert sweep_expired_posts(now=soon + timezone.timedelta(minutes=1)) == 1
+
+    assert set(ServicePost.objects.filter(is_listed=True).values_list("pk", flat=True)) == {kept.pk}
+
+
+def test_upgrade_relists_expired_posts(seller, make_post, client):
+    post = make_post(expiration_date=timezone.now() - timezone.timedelta(days=1))
+    assert post.is_listed is False
+    assert client.get("/api/v1/services/list/").json()["count"] == 0
+
+    seller.subscription_type = PREMIUM_SUBSCRIPTIONS[1]
+    seller.save()
+
+    assert client.get("/api/v1/services/list/").json()["count"] == 1
+
+
+def test_rebuild_recomputes_every_flag(make_post):
+    post = make_post(expiration_date=timezone.now() + timezone.timedelta(days=1))
+    ServicePost.objects.filter(pk=post.pk).update(is_listed=False)
+
+    assert rebuild_listing_flags() == 1
+    assert ServicePost.objects.get(pk=post.pk).is_listed is True
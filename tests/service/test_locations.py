@@ -0,0 +1,43 @@
+"""Versioned location bundles (Service.locations, LocationBundleView)."""
+import pytest
+
+from Service.models import ModelCountry
+
+URL = "/api/v1/services/locations/"
+
+
+@pytest.fixture
+def pointer(client, db):
+    ModelCountry.objects.create(name="Sweden")
+    return client.get(URL)
+
+
+def test_pointer_names_the_bundle_by_its_content(client, pointer):
+    version = pointer.json()["version"]
+    assert pointer["ETag"] == f'"{version}"'
+
+    bundle = client.get(f"{URL}{version}.json")
+    assert bundle.status_code == 200
+    assert "immutable" in bundle["Cache-Control"]
+    assert {"name": "Sweden"}.items() <= bundle.json()["countries"][-1].items()
+
+
+@pytest.mark.parametrize("if_none_match", ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+def test_matching_entity_tags_get_304(client, pointer, if_none_match):
+    response = client.get(URL, HTTP_IF_NONE_MATCH=if_none_match.format(etag=pointer["ETag"]))
+    assert response.status_code == 304
+    assert response["ETag"] == pointer["ETag"]
+
+
+@pytest.mark.parametrize("if_none_match", ['"other"', '"{version}0"', '"x{version}"'])
+def test_other_or_overlapping_tags_get_the_pointer(client, pointer, if_none_match):
+    response = client.get(URL, HTTP_IF_NONE_MATCH=if_none_match.format(version=pointer.json()["version"]))
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_new_country_publishes_a_new_version(client, pointer, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ModelCountry.objects.create(name="Norway")
+
+    assert client.get(URL).json()["version"] != pointer.json()["version"]
@@ -0,0 +1,51 @@
+"""`?pris_min=`/`?pris_max=` and the price histogram (PriceRangeFilter, Service.facets)."""
+import pytest
+
+URL = "/api/v1/services/search/"
+HISTOGRAM_URL = "/api/v1/services/facets/price/"
+
+
+@pytest.fixture
+def prices(make_post):
+    for pris in (10, 20, 20, 30, 90, 100):
+        make_post(pris=pris, category="Home")
+    make_post(pris=500, category="Garden")
+
+
+def found(client, **params):
+    return sorted(row["pris"] for row in client.get(URL, params).json()["results"])
+
+
+@pytest.mark.django_db
+def test_range_bounds_are_inclusive_and_optional(client, prices):
+    assert found(client, pris_min=20, pris_max=90) == [20, 20, 30, 90]
+    assert found(client, pris_min=100) == [100, 500]
+    assert found(client, pris_max=10) == [10]
+
+
+@pytest.mark.django_db
+def test_reversed_range_is_rejected(client, prices):
+    assert client.get(URL, {"pris_min": 50, "pris_max": 10}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_equal_width_histogram(client, prices):
+    histogram = client.get(HISTOGRAM_URL, {"buckets": 2, "category": "Home"}).json()
+
+    assert (histogram["min"], histogram["max"], histogram["count"]) == (10, 100, 6)
+    assert histogram["buckets"] == [{"min": 10, "max": 55, "count": 4}, {"min": 56, "max": 100, "count": 2}]
+
+
+@pytest.mark.django_db
+def test_quantile_histogram_balances_the_buckets(client, prices):
+    histogram = client.get(HISTOGRAM_URL, {"buckets": 2, "mode": "quantile"}).json()
+
+    assert [(bucket["min"], bucket["count"]) for bucket in histogram["buckets"]] == [(10, 3), (30, 4)]  # Split at the median.
+    assert histogram["buckets"][-1]["max"] == 500
+
+
+@pytest.mark.django_db
+def test_histogram_ignores_the_price_range_it_is_drawn_for(client, prices):
+    histogram = client.get(HISTOGRAM_URL, {"buckets": 2, "pris_min": 90}).json()
+
+    assert histogram["count"] == 7
@@ -0,0 +1,51 @@
+"""Stored rank_score and /services/featured/ (Service.ranking)."""
+import math
+
+import pytest
+from django.utils import timezone
+
+from Service import ranking, reactions
+from Service.models import PREMIUM_SUBSCRIPTIONS, ServicePost
+
+
+def score(post):
+    return ServicePost.objects.values_list("rank_score", flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_score_follows_reactions_and_plan(make_user, make_post):
+    post = make_post()
+    base = score(post)
+
+    reactions.add_like(post.pk, make_user().pk)
+    assert score(post) == pytest.approx(base + ranking.LIKE_WEIGHT * math.log(2), abs=1e-3)
+
+    post.employee.subscription_type = PREMIUM_SUBSCRIPTIONS[0]
+    post.employee.save()
+    assert score(post) == pytest.approx(base + ranking.LIKE_WEIGHT * math.log(2) + ranking.PREMIUM_BOOST, abs=1e-3)
+
+
+@pytest.mark.django_db
+def test_freshness_halves_every_half_life(settings, make_post):
+    settings.SERVICE_RANK_HALF_LIFE_HOURS = 24
+    post = make_post()
+    now = ServicePost.objects.get(pk=post.pk).updatedAt
+
+    ranking.refresh_rank_scores(ServicePost.objects.filter(pk=post.pk), now=now)
+    fresh = score(post)
+    ranking.decay_rank_scores(now=now + timezone.timedelta(hours=24))
+
+    assert fresh - score(post) == pytest.approx(ranking.FRESHNESS_WEIGHT / 2, abs=1e-3)
+
+
+@pytest.mark.django_db
+def test_featured_lists_the_best_ranked_listed_posts_first(client, make_user, make_post):
+    plain, liked, loved = make_post(), make_post(), make_post()
+    fans = [make_user() for _ in range(3)]
+    reactions.add_like(liked.pk, fans[0].pk)
+    for fan in fans:
+        reactions.add_like(loved.pk, fan.pk)
+
+    slugs = [row["slug"] for row in client.get("/api/v1/services/featured/").json()["results"]]
+
+    assert slugs == [loved.slug, liked.slug, plain.slug]
@@ -0,0 +1,63 @@
+"""Batch reaction states, /services/reactions/batch/ (Service.reactions.reaction_states)."""
+import pytest
+from rest_framework.test import APIClient
+
+from Service import reactions
+
+URL = "/api/v1/services/reactions/batch/"
+
+
+@pytest.mark.django_db
+def test_returns_counts_and_the_callers_reaction_per_post(make_user, make_post):
+    liked, disliked, untouched = make_post(), make_post(), make_post()
+    viewer = make_user()
+    reactions.add_like(liked.pk, viewer.pk)
+    reactions.add_like(liked.pk, make_user().pk)
+    reactions.add_dislike(disliked.pk, viewer.pk)
+    client = APIClient()
+    client.force_authenticate(viewer)
+
+    response = client.get(URL, {"ids": f"{liked.pk},{disliked.pk},{untouched.pk},999999"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        str(liked.pk): {"like_count": 2, "dislike_count": 0, "user_reaction": "like"},
+        str(disliked.pk): {"like_count": 0, "dislike_count": 1, "user_reaction": "dislike"},
+        str(untouched.pk): {"like_count": 0, "dislike_count": 0, "user_reaction": None},
+    }
+
+
+@pytest.mark.django_db
+def test_anonymous_callers_get_no_reaction(make_user, make_post):
+    post = make_post()
+    reactions.add_like(post.pk, make_user().pk)
+
+    row = APIClient().get(URL, {"ids": str(post.pk)}).json()[str(post.pk)]
+
+    assert row == {"like_count": 1, "dislike_count": 0, "user_reaction": None}
+
+
+@pytest.mark.django_db
+def test_one_query_however_many_posts(make_user, make_post, django_assert_num_queries):
+    viewer = make_user()
+    posts = [make_post() for _ in range(5)]
+    for post in posts:
+        reactions.add_like(post.pk, viewer.pk)
+    client = APIClient()
+    client.force_authenticate(viewer)
+    ids = ",".join(str(post.pk) for post in posts)
+    client.get(URL, {"ids": ids})  # Warm-up: the first request also loads the Site.
+
+    with django_assert_num_queries(1):
+        assert len(client.get(URL, {"ids": ids}).json()) == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ids", ["", "1,x", ",".join(str(n) for n in range(1, 300))])
+def test_rejects_bad_id_lists(settings, ids):
+    settings.SERVICE_REACTIONS_BATCH_MAX = 100
+
+    response = APIClient().get(URL, {"ids": ids})
+
+    assert response.status_code == 400
+    assert "ids" in response.json()["errors"]
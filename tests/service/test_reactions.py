@@ -0,0 +1,81 @@
+"""Like/dislike toggles and their denormalized counters (Service.reactions)."""
+import pytest
+from rest_framework.test import APIClient
+
+from Service import reactions
+from Service.models import ServicePost
+
+
+def counts(post):
+    post.refresh_from_db(fields=["like_count", "dislike_count"])
+    return post.like_count, post.dislike_count
+
+
+@pytest.mark.django_db
+def test_toggles_keep_the_counters_equal_to_the_through_rows(make_user, make_post):
+    post = make_post()
+    alice, bob = make_user(), make_user()
+
+    assert reactions.add_like(post.pk, alice.pk)
+    assert not reactions.add_like(post.pk, alice.pk)  # Repeated: no double count.
+    reactions.add_dislike(post.pk, bob.pk)
+    assert counts(post) == (1, 1)
+
+    reactions.add_dislike(post.pk, alice.pk)  # Switches alice's like to a dislike.
+    assert counts(post) == (0, 2)
+
+    reactions.remove_dislike(post.pk, alice.pk)
+    reactions.remove_dislike(post.pk, alice.pk)
+    assert counts(post) == (0, 1)
+    assert counts(post) == (post.likes.count(), post.disLikes.count())
+
+
+@pytest.mark.django_db
+def test_toggles_leave_updated_at_alone(make_user, make_post):
+    post = make_post()
+    updated_at = post.updatedAt
+
+    reactions.add_like(post.pk, make_user().pk)
+
+    assert ServicePost.objects.get(pk=post.pk).updatedAt == updated_at
+
+
+@pytest.mark.django_db
+def test_rebuild_resyncs_counters_after_direct_m2m_writes(make_user, make_post):
+    post = make_post()
+    post.likes.add(make_user(), make_user())
+
+    reactions.rebuild_reaction_counts()
+
+    assert counts(post) == (2, 0)
+
+
+@pytest.mark.django_db
+def test_counts_mode_replaces_the_id_lists_with_the_callers_reaction(make_user, make_post):
+    post = make_post()
+    viewer = make_user()
+    reactions.add_like(post.pk, viewer.pk)
+    client = APIClient()
+    client.force_authenticate(viewer)
+
+    row = client.get("/api/v1/services/list/", {"reactions": "counts"}).json()["results"][0]
+
+    assert row["like_count"] == 1
+    assert row["user_reaction"] == "like"
+    assert "likes" not in row and "disLikes" not in row
+
+
+@pytest.mark.django_db
+def test_toggle_endpoint_returns_the_new_counters(make_user, make_post):
+    post = make_post()
+    user = make_user()
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.post(
+        "/api/v1/services/likes/toggle/",
+        {"userid": user.pk, "postNumber": post.pk, "likeType": "add one like", "LikeDisLike": 1},
+    )
+
+    assert response.status_code == 201
+    assert (response.json()["like_count"], response.json()["dislike_count"]) == (1, 0)
@@ -0,0 +1,45 @@
+"""Saved searches: matching new listings and notifying their owners (Service.saved_searches)."""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from Service import saved_searches
+from Service.models import SavedSearch, SavedSearchMatch
+
+
+@pytest.fixture
+def buyer(make_user):
+    return make_user()
+
+
+@pytest.mark.django_db
+def test_new_listed_post_matches_searches_of_other_users(buyer, seller, make_post, django_capture_on_commit_callbacks):
+    wanted = SavedSearch.objects.create(user=buyer, city="Uppsala", pris_max=200)
+    SavedSearch.objects.create(user=buyer, city="Lund")
+    SavedSearch.objects.create(user=buyer, city="Uppsala", pris_max=10)
+    SavedSearch.objects.create(user=seller, city="Uppsala")  # The seller's own search.
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post = make_post(city="Uppsala", pris=100)
+
+    assert list(SavedSearchMatch.objects.values_list("search", "post")) == [(wanted.pk, post.pk)]
+
+
+@pytest.mark.django_db
+def test_notifying_loads_the_searches_with_the_matches(buyer, make_post, monkeypatch):
+    sent = []
+    monkeypatch.setattr(saved_searches, "send_match_notification", lambda search, posts: sent.append((search, posts)))
+
+    def notify_round(searches):
+        for n in range(searches):
+            search = SavedSearch.objects.create(user=buyer, name=f"Search {n}")
+            SavedSearchMatch.objects.create(search=search, post=make_post())
+        sent.clear()
+        with CaptureQueriesContext(connection) as queries:
+            assert saved_searches.notify_pending_matches() == searches
+            names = [(search.name, search.user_id, [post.title for post in posts]) for search, posts in sent]
+        assert len(names) == searches
+        return len(queries)
+
+    assert notify_round(1) == notify_round(4)
+    assert SavedSearchMatch.objects.filter(notified_at__isnull=True).count() == 0
@@ -0,0 +1,43 @@
+"""`?search=` over the full-text index (ServiceSearchFilter)."""
+import pytest
+
+URL = "/api/v1/services/list/"
+
+
+def titles(client, **params):
+    return [row["title"] for row in client.get(URL, params).json()["results"]]
+
+
+@pytest.mark.django_db
+def test_title_matches_rank_above_description_matches(client, make_post):
+    make_post(title="Garden work", beskrivning="Hedges, lawns and a little plumbing on the side")
+    make_post(title="Plumbing repairs", beskrivning="Leaking taps and pipes")
+    make_post(title="Painting", beskrivning="Walls and ceilings")
+
+    assert titles(client, search="plumbing") == ["Plumbing repairs", "Garden work"]
+
+
+@pytest.mark.django_db
+def test_web_search_syntax(client, make_post):
+    make_post(title="Plumbing repairs", beskrivning="Leaking taps", city="Uppsala")
+    make_post(title="Plumbing installs", beskrivning="New bathrooms", city="Lund")
+
+    assert titles(client, search="plumbing -lund") == ["Plumbing repairs"]
+    assert titles(client, search='"new bathrooms"') == ["Plumbing installs"]
+
+
+@pytest.mark.django_db
+def test_explicit_ordering_wins_over_rank(client, make_post):
+    make_post(title="Plumbing", beskrivning="Plumbing plumbing", pris=500)
+    make_post(title="Cheap help", beskrivning="Some plumbing", pris=100)
+
+    assert titles(client, search="plumbing", ordering="pris") == ["Cheap help", "Plumbing"]
+
+
+@pytest.mark.django_db
+def test_ilike_fallback(client, settings, make_post):
+    settings.SERVICE_FULLTEXT_SEARCH = False
+    make_post(title="Plumbing repairs")
+    make_post(title="Painting")
+
+    assert titles(client, search="lumb") == ["Plumbing repairs"]
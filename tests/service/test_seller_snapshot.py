@@ -0,0 +1,96 @@
+"""Seller fields copied onto posts and the sync_seller_snapshots worker (Service.seller_snapshot)."""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from Service import seller_snapshot
+from Service.models import SellerSnapshotJob, ServicePost
+
+
+def seller_names(seller):
+    return set(ServicePost.objects.filter(employee=seller).values_list("sellerName", flat=True))
+
+
+@pytest.mark.django_db
+def test_profile_change_queues_a_job_instead_of_writing_posts(seller, make_post):
+    make_post()
+    seller.first_name = "Renamed"
+    seller.save()
+
+    assert SellerSnapshotJob.objects.filter(employee=seller).exists()
+    assert seller_names(seller) != {"Renamed"}
+
+
+@pytest.mark.django_db
+def test_unrelated_change_queues_nothing(seller, make_post):
+    make_post()
+    seller.last_name = "Other"
+    seller.save()
+
+    assert not SellerSnapshotJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_worker_rewrites_posts_and_finishes_the_job(seller, make_post):
+    make_post(), make_post()
+    seller.first_name = "Renamed"
+    seller.about = "New bio"
+    seller.save()
+
+    assert seller_snapshot.process_next_job().employee_id == seller.pk
+    assert seller_names(seller) == {"Renamed"}
+    assert set(ServicePost.objects.values_list("AboutSeller", flat=True)) == {"New bio"}
+    assert not SellerSnapshotJob.objects.exists()
+    assert seller_snapshot.process_next_job() is None
+
+
+@pytest.mark.django_db
+def test_claimed_job_is_not_claimed_twice_until_stale(seller, make_post):
+    make_post()
+    seller_snapshot.queue_seller_snapshot(seller)
+    job = seller_snapshot.claim_next_job()
+
+    assert seller_snapshot.claim_next_job(now=job.started_at) is None
+    reclaimed = seller_snapshot.claim_next_job(now=job.started_at + seller_snapshot.CLAIM_TIMEOUT * 2)
+    assert reclaimed.pk == job.pk
+
+
+@pytest.mark.django_db
+def test_requeued_job_survives_the_run(seller, make_post, monkeypatch):
+    make_post()
+    seller_snapshot.queue_seller_snapshot(seller)
+    refresh = seller_snapshot.refresh_seller_posts
+
+    def refresh_then_change(employee, batch_size=None):
+        written = refresh(employee, batch_size)
+        seller_snapshot.queue_seller_snapshot(employee)
+        return written
+
+    monkeypatch.setattr(seller_snapshot, "refresh_seller_posts", refresh_then_change)
+    seller_snapshot.process_next_job()
+
+    job = SellerSnapshotJob.objects.get(employee=seller)
+    assert job.started_at is None
+
+
+@pytest.mark.django_db
+def test_refresh_writes_every_batch(seller, make_post):
+    for _ in range(5):
+        make_post()
+    ServicePost.objects.update(sellerName="stale")
+
+    assert seller_snapshot.refresh_seller_posts(seller, batch_size=2) == 5
+    assert seller_names(seller) == {seller.first_name}
+
+
+@pytest.mark.django_db
+def test_command_backfills_every_seller(seller, make_user, make_post):
+    other = make_user()
+    make_post(), make_post(employee=other)
+    ServicePost.objects.update(sellerName="stale")
+
+    call_command("sync_seller_snapshots", "--all", "--once", stdout=StringIO())
+
+    assert seller_names(seller) == {seller.first_name}
+    assert seller_names(other) == {other.first_name}
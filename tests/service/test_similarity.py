@@ -0,0 +1,46 @@
+"""Precomputed similar services (Service.similarity, SimilarServicesView)."""
+import pytest
+
+from Service.models import ServicePost, ServiceSimilarity
+from Service.similarity import build_similarities
+
+
+@pytest.fixture
+def catalog(make_post):
+    return {
+        "plumber": make_post(title="Emergency plumber", category="Home", beskrivning="Leaking pipes and blocked drains fixed"),
+        "drains": make_post(title="Drain cleaning", category="Home", beskrivning="Blocked drains and pipes cleared"),
+        "tutor": make_post(title="Maths tutor", category="Education", beskrivning="Algebra and geometry lessons"),
+    }
+
+
+def similar(client, post):
+    return [row["slug"] for row in client.get(f"/api/v1/services/{post.slug}/similar/").json()]
+
+
+@pytest.mark.django_db
+def test_neighbours_are_posts_sharing_words(client, catalog):
+    assert build_similarities(full=True) == 3
+
+    assert similar(client, catalog["plumber"]) == [catalog["drains"].slug]
+    assert similar(client, catalog["tutor"]) == []
+
+
+@pytest.mark.django_db
+def test_incremental_build_only_recomputes_affected_posts(client, catalog, make_post):
+    build_similarities(full=True)
+    assert build_similarities() == 0
+
+    newcomer = make_post(title="Maths and algebra tutor", category="Education", beskrivning="Algebra lessons online")
+
+    assert build_similarities() == 2  # The newcomer and the tutor it now beats.
+    assert similar(client, catalog["tutor"]) == [newcomer.slug]
+
+
+@pytest.mark.django_db
+def test_unlisted_neighbours_are_hidden(client, catalog):
+    build_similarities(full=True)
+    ServicePost.objects.filter(pk=catalog["drains"].pk).update(is_listed=False)
+
+    assert ServiceSimilarity.objects.filter(post=catalog["plumber"]).exists()
+    assert similar(client, catalog["plumber"]) == []
@@ -0,0 +1,33 @@
+"""`?fields=`/`?omit=` sparse fieldsets (SparseFieldsetMixin, SparseFieldsFilter)."""
+import pytest
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from Neetechs.api_router import ServicePostViewSet
+from Service.api.filters import SparseFieldsFilter
+
+
+@pytest.mark.django_db
+def test_fields_and_omit_narrow_the_payload(client, make_post):
+    make_post()
+
+    card = client.get("/api/v1/services/list/", {"fields": "title,pris"}).json()["results"][0]
+    assert set(card) == {"title", "pris"}
+
+    rest = client.get("/api/v1/services/list/", {"omit": "beskrivning"}).json()["results"][0]
+    assert "beskrivning" not in rest and "title" in rest
+
+
+@pytest.mark.django_db
+def test_ordering_columns_are_loaded_with_the_rows(make_post, django_assert_num_queries):
+    for price in (3, 1, 2):
+        make_post(pris=price)
+    request = Request(APIRequestFactory().get("/", {"fields": "title", "ordering": "pris"}))
+    view = ServicePostViewSet(request=request, format_kwarg=None, action="list", kwargs={})
+    queryset = OrderingFilter().filter_queryset(request, view.get_queryset(), view)
+    queryset = SparseFieldsFilter().filter_queryset(request, queryset, view)
+
+    # Cursor pagination reads each row's ordering value; none may be deferred.
+    with django_assert_num_queries(1):
+        assert [post.pris for post in queryset] == [1, 2, 3]
@@ -0,0 +1,69 @@
+"""Search-box typeahead (Service.suggest)."""
+import pytest
+from django.db import connection
+
+from Service import suggest
+
+
+@pytest.fixture(autouse=True)
+def _clear_prefix_cache():
+    suggest._cache.clear()
+    yield
+    suggest._cache.clear()
+
+
+@pytest.fixture
+def trigram(db):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            pytest.skip("pg_trgm is not installed")
+
+
+def row(value, prefix=0, similarity=0.1, posts=1):
+    return {"value": value, "prefix": prefix, "similarity": similarity, "posts": posts}
+
+
+def test_short_queries_return_empty_lists(settings):
+    settings.SERVICE_SUGGEST_MIN_LENGTH = 2
+
+    assert suggest.suggest(" p ") == {"titles": [], "categories": [], "cities": []}
+
+
+def test_complete_prefix_results_answer_longer_queries_from_memory(settings, monkeypatch):
+    settings.SERVICE_SUGGEST_MIN_LENGTH = 2
+    settings.SERVICE_SUGGEST_LIMIT = 5
+    queries = []
+
+    def query(q, limit):
+        queries.append(q)
+        return {"titles": [row("Hopper rental"), row("Apple picking")], "categories": [], "cities": [row("Uppsala")]}
+
+    monkeypatch.setattr(suggest, "query_suggestions", query)
+
+    suggest.suggest("pp")
+    assert suggest.suggest("PPL ") == {"titles": ["Apple picking"], "categories": [], "cities": []}
+    assert queries == ["pp"]
+
+
+def test_full_prefix_results_are_not_narrowed(settings, monkeypatch):
+    settings.SERVICE_SUGGEST_MIN_LENGTH = 2
+    settings.SERVICE_SUGGEST_LIMIT = 1
+    queries = []
+
+    def query(q, limit):
+        queries.append(q)
+        return {"titles": [row("Apple picking")], "categories": [], "cities": []}
+
+    monkeypatch.setattr(suggest, "query_suggestions", query)
+
+    suggest.suggest("pp")
+    suggest.suggest("ppl")
+    assert queries == ["pp", "ppl"]  # "pp" may have cut off other matches.
+
+
+def test_prefix_matches_rank_first(client, trigram, make_post):
+    make_post(title="Carpet cleaning", city="Uppsala")
+    make_post(title="Cleaning windows", city="Lund")
+
+    assert client.get("/api/v1/services/suggest/", {"q": "clean"}).json()["titles"] == ["Cleaning windows", "Carpet cleaning"]